@@ -0,0 +1,99 @@
+# benchmarks/archive.py
+"""Consultas do dia a dia antes e depois de arquivar os anos encerrados.
+
+Uso: ``python -m benchmarks.archive [--rows 1000000] [--years 12] [--repeat 5]``
+
+Gera um banco sintético (``benchmarks/ledger.py``), mede as consultas
+abaixo, arquiva todos os anos encerrados (``ArchiveRepository``), compacta
+o banco principal e mede de novo:
+
+- ``pagina``: primeira página da manutenção (mais recentes);
+- ``mes_anterior``: transações do mês anterior;
+- ``soma_ano``: soma do ano atual;
+- ``exporta_ano``: exportação CSV do ano atual;
+- ``pagina_arquivada``: uma página dentro de um ano arquivado;
+- ``exporta_tudo``: exportação CSV de todo o histórico.
+
+Também informa o tamanho do banco principal e o tempo de arquivamento.
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+from datetime import date, datetime
+
+from benchmarks.ledger import generate_ledger
+from src.database.connection import get_manager
+from src.models.transaction_filter import TransactionFilter
+from src.repository.archive_repository import ArchiveRepository
+from src.repository.transaction_repository import TransactionRepository
+from src.services.export import export_ledger
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def measure(transaction_repo: TransactionRepository, today: date, repeat: int) -> dict:
+    month_start = today.replace(day=1)
+    previous = month_start.replace(year=month_start.year - 1, month=12) if month_start.month == 1 else month_start.replace(month=month_start.month - 1)
+    year_start = date(today.year, 1, 1)
+    old_year = TransactionFilter(end=date(today.year - 5, 7, 1))
+    year_filter = TransactionFilter(start=year_start)
+    operations = {
+        "pagina": lambda: transaction_repo.get_page(limit=50),
+        "mes_anterior": lambda: transaction_repo.get_by_period(previous, month_start),
+        "soma_ano": lambda: transaction_repo.sum_cents(year_start, date(today.year + 1, 1, 1)),
+        "exporta_ano": lambda: export_ledger(transaction_repo, io.BytesIO(), "csv", year_filter),
+        "pagina_arquivada": lambda: transaction_repo.get_page(old_year, limit=50),
+        "exporta_tudo": lambda: export_ledger(transaction_repo, io.BytesIO(), "csv"),
+    }
+    return {name: best_of(fn, repeat) for name, fn in operations.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--years", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    today = datetime.now().date()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, "financial.db")
+        manager = get_manager(db_path)
+        conn = manager.get_connection()
+        generate_ledger(conn, args.rows, years=args.years, end_year=today.year, seed=args.seed)
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        transaction_repo = TransactionRepository(conn)
+        archive_repo = ArchiveRepository(conn)
+
+        size_before = os.path.getsize(db_path)
+        before = measure(transaction_repo, today, args.repeat)
+
+        start = time.perf_counter()
+        years = archive_repo.closed_years(today)
+        for year in years:
+            archive_repo.archive(year, today)
+        archive_seconds = time.perf_counter() - start
+        archive_repo.compact()
+        size_after = os.path.getsize(db_path)
+        after = measure(transaction_repo, today, args.repeat)
+        manager.close()
+
+    print(f"{args.rows} linhas; {len(years)} anos arquivados em {archive_seconds:.1f} s")
+    print(f"banco principal: {size_before / 2**20:.1f} MB -> {size_after / 2**20:.1f} MB")
+    print(f"{'consulta':>18} {'antes (ms)':>12} {'depois (ms)':>12}")
+    for name in before:
+        print(f"{name:>18} {before[name]:>12.2f} {after[name]:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
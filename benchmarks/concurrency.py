@@ -0,0 +1,170 @@
+# benchmarks/concurrency.py
+"""Teste de carga com várias sessões simultâneas sobre o mesmo banco.
+
+Uso::
+
+    python -m benchmarks.concurrency --sessions 16 --ops 200 --write-ratio 0.2
+    python -m benchmarks.concurrency --sessions 8 --external-writers 2 --output carga.json
+
+Cada sessão é uma thread com a própria conexão (como as sessões do
+Streamlit) que alterna leituras do painel (matriz do ano e visões
+consolidadas) e lotes de edições da matriz (``upsert_cells``), na proporção
+``--write-ratio``. ``--external-writers`` abre processos que gravam no mesmo
+arquivo durante o teste (um lote a cada ``--writer-interval`` segundos),
+como a importação pela linha de comando, para exercitar a espera por
+``SQLITE_BUSY``.
+
+O resultado é um JSON com as latências (p50, p95, p99 e máxima, em ms) de
+cada tipo de operação e o número de erros.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.ledger import generate_ledger
+from src.database.connection import get_manager
+from src.repository.item_repository import ItemRepository
+from src.repository.report_repository import ReportRepository
+from src.repository.transaction_repository import TransactionRepository
+from src.services.dashboard import load_matrix
+from src.services.rollups import category_by_month, load_rollup
+
+
+def random_cells(rng: random.Random, item_ids: list[int], year: int, count: int) -> list[tuple]:
+    cells = {(rng.choice(item_ids), year, rng.randint(1, 12)) for _ in range(count)}
+    return [(item_id, year, month, rng.randint(-50_000, 50_000)) for item_id, year, month in cells]
+
+
+def run_session(db_path: str, args, seed: int, item_ids: list[int], barrier, results: dict) -> None:
+    rng = random.Random(seed)
+    today = datetime.now()
+    conn = get_manager(db_path).get_connection()
+    transaction_repo = TransactionRepository(conn)
+    report_repo = ReportRepository(conn)
+    latencies = {"read": [], "write": []}
+    errors = {"read": 0, "write": 0}
+
+    barrier.wait()
+    for _ in range(args.ops):
+        op = "write" if rng.random() < args.write_ratio else "read"
+        start = time.perf_counter()
+        try:
+            if op == "write":
+                transaction_repo.upsert_cells(random_cells(rng, item_ids, today.year, args.cells))
+            else:
+                load_matrix(report_repo, today.year, today)
+                category_by_month(load_rollup(report_repo), today.year)
+        except sqlite3.Error as e:
+            errors[op] += 1
+            print(f"{op}: {e}", file=sys.stderr)
+            continue
+        latencies[op].append(time.perf_counter() - start)
+    results[seed] = (latencies, errors)
+
+
+def external_writer(db_path: str, item_ids: list[int], stop, seed: int, counter, interval: float) -> None:
+    """Processo separado gravando um lote a cada ``interval`` segundos até ``stop``."""
+    rng = random.Random(seed)
+    year = datetime.now().year
+    transaction_repo = TransactionRepository(get_manager(db_path).get_connection())
+    while not stop.is_set():
+        transaction_repo.upsert_cells(random_cells(rng, item_ids, year, 50))
+        with counter.get_lock():
+            counter.value += 1
+        stop.wait(interval)
+
+
+def percentiles(samples: list[float]) -> dict:
+    if not samples:
+        return {"count": 0}
+    ms = np.array(samples) * 1000
+    return {
+        "count": len(samples),
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2),
+        "max_ms": round(float(ms.max()), 2),
+    }
+
+
+def run(args, workdir: str) -> dict:
+    db_path = os.path.join(workdir, "carga.db")
+    conn = get_manager(db_path).get_connection()
+    generate_ledger(conn, args.rows, years=args.years, seed=args.seed)
+    item_ids = [item.id for item in ItemRepository(conn).get_all()]
+
+    stop = multiprocessing.Event()
+    counter = multiprocessing.Value("i", 0)
+    writers = [
+        multiprocessing.Process(target=external_writer, args=(db_path, item_ids, stop, args.seed + 1000 + i, counter, args.writer_interval))
+        for i in range(args.external_writers)
+    ]
+    for writer in writers:
+        writer.start()
+
+    results: dict = {}
+    barrier = threading.Barrier(args.sessions)
+    threads = [
+        threading.Thread(target=run_session, args=(db_path, args, args.seed + i, item_ids, barrier, results))
+        for i in range(args.sessions)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    for writer in writers:
+        writer.join()
+
+    report = {"sessions": args.sessions, "ops_per_session": args.ops, "write_ratio": args.write_ratio,
+              "rows": args.rows, "external_writers": args.external_writers,
+              "external_batches": counter.value, "seconds": round(elapsed, 3)}
+    for op in ("read", "write"):
+        samples = [s for latencies, _ in results.values() for s in latencies[op]]
+        report[op] = {**percentiles(samples), "errors": sum(errors[op] for _, errors in results.values())}
+    report["ops_per_second"] = round(sum(report[op]["count"] for op in ("read", "write")) / elapsed, 1)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=100, help="operações por sessão")
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--cells", type=int, default=12, help="células por lote de edição")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--external-writers", type=int, default=0)
+    parser.add_argument("--writer-interval", type=float, default=0.05,
+                        help="segundos entre os lotes de cada processo externo")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="grava o JSON neste arquivo em vez da saída padrão")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        report = run(args, workdir)
+        get_manager(os.path.join(workdir, "carga.db")).close()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# benchmarks/journal.py
+"""Custo do histórico de alterações nas escritas e ganho dos consumidores incrementais.
+
+Uso: ``python -m benchmarks.journal [--rows 200000] [--years 5] [--repeat 5]``
+
+- escrita: gera o mesmo banco sintético (``benchmarks/ledger.py``) com e
+  sem os triggers do histórico (pausados por ``change_log_pause``) e
+  compara o tempo e o tamanho do banco;
+- matriz: depois de uma edição feita por outra sessão, recalcula a matriz
+  de um ano passado (``load_matrix``, sem cache) ou atualiza só as células
+  alteradas (``changes_since`` + ``refresh_matrix``); as duas devem ficar
+  iguais;
+- desfazer/refazer: um lote com todas as células do ano;
+- leitura: ``changes_since(0)`` do histórico inteiro.
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.ledger import generate_ledger
+from src.database.connection import get_manager
+from src.repository.journal_repository import JournalRepository
+from src.repository.report_repository import ReportRepository
+from src.repository.transaction_repository import TransactionRepository
+from src.services.dashboard import MatrixState, load_matrix, refresh_matrix
+from src.services.display import MESES
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def bench_writes(workdir: str, rows: int, years: int, seed: int, journal: bool) -> dict:
+    path = os.path.join(workdir, f"escrita_{journal}.db")
+    manager = get_manager(path)
+    conn = manager.get_connection()
+    if not journal:
+        conn.execute("INSERT INTO change_log_pause (paused) VALUES (1)")
+        conn.commit()
+    start = time.perf_counter()
+    generate_ledger(conn, rows, years=years, seed=seed)
+    seconds = time.perf_counter() - start
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    manager.close()
+    return {"seconds": seconds, "mb": os.path.getsize(path) / 2**20}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    today = datetime.now()
+    year = today.year - 2
+
+    with tempfile.TemporaryDirectory() as workdir:
+        without = bench_writes(workdir, args.rows, args.years, args.seed, journal=False)
+        with_journal = bench_writes(workdir, args.rows, args.years, args.seed, journal=True)
+
+        conn = get_manager(os.path.join(workdir, "escrita_True.db")).get_connection()
+        report_repo, transaction_repo, journal_repo = ReportRepository(conn), TransactionRepository(conn), JournalRepository(conn)
+        matrix, month_columns = load_matrix(report_repo, year, today)
+        cells = [(item_id, year, month, 12345) for item_id in matrix.index for month in range(1, 13)]
+
+        reload_ms, refresh_ms, same = [], [], True
+        for i in range(args.repeat):
+            state = MatrixState(year=year, version=None, frame=matrix.copy(), month_columns=month_columns, seq=journal_repo.last_seq())
+            item_id = int(matrix.index[i % len(matrix)])
+            transaction_repo.upsert_cells([(item_id, year, 1 + i % 12, 100 * (i + 1))])
+
+            start = time.perf_counter()
+            full, _ = load_matrix(report_repo, year, today)
+            full = full.copy()
+            reload_ms.append((time.perf_counter() - start) * 1000)
+            report_repo.cache.invalidate()
+
+            start = time.perf_counter()
+            refreshed = refresh_matrix(state, journal_repo.changes_since(state.seq), report_repo, today)
+            refresh_ms.append((time.perf_counter() - start) * 1000)
+            same = same and refreshed and state.frame.loc[full.index, MESES[i % 12]].equals(full[MESES[i % 12]])
+            matrix = full
+
+        transaction_repo.upsert_cells(cells)
+        undo_ms = best_of(lambda: (journal_repo.undo(), journal_repo.redo()), args.repeat) / 2
+        entries = journal_repo.last_seq()
+        read_ms = best_of(lambda: journal_repo.changes_since(0), 1)
+
+    print(f"{args.rows} transações em {args.years} anos")
+    print(f"{'escrita':>14} {'tempo (s)':>10} {'banco (MB)':>11}")
+    print(f"{'sem histórico':>14} {without['seconds']:>10.2f} {without['mb']:>11.1f}")
+    print(f"{'com histórico':>14} {with_journal['seconds']:>10.2f} {with_journal['mb']:>11.1f}")
+    print(f"matriz de {year} após uma edição: recalcular {min(reload_ms):.2f} ms, "
+          f"atualizar as células {min(refresh_ms):.2f} ms (iguais: {same})")
+    print(f"desfazer/refazer {len(cells)} células: {undo_ms:.1f} ms")
+    print(f"changes_since(0): {entries} entradas em {read_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/ledger.py
+"""Gerador de bancos sintéticos para os benchmarks.
+
+Cria itens distribuídos por categorias realistas e um histórico mensal em
+que os itens fixos (aluguel, salário, assinaturas...) aparecem uma vez por
+mês marcados como recorrentes, e o restante das linhas é distribuído entre
+os itens variáveis. Tudo é gravado pelos repositórios, a partir dos modelos
+``Item`` e ``Transaction``, em lotes de tamanho fixo.
+"""
+import random
+from datetime import date, datetime
+
+from src.models.item import Item
+from src.models.transaction import Transaction
+from src.repository.item_repository import ItemRepository
+from src.repository.transaction_repository import TransactionRepository
+
+# categoria -> [(nome, recorrente, valor típico em reais, crédito)]
+CATALOG = {
+    "Renda": [("Salário", True, 8500, True), ("Freelance", False, 1200, True), ("Rendimentos", False, 150, True)],
+    "Moradia": [("Aluguel", True, 2200, False), ("Condomínio", True, 650, False), ("Energia", True, 280, False),
+                ("Água", True, 90, False), ("Internet", True, 120, False), ("Manutenção", False, 300, False)],
+    "Alimentação": [("Supermercado", False, 350, False), ("Restaurante", False, 90, False),
+                    ("Padaria", False, 25, False), ("Delivery", False, 60, False)],
+    "Transporte": [("Combustível", False, 200, False), ("Uber", False, 35, False), ("Estacionamento", False, 20, False),
+                   ("Seguro Auto", True, 210, False)],
+    "Saúde": [("Plano de Saúde", True, 780, False), ("Farmácia", False, 70, False), ("Academia", True, 110, False)],
+    "Lazer": [("Streaming", True, 55, False), ("Cinema", False, 60, False), ("Viagem", False, 1800, False)],
+    "Educação": [("Escola", True, 1500, False), ("Livros", False, 80, False), ("Cursos", False, 400, False)],
+}
+
+
+def month_starts(years: int, end_year: int):
+    for year in range(end_year - years + 1, end_year + 1):
+        for month in range(1, 13):
+            yield year, month
+
+
+def generate_ledger(
+    conn,
+    rows: int,
+    years: int = 10,
+    end_year: int | None = None,
+    seed: int = 42,
+    batch_size: int = 50_000,
+) -> dict:
+    """Popula ``conn`` (já migrado) com aproximadamente ``rows`` transações."""
+    rng = random.Random(seed)
+    end_year = end_year or datetime.now().year
+    item_repo = ItemRepository(conn)
+    transaction_repo = TransactionRepository(conn)
+
+    specs = [(name, category, recurring, typical, credit)
+             for category, entries in CATALOG.items()
+             for name, recurring, typical, credit in entries]
+    items = item_repo.add_many([Item(name=name, category=category) for name, category, *_ in specs])
+    fixed = [(item, spec) for item, spec in zip(items, specs) if spec[2]]
+    variable = [(item, spec) for item, spec in zip(items, specs) if not spec[2]]
+
+    months = list(month_starts(years, end_year))
+    per_month = max(rows // len(months), 1)
+    batch, written = [], 0
+    for year, month in months:
+        for i in range(per_month):
+            if written >= rows:
+                break
+            if i < len(fixed):
+                item, (_, _, recurring, typical, credit) = fixed[i]
+                day = 5
+            else:
+                item, (_, _, recurring, typical, credit) = rng.choice(variable)
+                day = rng.randint(1, 28)
+            value = round(rng.lognormvariate(0, 0.35) * typical, 2)
+            batch.append(Transaction(
+                item_id=item.id,
+                value=value,
+                type="C" if credit else "D",
+                is_completed=(year, month) < (end_year, 12) or rng.random() < 0.5,
+                is_recurring=recurring,
+                date=date(year, month, day),
+            ))
+            written += 1
+            if len(batch) >= batch_size:
+                transaction_repo.add_many(batch)
+                batch = []
+    transaction_repo.add_many(batch)
+
+    return {"items": len(items), "transactions": written, "years": years, "end_year": end_year}
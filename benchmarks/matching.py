@@ -0,0 +1,94 @@
+# benchmarks/matching.py
+"""Busca de itens e associação descrição → item na importação.
+
+Uso: ``python -m benchmarks.matching [--items 50000] [--lines 200000] [--rules 20 200 2000]``
+
+- busca: ``ItemRepository.search`` (FTS5 trigram) contra o que o seletor
+  fazia antes, filtrar ``get_all()`` em Python, por consulta digitada;
+- associação: ``RuleMatcher`` contra a varredura original, que testava
+  cada regra em cada linha do extrato. As duas devem escolher os mesmos
+  itens.
+"""
+import argparse
+import os
+import random
+import string
+import tempfile
+import time
+
+from src.database.connection import get_manager
+from src.models.item import Item
+from src.repository.item_repository import ItemRepository
+from src.services.importer import ImportRule, RuleMatcher, normalize
+
+
+def random_words(rng: random.Random, count: int) -> list[str]:
+    return ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9))) for _ in range(count)]
+
+
+def bench_search(item_repo: ItemRepository, queries: list[str]) -> dict:
+    start = time.perf_counter()
+    for query in queries:
+        needle = query.lower()
+        [item for item in item_repo.get_all() if needle in item.name.lower() or needle in item.category.lower()][:50]
+    before = (time.perf_counter() - start) / len(queries) * 1000
+
+    start = time.perf_counter()
+    for query in queries:
+        item_repo.search(query)
+    after = (time.perf_counter() - start) / len(queries) * 1000
+    return {"before_ms": before, "after_ms": after}
+
+
+def bench_rules(rules: list[ImportRule], lines: list[str]) -> dict:
+    start = time.perf_counter()
+    expected = [
+        next((rule.item_id for rule in rules if rule.matches(line, normalize(line))), None)
+        for line in lines
+    ]
+    before = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher = RuleMatcher(rules)
+    matcher.resolve(lines)
+    got = [matcher.match(line)[1] for line in lines]
+    after = time.perf_counter() - start
+    return {"before_s": before, "after_s": after, "same": got == expected}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--lines", type=int, default=200_000)
+    parser.add_argument("--descriptions", type=int, default=5_000, help="descrições distintas no extrato")
+    parser.add_argument("--rules", type=int, nargs="+", default=[20, 200, 2000])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    words = random_words(rng, 5_000)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        manager = get_manager(os.path.join(workdir, "busca.db"))
+        item_repo = ItemRepository(manager.get_connection())
+        item_repo.add_many([Item(name=f"{rng.choice(words).title()} {i}", category=f"Categoria {i % 40}") for i in range(args.items)])
+        queries = [rng.choice(words)[:rng.randint(3, 6)] for _ in range(args.queries)]
+        search = bench_search(item_repo, queries)
+        manager.close()
+    print(f"busca em {args.items} itens: antes {search['before_ms']:.2f} ms, depois {search['after_ms']:.2f} ms por consulta")
+
+    distinct = [
+        f"{rng.choice(['PIX', 'COMPRA', 'TED'])} {' '.join(rng.choices(words, k=3)).upper()}"
+        for _ in range(args.descriptions)
+    ]
+    lines = [rng.choice(distinct) for _ in range(args.lines)]
+    print(f"{'regras':>8} {'antes (s)':>10} {'depois (s)':>11} {'ganho':>8}  iguais")
+    for count in args.rules:
+        rules = [ImportRule(item_id=i, contains=rng.choice(words)) for i in range(count)]
+        result = bench_rules(rules, lines)
+        speedup = result["before_s"] / result["after_s"]
+        print(f"{count:>8} {result['before_s']:>10.3f} {result['after_s']:>11.3f} {speedup:>7.0f}x  {result['same']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# benchmarks/period_lookup.py
+"""Compara a busca por item/mês/ano antes e depois dos índices por período.
+
+Uso: ``python -m benchmarks.period_lookup [--sizes 10000 100000 1000000]``
+
+"antes" é a consulta original com ``strftime`` sobre o schema sem índices;
+"depois" é ``TransactionRepository.get_by_item_month_year`` sobre o schema
+atual, que usa o índice ``(item_id, date)``.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import date, timedelta
+
+from src.database.connection import migrate
+from src.repository.transaction_repository import TransactionRepository
+
+LEGACY_SCHEMA = """
+CREATE TABLE items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    category TEXT NOT NULL
+);
+CREATE TABLE transactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    item_id INTEGER NOT NULL,
+    value REAL NOT NULL,
+    type TEXT NOT NULL,
+    is_completed BOOLEAN NOT NULL DEFAULT 0,
+    is_recurring BOOLEAN NOT NULL DEFAULT 0,
+    date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (item_id) REFERENCES items (id)
+);
+"""
+
+LEGACY_QUERY = """
+    SELECT id, item_id, value, type, is_completed, is_recurring, date
+    FROM transactions
+    WHERE item_id = ?
+    AND strftime('%m', date) = ?
+    AND strftime('%Y', date) = ?
+"""
+
+N_ITEMS = 50
+FIRST_DAY = date(2000, 1, 1)
+
+
+def populate(conn: sqlite3.Connection, rows: int, legacy: bool = False, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    conn.executemany(
+        "INSERT INTO items (name, category) VALUES (?, ?)",
+        [(f"Item {i}", f"Categoria {i % 8}") for i in range(N_ITEMS)]
+    )
+    span = (date(2025, 12, 31) - FIRST_DAY).days
+    rows = (
+        (
+            rng.randint(1, N_ITEMS),
+            rng.randint(-500_000, 500_000),
+            (FIRST_DAY + timedelta(days=rng.randint(0, span))).isoformat(),
+        )
+        for _ in range(rows)
+    )
+    if legacy:
+        conn.executemany(
+            """INSERT INTO transactions (item_id, value, type, is_completed, is_recurring, date)
+               VALUES (?, ?, ?, 1, 0, ?)""",
+            ((item_id, abs(cents) / 100, "D" if cents < 0 else "C", day) for item_id, cents, day in rows)
+        )
+    else:
+        conn.executemany(
+            """INSERT INTO transactions (item_id, amount_cents, is_completed, is_recurring, date)
+               VALUES (?, ?, 1, 0, ?)""",
+            rows
+        )
+    conn.commit()
+
+
+def time_lookups(fn, lookups) -> float:
+    start = time.perf_counter()
+    for item_id, month, year in lookups:
+        fn(item_id, month, year)
+    return (time.perf_counter() - start) / len(lookups) * 1000
+
+
+def run(size: int, n_lookups: int, workdir: str) -> dict:
+    rng = random.Random(size)
+    lookups = [
+        (rng.randint(1, N_ITEMS), rng.randint(1, 12), rng.randint(2000, 2025))
+        for _ in range(n_lookups)
+    ]
+
+    legacy = sqlite3.connect(os.path.join(workdir, f"legacy_{size}.db"))
+    legacy.executescript(LEGACY_SCHEMA)
+    populate(legacy, size, legacy=True)
+    before = time_lookups(
+        lambda item_id, month, year: legacy.execute(
+            LEGACY_QUERY, (item_id, f"{month:02d}", str(year))
+        ).fetchall(),
+        lookups
+    )
+    legacy.close()
+
+    current = sqlite3.connect(os.path.join(workdir, f"current_{size}.db"))
+    migrate(current)
+    populate(current, size)
+    repo = TransactionRepository(current)
+    after = time_lookups(repo.get_by_item_month_year, lookups)
+    current.close()
+
+    return {"rows": size, "before_ms": before, "after_ms": after}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'linhas':>10} {'antes (ms)':>12} {'depois (ms)':>12} {'ganho':>8}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            result = run(size, args.lookups, workdir)
+            speedup = result["before_ms"] / result["after_ms"]
+            print(f"{size:>10} {result['before_ms']:>12.3f} {result['after_ms']:>12.3f} {speedup:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# benchmarks/pipeline.py
+"""Mede cada etapa do dashboard sobre bancos sintéticos, sem servidor Streamlit.
+
+Uso::
+
+    python -m benchmarks.pipeline --sizes 1000 100000 1000000 --output atual.json
+    python -m benchmarks.pipeline --sizes 1000 100000 --compare atual.json
+
+Etapas medidas (melhor de ``--repeat`` execuções, em segundos):
+
+- ``get_all``: ``TransactionRepository.get_all`` com hidratação dos objetos
+- ``get_columns``: a mesma leitura em arrays NumPy, sem objetos por linha
+- ``year_totals``: totais do ano corrente lidos do banco (sem cache)
+- ``dataframe``: construção do DataFrame a partir dos totais
+- ``projection``: projeção dos recorrentes para os meses restantes
+- ``pivot``: ``build_matrix`` (pivot, conversão para reais e ordenação)
+- ``styling``: formatação pt-BR e cores (``Styler`` renderizado)
+- ``rollups``: agregado do histórico e as visões por categoria, ano e saldo
+- ``edit_batch``: conversão e gravação de um lote de edições da matriz
+- ``edit_cell``: uma edição no editor (só a célula nova é gravada e
+  aplicada à matriz da sessão, sem recarregar nem reformatar a matriz)
+- ``export``: exportação de todas as transações para Parquet, em blocos
+
+O resultado é um JSON com as versões do ambiente e o commit atual, para
+comparar execuções entre commits.
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from benchmarks.ledger import generate_ledger
+from src.database.connection import migrate
+from src.repository.report_repository import ReportRepository
+from src.repository.transaction_repository import TransactionRepository
+from src.services.dashboard import MatrixState, build_matrix, edits_to_cells, pending_edits, totals_frame
+from src.services.display import MESES, estilizar_matriz
+from src.services.export import export_ledger
+from src.services.projection import project_recurring
+from src.services.rollups import cash_flow_forecast, category_by_month, load_rollup, running_balance, year_over_year
+
+
+def best_of(fn, repeat: int, setup=None) -> float:
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_size(rows: int, args, workdir: str) -> dict:
+    today = datetime.now()
+    conn = sqlite3.connect(os.path.join(workdir, f"ledger_{rows}.db"))
+    migrate(conn)
+
+    start = time.perf_counter()
+    generated = generate_ledger(conn, rows, years=args.years, end_year=today.year, seed=args.seed)
+    stages = {"generate": time.perf_counter() - start}
+
+    transaction_repo = TransactionRepository(conn)
+    report_repo = ReportRepository(conn)
+    invalidate = report_repo.cache.invalidate
+
+    if rows <= args.max_get_all:
+        stages["get_all"] = best_of(transaction_repo.get_all, args.repeat)
+    stages["get_columns"] = best_of(transaction_repo.get_columns, args.repeat)
+    stages["year_totals"] = best_of(lambda: report_repo.get_year_totals(today.year), args.repeat, setup=invalidate)
+
+    totals = report_repo.get_year_totals(today.year)
+    stages["dataframe"] = best_of(lambda: totals_frame(totals), args.repeat)
+    data = totals_frame(totals)
+
+    inicio_mes_atual = today.replace(day=1)
+    inicio_mes_anterior = (inicio_mes_atual - timedelta(days=1)).replace(day=1)
+    recurring = totals_frame(report_repo.get_monthly_totals(inicio_mes_anterior, inicio_mes_atual, recurring_only=True))
+    stages["projection"] = best_of(lambda: project_recurring(recurring, data, first_month=today.month), args.repeat)
+    data = project_recurring(recurring, data, first_month=today.month)
+
+    stages["pivot"] = best_of(lambda: build_matrix(data), args.repeat)
+    matrix, month_columns = build_matrix(data)
+    stages["styling"] = best_of(lambda: estilizar_matriz(matrix, month_columns).to_html(), args.repeat)
+
+    def rollups():
+        rollup = load_rollup(report_repo)
+        category_by_month(rollup, today.year)
+        year_over_year(rollup)
+        running_balance(rollup, until=today)
+        cash_flow_forecast(rollup, today)
+    stages["rollups"] = best_of(rollups, args.repeat, setup=invalidate)
+
+    # Edita as três primeiras colunas de mês de todas as linhas
+    edited_rows = {
+        str(idx): {month: float(idx + 1) for month in MESES[:3]}
+        for idx in range(len(matrix))
+    }
+    stages["edit_batch"] = best_of(
+        lambda: transaction_repo.upsert_cells(edits_to_cells(edited_rows, matrix, today.year)[0]),
+        args.repeat
+    )
+
+    state = MatrixState(year=today.year, version=None, frame=matrix.copy(), month_columns=month_columns)
+    editor_rows = {}
+
+    def edit_cell():
+        # O editor acumula as edições; a cada callback só a última é nova
+        row = len(editor_rows) % len(matrix)
+        editor_rows.setdefault(str(row), {})[month_columns[0]] = float(len(editor_rows))
+        cells = edits_to_cells(pending_edits(editor_rows, state.applied), state.frame, today.year)[0]
+        transaction_repo.upsert_cells(cells)
+        state.apply(cells)
+    stages["edit_cell"] = best_of(edit_cell, args.repeat)
+
+    export_path = os.path.join(workdir, f"ledger_{rows}.parquet")
+    stages["export"] = best_of(lambda: export_ledger(transaction_repo, export_path, "parquet"), args.repeat)
+
+    conn.close()
+    return {"rows": rows, **generated, "matrix_cells": int(matrix[month_columns].size), "seconds": stages}
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: list[dict], baseline_path: str) -> None:
+    with open(baseline_path) as f:
+        baseline = {r["rows"]: r["seconds"] for r in json.load(f)["results"]}
+    print(f"{'linhas':>10} {'etapa':<12} {'base (s)':>10} {'atual (s)':>10} {'razão':>7}", file=sys.stderr)
+    for result in results:
+        for stage, seconds in result["seconds"].items():
+            base = baseline.get(result["rows"], {}).get(stage)
+            if base:
+                print(f"{result['rows']:>10} {stage:<12} {base:>10.4f} {seconds:>10.4f} {seconds / base:>6.2f}x", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--max-get-all", type=int, default=1_000_000,
+                        help="não mede get_all acima deste número de linhas")
+    parser.add_argument("--output", help="grava o JSON neste arquivo em vez da saída padrão")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparação")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        results = [run_size(rows, args, workdir) for rows in args.sizes]
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "sqlite": sqlite3.sqlite_version,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+# benchmarks/projection.py
+"""Compara a projeção de recorrentes em loop com a versão vetorizada.
+
+Uso: ``python -m benchmarks.projection [--items 50 500 5000] [--first-month 1 5 10 12]``
+
+"loop" é a implementação original de ``principal.main()``, copiada sem
+alterações (``legacy_project``): uma linha por transação, com o valor em
+texto, merge por chave ``Item + Ref`` a cada mês e ``pd.concat``.
+"vetorizada" é ``src.services.projection.project_recurring``, sobre os
+totais por item e mês. As mesmas transações alimentam as duas; a
+equivalência das matrizes resultantes é conferida em
+``tests/test_projection.py``.
+"""
+import argparse
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from src.services.projection import project_recurring
+
+# Colunas de uma transação sintética; o valor é em centavos com sinal
+TRANSACTION_COLUMNS = ["item_id", "date", "amount_cents", "is_recurring"]
+
+
+def item_name(item_id: int) -> str:
+    return f"Item {item_id:04d}"
+
+
+def category_name(item_id: int) -> str:
+    return f"Categoria {item_id % 8}"
+
+
+def synthetic(n_items: int, today: datetime, seed: int = 0) -> pd.DataFrame:
+    """Transações do ano de ``today`` e do mês anterior a ele.
+
+    Metade dos itens tem uma transação recorrente no mês anterior; os meses
+    passados do ano são quase todos preenchidos e os futuros, esparsos.
+    Os valores são distintos entre si, como transações reais: o loop
+    original descarta linhas idênticas (``drop_duplicates``).
+    """
+    rng = np.random.default_rng(seed)
+    previous = today.replace(day=1) - timedelta(days=1)
+    cells = pd.MultiIndex.from_product([range(1, n_items + 1), range(1, 13)], names=["item_id", "month"])
+    actual = cells.to_frame(index=False)
+    filled = rng.random(len(actual)) < np.where(actual["month"] < today.month, 0.9, 0.2)
+    actual = actual[filled & ~((actual["month"] == previous.month) & (previous.year == today.year))]
+    rows = [
+        (item_id, date(today.year, month, int(rng.integers(1, 29))), False)
+        for item_id, month in actual.itertuples(index=False)
+    ]
+    recurring_ids = rng.choice(np.arange(1, n_items + 1), size=max(n_items // 2, 1), replace=False)
+    rows += [(int(item_id), date(previous.year, previous.month, 10), True) for item_id in np.sort(recurring_ids)]
+
+    amounts = rng.choice(np.arange(100, 500_000), size=len(rows), replace=False)
+    signs = np.where(rng.random(len(rows)) < 0.8, -1, 1)
+    return pd.DataFrame(
+        [(item_id, day, int(amount), recurring) for (item_id, day, recurring), amount in zip(rows, amounts * signs)],
+        columns=TRANSACTION_COLUMNS,
+    )
+
+
+def legacy_inputs(transactions: pd.DataFrame, year: int, today: datetime) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Recorrentes do mês anterior e transações do ano, montados como em ``principal.main()``."""
+    data = []
+    for t in transactions.itertuples():
+        data.append({
+            "Ano": t.date.strftime("%Y"),
+            "Ref": t.date.strftime("%m"),
+            "Data": t.date.strftime("%d/%m/%Y"),
+            "Item": item_name(t.item_id),
+            "Categoria": category_name(t.item_id),
+            "Valor": f"R$ {abs(t.amount_cents) / 100:.2f}",
+            "Tipo": "Débito" if t.amount_cents < 0 else "Crédito",
+            "Status": "Efetivado",
+            "Recorrente": "Sim" if t.is_recurring else "Não"
+        })
+
+    # Definindo as datas da referência anterior
+    data_mes_anterior = today.replace(day=1) - timedelta(days=1)
+    mes_data_anterior = data_mes_anterior.strftime("%m")
+    ano_data_anterior = data_mes_anterior.strftime("%Y")
+
+    # Tratamento do histórico de transações
+    data = pd.DataFrame(data, columns=["Ano", "Ref", "Data", "Item", "Categoria", "Valor", "Tipo", "Status", "Recorrente"])
+    data["Ano"] = data["Ano"].astype(int)
+    data["Ref"] = data["Ref"].astype(int)
+
+    # Dataframe com transações recorrentes da referência anterior
+    transacoes_recorrentes = data[(data["Ref"] == int(mes_data_anterior)) & (data["Ano"] == int(ano_data_anterior)) & (data["Recorrente"] == "Sim")]
+    transacoes_recorrentes = transacoes_recorrentes.drop("Ano", axis=1)
+
+    # Seleciona as transações do ano desejado
+    data = data[data["Ano"] == year]
+    data = data.drop("Ano", axis=1)
+    return transacoes_recorrentes, data
+
+
+def legacy_project(transacoes_recorrentes: pd.DataFrame, data: pd.DataFrame, mes_atual: int) -> pd.DataFrame:
+    """Loop original de ``principal.main()``, do ``for`` ao sinal dos débitos."""
+    transacoes_recorrentes = transacoes_recorrentes.copy()
+    data = data.copy()
+
+    # Adiciona as transações recorrentes para os meses seguintes
+    for i in range(13 - mes_atual):
+        transacoes_recorrentes["Ref"] = i + mes_atual
+
+        # Cria uma chave de identificação única
+        transacoes_recorrentes['chave'] = transacoes_recorrentes['Item'] + transacoes_recorrentes['Ref'].astype(str)
+        data['chave'] = data['Item'] + data['Ref'].astype(str)
+
+        # Atualiza usando merge
+        transacoes_recorrentes = (
+            transacoes_recorrentes.merge(
+                data,
+                on='chave',
+                how='left',
+                suffixes=('', '_novo')
+            )
+        )
+
+        # Atualiza as colunas onde há correspondência
+        colunas = ['Ref', 'Data', 'Item','Categoria', 'Valor', 'Tipo', 'Status', 'Recorrente']
+        for col in colunas:
+            mascara = ~transacoes_recorrentes[f'{col}_novo'].isna()
+            transacoes_recorrentes.loc[mascara, col] = transacoes_recorrentes.loc[mascara, f'{col}_novo']
+
+        # Remove as colunas temporárias
+        transacoes_recorrentes = transacoes_recorrentes.drop([col + '_novo' for col in colunas] + ['chave'], axis=1)
+
+        # Concatena os dataframes
+        data = pd.concat([data, transacoes_recorrentes], ignore_index=True)
+
+    # Remove duplicatas
+    data.drop_duplicates(inplace=True)
+
+    # Trata possíveis erros e garante a conversão correta da coluna Valor para numérico
+    data['Valor'] = pd.to_numeric(
+        data['Valor'].str.replace('R$', '').str.strip(),
+        errors='coerce'
+    )
+
+    # Multiplica o valor por -1 se o tipo for Débito
+    data['Valor'] = np.where(data['Tipo'] == 'Débito', data['Valor'] * -1, data['Valor'])
+    return data
+
+
+def current_inputs(transactions: pd.DataFrame, year: int, today: datetime) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Os mesmos dados como totais por item e mês (``totals_frame``), em centavos."""
+    previous = today.replace(day=1) - timedelta(days=1)
+    frame = transactions.assign(
+        Item=transactions["item_id"].map(item_name),
+        Categoria=transactions["item_id"].map(category_name),
+        Ano=[day.year for day in transactions["date"]],
+        Ref=[day.month for day in transactions["date"]],
+    )
+
+    def totals(rows: pd.DataFrame) -> pd.DataFrame:
+        return (
+            rows.groupby(["item_id", "Item", "Categoria", "Ref"], as_index=False)["amount_cents"].sum()
+            .rename(columns={"amount_cents": "Valor"})
+        )
+
+    recurring = frame[(frame["Ano"] == previous.year) & (frame["Ref"] == previous.month) & frame["is_recurring"]]
+    return totals(recurring), totals(frame[frame["Ano"] == year])
+
+
+def legacy_matrix(transactions: pd.DataFrame, year: int, today: datetime) -> pd.DataFrame:
+    """Matriz Item × mês em reais produzida pelo loop original."""
+    recurring, data = legacy_inputs(transactions, year, today)
+    # Fora do ano atual, o loop não roda, mas as duplicatas e o sinal são tratados
+    return pivot(legacy_project(recurring, data, today.month if year == today.year else 13), 1)
+
+
+def current_matrix(transactions: pd.DataFrame, year: int, today: datetime) -> pd.DataFrame:
+    """Matriz Item × mês em reais produzida por ``project_recurring``."""
+    recurring, data = current_inputs(transactions, year, today)
+    if year == today.year:
+        data = project_recurring(recurring, data, first_month=today.month)
+    return pivot(data, 100)
+
+
+def pivot(data: pd.DataFrame, unit: int) -> pd.DataFrame:
+    data = data.assign(Valor=data["Valor"] / unit)
+    matrix = data.pivot_table(values="Valor", index="Item", columns="Ref", aggfunc="sum")
+    matrix.columns = [int(month) for month in matrix.columns]
+    return matrix.sort_index()
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--first-month", type=int, nargs="+", default=[1, 5, 10, 12])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'itens':>8} {'mês':>4} {'loop (ms)':>12} {'vetorizada (ms)':>16} {'ganho':>8}")
+    for n_items in args.items:
+        for first_month in args.first_month:
+            today = datetime(2024, first_month, 15)
+            transactions = synthetic(n_items, today)
+            legacy = legacy_inputs(transactions, today.year, today)
+            current = current_inputs(transactions, today.year, today)
+            before = best_of(lambda: legacy_project(*legacy, first_month), args.repeat)
+            after = best_of(lambda: project_recurring(*current, first_month), args.repeat)
+            print(f"{n_items:>8} {first_month:>4} {before:>12.2f} {after:>16.2f} {before / after:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
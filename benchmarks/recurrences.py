@@ -0,0 +1,76 @@
+# benchmarks/recurrences.py
+"""Compara a expansão das recorrências em loop com a versão vetorizada.
+
+Uso: ``python -m benchmarks.recurrences [--schedules 10 1000 100000] [--years 10]``
+
+"loop" percorre cada recorrência mês a mês em Python; "vetorizada" é
+``src.services.recurrences.expand``. Ambas devem gerar as mesmas ocorrências.
+"""
+import argparse
+import calendar
+import time
+from datetime import date
+
+import numpy as np
+
+from src.services.recurrences import expand
+
+
+def legacy_expand(schedules: dict, start: date, end: date) -> list[tuple]:
+    rows = []
+    for i in range(len(schedules["id"])):
+        first = schedules["start_date"][i].astype(date)
+        last = schedules["end_date"][i]
+        last = None if np.isnat(last) else last.astype(date)
+        year, month = first.year, first.month
+        while True:
+            day = date(year, month, min(first.day, calendar.monthrange(year, month)[1]))
+            if day >= end or (last and day > last):
+                break
+            if day >= start:
+                rows.append((int(schedules["id"][i]), day))
+            month += int(schedules["interval_months"][i])
+            year, month = year + (month - 1) // 12, (month - 1) % 12 + 1
+    return rows
+
+
+def synthetic(n: int, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("2015-01-01") + rng.integers(0, 3650, n)
+    end = np.where(rng.random(n) < 0.3, start + rng.integers(30, 3650, n), np.datetime64("NaT"))
+    return {
+        "id": np.arange(1, n + 1),
+        "item_id": rng.integers(1, 50, n),
+        "name": np.full(n, "Item", dtype=object),
+        "category": np.full(n, "Categoria", dtype=object),
+        "amount_cents": rng.integers(-100_000, 100_000, n),
+        "interval_months": rng.choice([1, 1, 1, 3, 6, 12], n),
+        "start_date": start.astype("datetime64[D]"),
+        "end_date": end.astype("datetime64[D]"),
+        "materialized_until": np.full(n, np.datetime64("NaT"), dtype="datetime64[D]"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--schedules", type=int, nargs="+", default=[10, 1_000, 100_000])
+    parser.add_argument("--years", type=int, default=10, help="tamanho do período expandido")
+    args = parser.parse_args()
+
+    start = date(2020, 1, 1)
+    end = date(start.year + args.years, 1, 1)
+    print(f"{'recorrências':>12} {'ocorrências':>12} {'loop (s)':>10} {'vetorizada (s)':>15} {'ganho':>7}")
+    for n in args.schedules:
+        schedules = synthetic(n)
+        t0 = time.perf_counter()
+        expected = legacy_expand(schedules, start, end)
+        t1 = time.perf_counter()
+        result = expand(schedules, start, end)
+        t2 = time.perf_counter()
+        got = list(zip(result["recurrence_id"].tolist(), result["date"].dt.date.tolist()))
+        assert sorted(got) == sorted(expected), "resultados diferentes"
+        print(f"{n:>12} {len(result):>12} {t1 - t0:>10.4f} {t2 - t1:>15.4f} {(t1 - t0) / (t2 - t1):>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
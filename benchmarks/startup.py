@@ -0,0 +1,171 @@
+# benchmarks/startup.py
+"""Tempo de partida a frio de cada página, com orçamento.
+
+Uso::
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --pages principal.py --budget principal.py=1200 --output partida.json
+
+Cada página é executada uma vez (``AppTest``, sem servidor) em um processo
+Python novo, sobre um banco sintético de ``--rows`` linhas, como na
+primeira visita depois que o contêiner sobe. Para cada página:
+
+- ``render_ms``: do início do processo filho ao fim da primeira execução
+  do script (importações, conexão, schema e renderização); melhor de
+  ``--repeat`` processos;
+- ``first_element_ms``: do início do processo ao primeiro elemento
+  enviado ao navegador (o que o usuário vê primeiro);
+- ``imports``: as importações de maior tempo acumulado, medidas com
+  ``python -X importtime`` em outra execução;
+- ``heavy``: quais de pandas, NumPy e PyArrow foram carregados.
+
+Termina com código 1 se alguma página passar do orçamento de
+``render_ms`` (por página) ou de ``first_element_ms`` (comum a todas): uma
+importação de pandas no topo de uma página, por exemplo, atrasa o primeiro
+elemento em ~300 ms.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+from benchmarks.ledger import generate_ledger
+from src.database.connection import get_manager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Orçamento de render_ms por página (caminho relativo a src/)
+BUDGETS_MS = {
+    "principal.py": 1000,
+    "pages/manutencao.py": 800,
+    "pages/importacao.py": 450,
+    "pages/exportacao.py": 450,
+}
+FIRST_ELEMENT_BUDGET_MS = 400
+
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow")
+
+# Executado no processo filho: o tempo começa antes de qualquer importação
+_CHILD = """
+import time
+start = time.perf_counter()
+import sys
+from streamlit.runtime.scriptrunner_utils.script_run_context import ScriptRunContext
+from streamlit.testing.v1 import AppTest
+
+first = []
+enqueue = ScriptRunContext.enqueue
+
+def timed_enqueue(self, msg):
+    if not first and msg.HasField("delta"):
+        first.append(time.perf_counter() - start)
+    enqueue(self, msg)
+
+ScriptRunContext.enqueue = timed_enqueue
+at = AppTest.from_file({script!r}, default_timeout=120).run()
+elapsed = time.perf_counter() - start
+if at.exception:
+    raise SystemExit(at.exception[0].message)
+print(elapsed, first[0], *[name for name in {heavy!r} if name in sys.modules])
+"""
+
+
+def run_child(page: str, db_path: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    code = _CHILD.format(script=os.path.join("src", page), heavy=HEAVY_MODULES)
+    command = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", code]
+    env = {**os.environ, "DATABASE_URL": db_path}
+    result = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{page}: {result.stderr.strip().splitlines()[-1] if result.stderr.strip() else result.returncode}")
+    return result
+
+
+def top_imports(stderr: str, limit: int) -> list[dict]:
+    """Importações de primeiro nível com maior tempo acumulado no relatório do ``-X importtime``.
+
+    Módulos importados por outro (indentados no relatório) já estão no
+    acumulado de quem os importou; importações feitas dentro de funções,
+    durante a execução do script, aparecem no primeiro nível.
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):
+            imports.append((name.strip(), int(cumulative) / 1000))
+    ranked = sorted(imports, key=lambda item: item[1], reverse=True)[:limit]
+    return [{"module": name, "cumulative_ms": round(ms, 1)} for name, ms in ranked]
+
+
+def measure(page: str, db_path: str, args) -> dict:
+    timings, first = [], []
+    for _ in range(args.repeat):
+        elapsed, first_element, *heavy = run_child(page, db_path).stdout.split()
+        timings.append(float(elapsed) * 1000)
+        first.append(float(first_element) * 1000)
+    report = run_child(page, db_path, importtime=True)
+    return {
+        "render_ms": round(min(timings), 1),
+        "first_element_ms": round(min(first), 1),
+        "budget_ms": args.budgets[page],
+        "first_element_budget_ms": args.first_element_budget,
+        "heavy": heavy,
+        "imports": top_imports(report.stderr, args.top),
+    }
+
+
+def parse_budget(value: str) -> tuple[str, float]:
+    page, _, ms = value.partition("=")
+    if not ms:
+        raise argparse.ArgumentTypeError("use PÁGINA=MS, ex.: principal.py=2500")
+    return page, float(ms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", nargs="+", default=list(BUDGETS_MS), choices=list(BUDGETS_MS))
+    parser.add_argument("--budget", type=parse_budget, action="append", default=[],
+                        help="orçamento de uma página em ms (PÁGINA=MS); pode ser repetido")
+    parser.add_argument("--first-element-budget", type=float, default=FIRST_ELEMENT_BUDGET_MS,
+                        help="orçamento de first_element_ms em ms, para todas as páginas")
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3, help="processos por página (vale o melhor)")
+    parser.add_argument("--top", type=int, default=8, help="importações listadas por página")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="grava o JSON neste arquivo em vez da saída padrão")
+    args = parser.parse_args()
+    args.budgets = {**BUDGETS_MS, **dict(args.budget)}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, "partida.db")
+        manager = get_manager(db_path)
+        generate_ledger(manager.get_connection(), args.rows, years=args.years, end_year=datetime.now().year, seed=args.seed)
+        manager.close()
+        pages = {page: measure(page, db_path, args) for page in args.pages}
+
+    report = {"rows": args.rows, "python": sys.version.split()[0], "pages": pages}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    over = [
+        (page, metric, result[metric], result[budget])
+        for page, result in pages.items()
+        for metric, budget in (("render_ms", "budget_ms"), ("first_element_ms", "first_element_budget_ms"))
+        if result[metric] > result[budget]
+    ]
+    for page, metric, value, budget in over:
+        print(f"{page}: {metric} = {value:.0f} ms, acima do orçamento de {budget:.0f} ms", file=sys.stderr)
+    sys.exit(1 if over else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+# src/__main__.py
+"""Inicia o aplicativo: ``python -m src [opções do streamlit run]``.
+
+Executado como módulo, o diretório do projeto já está no ``sys.path`` e as
+páginas importam ``src.*`` sem ajustar caminhos. As opções são repassadas
+ao ``streamlit run`` (ex.: ``python -m src --server.port 8080``).
+"""
+import os
+import sys
+
+from streamlit.web import cli
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "principal.py")
+
+
+def main():
+    sys.argv = ["streamlit", "run", APP, *sys.argv[1:]]
+    sys.exit(cli.main())
+
+
+if __name__ == "__main__":
+    main()
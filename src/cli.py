@@ -0,0 +1,227 @@
+# src/cli.py
+"""Comandos de linha de comando: ``python -m src.cli <comando> ...``"""
+import argparse
+import sys
+
+from src.database.connection import get_connection
+from src.repository.item_repository import ItemRepository
+from src.repository.transaction_repository import TransactionRepository
+
+
+def _find_item_id(item_repo: ItemRepository, label: str) -> int:
+    """Resolve um item a partir de ``"Nome (Categoria)"``."""
+    name, _, category = label.rpartition(" (")
+    item = item_repo.get_by_name_category(name, category.removesuffix(")")) if label.endswith(")") else None
+    if item is None:
+        raise SystemExit(f"Item não cadastrado: {label}")
+    return item.id
+
+
+def cmd_importar(args) -> None:
+    from src.services.importer import import_statement, load_rules
+
+    conn = get_connection()
+    item_repo = ItemRepository(conn)
+    transaction_repo = TransactionRepository(conn)
+
+    rules = load_rules(args.regras, item_repo) if args.regras else []
+    default_item_id = _find_item_id(item_repo, args.item_padrao) if args.item_padrao else None
+
+    with open(args.arquivo, encoding=args.encoding, newline="") as stream:
+        result, errors = import_statement(
+            stream, args.arquivo, transaction_repo, rules, default_item_id,
+            batch_size=args.lote, delimiter=args.delimitador, decimal=args.decimal
+        )
+
+    for message in errors.messages:
+        print(f"aviso: {message}", file=sys.stderr)
+    print(f"lidas: {result.read}  inseridas: {result.inserted}  duplicadas: {result.duplicates}  "
+          f"sem regra: {result.unmatched}  inválidas: {result.invalid}  de anos arquivados: {result.archived}")
+    print(f"{result.seconds:.2f} s ({result.rows_per_second:,.0f} linhas/s)")
+
+
+def cmd_saldos(args) -> None:
+    from src.repository.report_repository import ReportRepository
+
+    report_repo = ReportRepository(get_connection())
+    if args.reconstruir:
+        rows = report_repo.rebuild_balances()
+        print(f"monthly_balances reconstruída: {rows} linhas")
+        return
+
+    drift = report_repo.verify_balances()
+    for item_id, year, month, total, count, expected_total, expected_count in drift:
+        print(f"item {item_id} {month:02d}/{year}: gravado {total} ({count}), esperado {expected_total} ({expected_count})")
+    if drift:
+        raise SystemExit(f"{len(drift)} divergências encontradas; use --reconstruir para corrigir")
+    print("monthly_balances confere com transactions")
+
+
+def cmd_recorrencias(args) -> None:
+    from datetime import date
+
+    from src.repository.recurrence_repository import RecurrenceRepository
+    from src.services.recurrences import materialize
+
+    recurrence_repo = RecurrenceRepository(get_connection())
+    if args.materializar:
+        until = date.fromisoformat(args.ate) if args.ate else date.today()
+        inserted = materialize(recurrence_repo, until, batch_size=args.lote)
+        print(f"transações geradas até {until:%d/%m/%Y}: {inserted}")
+        return
+
+    for r in recurrence_repo.get_all():
+        end = f"até {r.end_date:%d/%m/%Y}" if r.end_date else "sem fim"
+        done = f"{r.materialized_until:%d/%m/%Y}" if r.materialized_until else "-"
+        print(f"{r.id}: item {r.item_id} {r.amount_cents / 100:.2f} {r.cadence.lower()} "
+              f"desde {r.start_date:%d/%m/%Y} {end}, gravada até {done}")
+
+
+def cmd_arquivo(args) -> None:
+    from src.repository.archive_repository import ArchiveRepository
+
+    archive_repo = ArchiveRepository(get_connection())
+    try:
+        if args.arquivar is not None:
+            for year in args.arquivar or archive_repo.closed_years():
+                archived = archive_repo.archive(year)
+                print(f"{year}: {archived.row_count} transações movidas para {archived.path}")
+        for year in args.restaurar or []:
+            restored = archive_repo.restore(year)
+            print(f"{year}: {restored} transações restauradas no banco principal")
+    except ValueError as e:
+        raise SystemExit(str(e))
+    if args.compactar:
+        print(f"banco principal compactado: {archive_repo.compact() / 2**20:.1f} MB liberados")
+
+    if args.verificar:
+        problems = archive_repo.verify()
+        for problem in problems:
+            print(problem)
+        if problems:
+            raise SystemExit(f"{len(problems)} problemas encontrados nos anos arquivados")
+        print("anos arquivados conferem com o banco principal")
+        return
+
+    for archived in archive_repo.get_all():
+        print(f"{archived.year}: {archived.row_count} transações, {archived.total_cents / 100:.2f} em {archived.path} "
+              f"(arquivado em {archived.archived_at[:19]})")
+
+
+def cmd_exportar(args) -> None:
+    import time
+    from datetime import date, datetime, timedelta
+
+    from src.models.transaction_filter import TransactionFilter
+    from src.services.export import export_ledger, format_from_path
+
+    try:
+        fmt = format_from_path(args.arquivo)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    conn = get_connection()
+    start = time.perf_counter()
+    if fmt == "xlsx":
+        from src.repository.recurrence_repository import RecurrenceRepository
+        from src.repository.report_repository import ReportRepository
+        from src.services.dashboard import load_matrix
+        from src.services.export import pivot_sheet, write_xlsx
+
+        report_repo, recurrence_repo = ReportRepository(conn), RecurrenceRepository(conn)
+        sheets = []
+        for year in args.ano or [datetime.now().year]:
+            matrix, month_columns = load_matrix(report_repo, year, datetime.now(), recurrence_repo)
+            sheets.append((str(year), pivot_sheet(matrix, month_columns)))
+        write_xlsx(sheets, args.arquivo)
+        print(f"{args.arquivo}: {len(sheets)} planilha(s) em {time.perf_counter() - start:.2f} s")
+        return
+
+    filters = TransactionFilter(
+        start=date.fromisoformat(args.inicio) if args.inicio else None,
+        end=date.fromisoformat(args.fim) + timedelta(days=1) if args.fim else None,
+    )
+    options = {"delimiter": args.delimitador, "decimal": args.decimal} if fmt == "csv" else {}
+    rows = export_ledger(TransactionRepository(conn), args.arquivo, fmt, filters, chunk_size=args.lote, **options)
+    elapsed = time.perf_counter() - start
+    print(f"{args.arquivo}: {rows} linhas em {elapsed:.2f} s ({rows / elapsed if elapsed else 0:,.0f} linhas/s)")
+
+
+def cmd_alteracoes(args) -> None:
+    from src.repository.journal_repository import JournalRepository
+    from src.services.export import export_changes
+
+    journal_repo = JournalRepository(get_connection())
+    if args.descartar_ate is not None:
+        print(f"{journal_repo.prune(args.descartar_ate)} alterações anteriores a {args.descartar_ate} descartadas")
+        return
+
+    try:
+        if args.saida:
+            with open(args.saida, "a", encoding="utf-8") as sink:
+                rows, seq = export_changes(journal_repo, sink, args.desde, args.tabela, chunk_size=args.lote)
+        else:
+            rows, seq = export_changes(journal_repo, sys.stdout, args.desde, args.tabela, chunk_size=args.lote)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    # Na saída de erro, para não misturar com as alterações exportadas em stdout
+    print(f"{rows} alterações; continue com --desde {seq}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Controle Financeiro")
+    commands = parser.add_subparsers(dest="comando", required=True)
+
+    importar = commands.add_parser("importar", help="importa um extrato CSV ou OFX")
+    importar.add_argument("arquivo")
+    importar.add_argument("--regras", help="JSON com as regras descrição -> item")
+    importar.add_argument("--item-padrao", help='item para linhas sem regra, no formato "Nome (Categoria)"')
+    importar.add_argument("--lote", type=int, default=20000, help="linhas por INSERT em lote")
+    importar.add_argument("--encoding", default="utf-8-sig")
+    importar.add_argument("--delimitador", help="delimitador do CSV (detectado se omitido)")
+    importar.add_argument("--decimal", choices=[",", "."], help="separador decimal dos valores (detectado se omitido)")
+    importar.set_defaults(func=cmd_importar)
+
+    saldos = commands.add_parser("saldos", help="verifica a tabela de totais mensais")
+    saldos.add_argument("--reconstruir", action="store_true", help="recalcula a tabela do zero")
+    saldos.set_defaults(func=cmd_saldos)
+
+    recorrencias = commands.add_parser("recorrencias", help="lista ou grava as recorrências agendadas")
+    recorrencias.add_argument("--materializar", action="store_true", help="grava as ocorrências como transações")
+    recorrencias.add_argument("--ate", help="última data gravada, AAAA-MM-DD (padrão: hoje)")
+    recorrencias.add_argument("--lote", type=int, default=10000, help="ocorrências por transação")
+    recorrencias.set_defaults(func=cmd_recorrencias)
+
+    arquivo = commands.add_parser("arquivo", help="lista, arquiva, restaura ou verifica anos arquivados")
+    arquivo.add_argument("--arquivar", type=int, nargs="*", metavar="ANO",
+                         help="move os anos para arquivos próprios (sem ANO: todos os anos encerrados)")
+    arquivo.add_argument("--restaurar", type=int, nargs="+", metavar="ANO", help="devolve os anos ao banco principal")
+    arquivo.add_argument("--verificar", action="store_true", help="confere os arquivos com o banco principal")
+    arquivo.add_argument("--compactar", action="store_true", help="devolve ao sistema o espaço liberado (VACUUM)")
+    arquivo.set_defaults(func=cmd_arquivo)
+
+    exportar = commands.add_parser("exportar", help="exporta transações (.csv, .parquet) ou a matriz anual (.xlsx)")
+    exportar.add_argument("arquivo", help="arquivo de saída; o formato vem da extensão")
+    exportar.add_argument("--inicio", help="primeira data, AAAA-MM-DD")
+    exportar.add_argument("--fim", help="última data, AAAA-MM-DD (inclusive)")
+    exportar.add_argument("--ano", type=int, action="append", help="ano da matriz no .xlsx (pode repetir; padrão: ano atual)")
+    exportar.add_argument("--delimitador", default=";", help="delimitador do CSV")
+    exportar.add_argument("--decimal", choices=[",", "."], default=",", help="separador decimal do CSV")
+    exportar.add_argument("--lote", type=int, default=65536, help="linhas lidas do banco por vez")
+    exportar.set_defaults(func=cmd_exportar)
+
+    alteracoes = commands.add_parser("alteracoes", help="exporta o histórico de alterações (JSON Lines) a partir de um seq")
+    alteracoes.add_argument("--desde", type=int, default=0, metavar="SEQ", help="exporta as alterações posteriores a SEQ")
+    alteracoes.add_argument("--saida", help="acrescenta ao arquivo em vez de escrever na saída padrão")
+    alteracoes.add_argument("--tabela", action="append", choices=["transactions", "items", "recurrences"],
+                            help="só alterações da tabela (pode repetir)")
+    alteracoes.add_argument("--lote", type=int, default=10000, help="alterações lidas do banco por vez")
+    alteracoes.add_argument("--descartar-ate", type=int, metavar="SEQ", help="descarta as alterações anteriores a SEQ")
+    alteracoes.set_defaults(func=cmd_alteracoes)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,264 @@
 # src/database/connection.py
-import sqlite3
 import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+
+from src.database.migrations import MIGRATIONS, SCHEMA_VERSION
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema.sql")
+
+
+@dataclass(frozen=True)
+class PragmaProfile:
+    """Pragmas aplicados a cada conexão aberta pelo gerenciador.
+
+    Qualquer campo pode ser sobrescrito por variável de ambiente
+    ``SQLITE_<CAMPO>`` (ex.: ``SQLITE_JOURNAL_MODE=DELETE``).
+    """
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    cache_size: int = -16000  # valores negativos são em KiB (~16 MB)
+    mmap_size: int = 128 * 1024 * 1024
+    temp_store: str = "MEMORY"
+    busy_timeout: int = 2000  # ms que o SQLite espera por um lock antes de SQLITE_BUSY
+
+    @classmethod
+    def from_env(cls) -> "PragmaProfile":
+        overrides = {}
+        for field in fields(cls):
+            raw = os.getenv(f"SQLITE_{field.name.upper()}")
+            if raw is not None:
+                overrides[field.name] = int(raw) if field.type is int else raw
+        return cls(**overrides)
+
+    def apply(self, conn: sqlite3.Connection) -> None:
+        for field in fields(self):
+            conn.execute(f"PRAGMA {field.name} = {getattr(self, field.name)}")
+
+
+class ConnectionManager:
+    """Uma conexão por thread para o mesmo banco, com o schema aplicado só
+    quando a versão gravada em ``PRAGMA user_version`` estiver desatualizada.
+
+    O diretório do banco e o schema são verificados uma única vez, na
+    primeira conexão do processo; as seguintes só aplicam os pragmas.
+
+    O Streamlit executa cada rerun (e cada rerun de fragmento ou callback)
+    em uma thread própria; com WAL, leitores em conexões separadas não
+    bloqueiam uns aos outros nem o escritor. As escritas passam por
+    ``write_transaction``, que as serializa. Conexões de threads já
+    encerradas são fechadas na próxima abertura: objetos que sobrevivem ao
+    rerun (repositórios em variáveis de módulo) não devem guardar uma
+    conexão, e sim pedir a da thread atual a cada uso (``get_connection``,
+    ou ``manager_of`` a partir de uma conexão recebida), como fazem os
+    repositórios.
+
+    ``path`` é o arquivo do banco, lido na primeira conexão. ``data_version``
+    é lido sempre na mesma conexão, reservada para isso e fechada junto com
+    as demais em ``close``.
+    """
+
+    def __init__(self, db_path: str, pragmas: PragmaProfile | None = None):
+        self.db_path = db_path
+        self.pragmas = pragmas or PragmaProfile()
+        self.lock = threading.RLock()
+        self.path: str | None = None
+        self._connections: dict[int, tuple[threading.Thread, sqlite3.Connection]] = {}
+        self._ready = False
+        self._probe: sqlite3.Connection | None = None
+        self._probe_lock = threading.Lock()
+
+    def get_connection(self) -> sqlite3.Connection:
+        thread = threading.current_thread()
+        with self.lock:
+            entry = self._connections.get(thread.ident)
+            if entry is not None and entry[0] is thread:
+                return entry[1]
+            self._close_finished()
+            conn = self._open()
+            self._connections[thread.ident] = (thread, conn)
+            _owners[id(conn)] = (conn, self)
+            return conn
+
+    def data_version(self) -> int:
+        """``PRAGMA data_version`` da conexão reservada: muda quando outra
+        conexão (de outra thread ou processo) grava no banco."""
+        with self._probe_lock:
+            if self._probe is None:
+                self._probe = sqlite3.connect(self.db_path, check_same_thread=False)
+            return self._probe.execute("PRAGMA data_version").fetchone()[0]
+
+    def close(self) -> None:
+        with self.lock:
+            for _, conn in self._connections.values():
+                _owners.pop(id(conn), None)
+                conn.close()
+            self._connections.clear()
+        with self._probe_lock:
+            if self._probe is not None:
+                self._probe.close()
+                self._probe = None
+
+    def _close_finished(self) -> None:
+        for ident, (thread, conn) in list(self._connections.items()):
+            if not thread.is_alive():
+                _owners.pop(id(conn), None)
+                conn.close()
+                del self._connections[ident]
+
+    def _open(self) -> sqlite3.Connection:
+        if not self._ready:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        # check_same_thread=False só para que _close_finished possa fechá-la
+        # a partir de outra thread; consultas e escritas usam sempre a conexão
+        # da thread atual (ver a docstring da classe)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.pragmas.apply(conn)
+        if not self._ready:
+            migrate(conn)
+            self.path = _main_database(conn)
+            self._ready = True
+        return conn
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version == 0:
+        # Bancos criados antes do versionamento já possuem o schema base
+        legacy = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'transactions'"
+        ).fetchone()
+        if legacy:
+            return 1
+    return version
+
+
+def migrate(conn: sqlite3.Connection) -> None:
+    """Cria o schema em bancos novos ou aplica as migrações pendentes."""
+    current = schema_version(conn)
+    if current >= SCHEMA_VERSION:
+        return
+
+    if current == 0:
+        with open(SCHEMA_PATH) as f:
+            _run_versioned(conn, f.read(), SCHEMA_VERSION)
+    else:
+        for version in range(current + 1, SCHEMA_VERSION + 1):
+            _run_versioned(conn, MIGRATIONS[version], version)
+
+
+def _run_versioned(conn: sqlite3.Connection, script: str, version: int) -> None:
+    """Executa o script e grava a nova versão em uma única transação."""
+    conn.executescript(f"BEGIN;\n{script}\nPRAGMA user_version = {version};\nCOMMIT;")
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Novas tentativas de iniciar uma escrita enquanto o banco estiver ocupado."""
+    attempts: int = 6
+    backoff: float = 0.05  # segundos; dobra a cada tentativa, com variação aleatória
+    max_backoff: float = 1.0
+
+
+DEFAULT_RETRY = RetryPolicy()
+
+_write_locks: dict[str | int, threading.RLock] = {}
+_write_locks_lock = threading.Lock()
+
+
+def _main_database(conn: sqlite3.Connection) -> str | None:
+    return conn.execute("PRAGMA database_list").fetchone()[2] or None
+
+
+def database_path(conn: sqlite3.Connection) -> str | None:
+    """Arquivo do banco principal da conexão; ``None`` para bancos em memória.
+
+    Para conexões do gerenciador, é o caminho guardado na primeira conexão,
+    sem consultar o banco.
+    """
+    manager = manager_of(conn)
+    if manager is not None:
+        return manager.path
+    return _main_database(conn)
+
+
+def is_busy(error: sqlite3.Error) -> bool:
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    return "locked" in str(error) or "busy" in str(error)
+
+
+def _write_lock(conn: sqlite3.Connection) -> threading.RLock:
+    key = database_path(conn) or id(conn)
+    with _write_locks_lock:
+        return _write_locks.setdefault(key, threading.RLock())
+
+
+@contextmanager
+def write_transaction(conn: sqlite3.Connection, retry: RetryPolicy = DEFAULT_RETRY):
+    """Executa o bloco como uma transação de escrita serializada.
+
+    As threads do processo entram uma de cada vez (um lock por arquivo de
+    banco) e ``BEGIN IMMEDIATE`` reserva a escrita antes do primeiro
+    comando: se outro processo estiver gravando, a tentativa é repetida com
+    espera exponencial até ``retry.attempts`` vezes. Confirma ao final do
+    bloco ou desfaz em caso de exceção. Dentro de uma transação já aberta,
+    apenas participa dela.
+    """
+    if conn.in_transaction:
+        yield conn
+        return
+
+    with _write_lock(conn):
+        delay = retry.backoff
+        for attempt in range(retry.attempts):
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                break
+            except sqlite3.OperationalError as e:
+                if not is_busy(e) or attempt == retry.attempts - 1:
+                    raise
+                time.sleep(delay * (1 + random.random()))
+                delay = min(delay * 2, retry.max_backoff)
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+
+_managers: dict[str, ConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+# Conexões abertas pelos gerenciadores, por id; a conexão é guardada para
+# que um id reaproveitado por outro objeto não seja confundido com ela
+_owners: dict[int, tuple[sqlite3.Connection, ConnectionManager]] = {}
+
+
+def manager_of(conn: sqlite3.Connection) -> ConnectionManager | None:
+    """Gerenciador que abriu ``conn``; None para conexões abertas fora dele."""
+    entry = _owners.get(id(conn))
+    return entry[1] if entry is not None and entry[0] is conn else None
+
+
+def get_manager(db_path: str | None = None) -> ConnectionManager:
+    db_path = db_path or os.getenv("DATABASE_URL", "data/financial.db")
+    with _managers_lock:
+        manager = _managers.get(db_path)
+        if manager is None:
+            manager = ConnectionManager(db_path, PragmaProfile.from_env())
+            _managers[db_path] = manager
+    return manager
+
 
-def get_connection():
-    db_path = os.getenv("DATABASE_URL", "data/financial.db")
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)
-    
-    conn = sqlite3.connect(db_path, check_same_thread=False)
-    
-    # Criar tabelas se não existirem
-    with open("src/database/schema.sql") as f:
-        conn.executescript(f.read())
-    
-    return conn
\ No newline at end of file
+def get_connection(db_path: str | None = None) -> sqlite3.Connection:
+    return get_manager(db_path).get_connection()
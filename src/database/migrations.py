@@ -0,0 +1,290 @@
+# src/database/migrations.py
+"""Migrações incrementais do schema.
+
+``schema.sql`` descreve sempre o schema completo da versão atual e é usado
+apenas em bancos novos. Bancos existentes recebem, em ordem, os scripts
+abaixo cuja versão seja maior que a gravada em ``PRAGMA user_version``.
+Cada script roda em uma transação própria junto com a atualização de
+``user_version``. Ao alterar o schema, atualize ``schema.sql`` e adicione
+aqui a migração correspondente.
+"""
+
+# A versão 1 é o schema original (tabelas items e transactions)
+MIGRATIONS: dict[int, str] = {
+    # Índices para consultas por período (date >= início AND date < fim)
+    2: """
+        CREATE INDEX IF NOT EXISTS idx_transactions_item_date ON transactions (item_id, date);
+        CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (date);
+    """,
+    # Valores em centavos inteiros com sinal no lugar de value REAL + type 'D'/'C'
+    3: """
+        CREATE TABLE transactions_cents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_id INTEGER NOT NULL,
+            amount_cents INTEGER NOT NULL,
+            is_completed BOOLEAN NOT NULL DEFAULT 0,
+            is_recurring BOOLEAN NOT NULL DEFAULT 0,
+            date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (item_id) REFERENCES items (id)
+        );
+        INSERT INTO transactions_cents (id, item_id, amount_cents, is_completed, is_recurring, date)
+        SELECT id, item_id,
+               CAST(ROUND(value * 100) AS INTEGER) * (CASE WHEN type = 'D' THEN -1 ELSE 1 END),
+               is_completed, is_recurring, date
+        FROM transactions;
+        DROP TABLE transactions;
+        ALTER TABLE transactions_cents RENAME TO transactions;
+        CREATE INDEX idx_transactions_item_date ON transactions (item_id, date);
+        CREATE INDEX idx_transactions_date ON transactions (date);
+    """,
+    # Hash das linhas importadas de extratos, usado para descartar duplicatas
+    4: """
+        ALTER TABLE transactions ADD COLUMN import_hash TEXT;
+        CREATE UNIQUE INDEX idx_transactions_import_hash ON transactions (import_hash) WHERE import_hash IS NOT NULL;
+    """,
+    # Tabela de totais mensais mantida por triggers, preenchida com o histórico
+    5: """
+        CREATE TABLE IF NOT EXISTS monthly_balances (
+            item_id INTEGER NOT NULL,
+            year INTEGER NOT NULL,
+            month INTEGER NOT NULL,
+            signed_total INTEGER NOT NULL,  -- centavos com sinal
+            count INTEGER NOT NULL,
+            PRIMARY KEY (item_id, year, month)
+        ) WITHOUT ROWID;
+
+        CREATE INDEX IF NOT EXISTS idx_monthly_balances_year ON monthly_balances (year, month);
+
+        -- Mantém monthly_balances atualizada a cada escrita em transactions
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_balance_insert AFTER INSERT ON transactions
+        BEGIN
+            INSERT INTO monthly_balances (item_id, year, month, signed_total, count)
+            VALUES (NEW.item_id, CAST(substr(NEW.date, 1, 4) AS INTEGER), CAST(substr(NEW.date, 6, 2) AS INTEGER), NEW.amount_cents, 1)
+            ON CONFLICT (item_id, year, month) DO UPDATE
+            SET signed_total = signed_total + excluded.signed_total, count = count + 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_balance_delete AFTER DELETE ON transactions
+        BEGIN
+            UPDATE monthly_balances
+            SET signed_total = signed_total - OLD.amount_cents, count = count - 1
+            WHERE item_id = OLD.item_id
+              AND year = CAST(substr(OLD.date, 1, 4) AS INTEGER)
+              AND month = CAST(substr(OLD.date, 6, 2) AS INTEGER);
+            DELETE FROM monthly_balances
+            WHERE item_id = OLD.item_id
+              AND year = CAST(substr(OLD.date, 1, 4) AS INTEGER)
+              AND month = CAST(substr(OLD.date, 6, 2) AS INTEGER)
+              AND count <= 0;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_balance_update AFTER UPDATE OF item_id, amount_cents, date ON transactions
+        BEGIN
+            UPDATE monthly_balances
+            SET signed_total = signed_total - OLD.amount_cents, count = count - 1
+            WHERE item_id = OLD.item_id
+              AND year = CAST(substr(OLD.date, 1, 4) AS INTEGER)
+              AND month = CAST(substr(OLD.date, 6, 2) AS INTEGER);
+            DELETE FROM monthly_balances
+            WHERE item_id = OLD.item_id
+              AND year = CAST(substr(OLD.date, 1, 4) AS INTEGER)
+              AND month = CAST(substr(OLD.date, 6, 2) AS INTEGER)
+              AND count <= 0;
+            INSERT INTO monthly_balances (item_id, year, month, signed_total, count)
+            VALUES (NEW.item_id, CAST(substr(NEW.date, 1, 4) AS INTEGER), CAST(substr(NEW.date, 6, 2) AS INTEGER), NEW.amount_cents, 1)
+            ON CONFLICT (item_id, year, month) DO UPDATE
+            SET signed_total = signed_total + excluded.signed_total, count = count + 1;
+        END;
+
+        INSERT INTO monthly_balances (item_id, year, month, signed_total, count)
+        SELECT item_id, CAST(substr(date, 1, 4) AS INTEGER), CAST(substr(date, 6, 2) AS INTEGER),
+               SUM(amount_cents), COUNT(*)
+        FROM transactions
+        GROUP BY 1, 2, 3;
+    """,
+    # Recorrências agendadas e o vínculo das transações geradas a partir delas
+    6: """
+        CREATE TABLE IF NOT EXISTS recurrences (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_id INTEGER NOT NULL,
+            amount_cents INTEGER NOT NULL,
+            interval_months INTEGER NOT NULL DEFAULT 1,
+            start_date TEXT NOT NULL,
+            end_date TEXT,
+            materialized_until TEXT,
+            FOREIGN KEY (item_id) REFERENCES items (id)
+        );
+        ALTER TABLE transactions ADD COLUMN recurrence_id INTEGER REFERENCES recurrences (id);
+        CREATE UNIQUE INDEX idx_transactions_recurrence ON transactions (recurrence_id, date) WHERE recurrence_id IS NOT NULL;
+    """,
+    # Itens únicos por (nome, categoria) e busca por trecho do nome/categoria.
+    # Itens repetidos são unidos no de menor id antes de criar o índice.
+    7: """
+        CREATE TEMP TABLE item_duplicates AS
+        SELECT i.id, k.keep
+        FROM items i
+        JOIN (SELECT name, category, MIN(id) AS keep FROM items GROUP BY name, category HAVING COUNT(*) > 1) k
+          ON k.name = i.name AND k.category = i.category
+        WHERE i.id <> k.keep;
+        UPDATE transactions SET item_id = (SELECT keep FROM item_duplicates WHERE id = transactions.item_id)
+        WHERE item_id IN (SELECT id FROM item_duplicates);
+        UPDATE recurrences SET item_id = (SELECT keep FROM item_duplicates WHERE id = recurrences.item_id)
+        WHERE item_id IN (SELECT id FROM item_duplicates);
+        DELETE FROM items WHERE id IN (SELECT id FROM item_duplicates);
+        DROP TABLE item_duplicates;
+
+        CREATE UNIQUE INDEX idx_items_name_category ON items (name, category);
+
+        CREATE VIRTUAL TABLE items_fts USING fts5(name, category, content='items', content_rowid='id', tokenize='trigram');
+
+        CREATE TRIGGER trg_items_fts_insert AFTER INSERT ON items
+        BEGIN
+            INSERT INTO items_fts (rowid, name, category) VALUES (NEW.id, NEW.name, NEW.category);
+        END;
+
+        CREATE TRIGGER trg_items_fts_delete AFTER DELETE ON items
+        BEGIN
+            INSERT INTO items_fts (items_fts, rowid, name, category) VALUES ('delete', OLD.id, OLD.name, OLD.category);
+        END;
+
+        CREATE TRIGGER trg_items_fts_update AFTER UPDATE OF name, category ON items
+        BEGIN
+            INSERT INTO items_fts (items_fts, rowid, name, category) VALUES ('delete', OLD.id, OLD.name, OLD.category);
+            INSERT INTO items_fts (rowid, name, category) VALUES (NEW.id, NEW.name, NEW.category);
+        END;
+
+        INSERT INTO items_fts (items_fts) VALUES ('rebuild');
+    """,
+    # Anos movidos para bancos anuais separados; transações desses anos não
+    # podem mais ser gravadas no banco principal
+    8: """
+        CREATE TABLE archived_years (
+            year INTEGER PRIMARY KEY,
+            path TEXT NOT NULL,
+            row_count INTEGER NOT NULL,
+            total_cents INTEGER NOT NULL,
+            archived_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+        );
+
+        CREATE TRIGGER trg_transactions_archived_insert BEFORE INSERT ON transactions
+        WHEN EXISTS (SELECT 1 FROM archived_years WHERE year = CAST(substr(NEW.date, 1, 4) AS INTEGER))
+        BEGIN
+            SELECT RAISE(ABORT, 'ano arquivado');
+        END;
+
+        CREATE TRIGGER trg_transactions_archived_update BEFORE UPDATE OF date ON transactions
+        WHEN EXISTS (SELECT 1 FROM archived_years WHERE year = CAST(substr(NEW.date, 1, 4) AS INTEGER))
+        BEGIN
+            SELECT RAISE(ABORT, 'ano arquivado');
+        END;
+    """,
+    # Histórico de alterações (change_log) gravado por triggers na mesma
+    # transação de cada escrita, e os lotes da matriz que podem ser desfeitos
+    9: """
+        CREATE TABLE change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            op TEXT NOT NULL,
+            table_name TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            old_values TEXT,
+            new_values TEXT
+        );
+
+        CREATE TABLE change_batches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            scope TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            reverts INTEGER REFERENCES change_batches (id),
+            first_seq INTEGER NOT NULL,
+            last_seq INTEGER NOT NULL,
+            created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+        );
+
+        CREATE INDEX idx_change_batches_scope ON change_batches (scope, id);
+
+        CREATE TABLE change_log_pause (paused INTEGER PRIMARY KEY);
+
+        CREATE TRIGGER trg_transactions_journal_insert AFTER INSERT ON transactions
+        WHEN NOT EXISTS (SELECT 1 FROM change_log_pause)
+        BEGIN
+            INSERT INTO change_log (op, table_name, row_id, new_values)
+            VALUES ('I', 'transactions', NEW.id, json_array(NEW.item_id, NEW.amount_cents, NEW.is_completed, NEW.is_recurring, NEW.date, NEW.import_hash, NEW.recurrence_id));
+        END;
+
+        CREATE TRIGGER trg_transactions_journal_update AFTER UPDATE ON transactions
+        WHEN NOT EXISTS (SELECT 1 FROM change_log_pause)
+        AND (OLD.item_id IS NOT NEW.item_id
+             OR OLD.amount_cents IS NOT NEW.amount_cents
+             OR OLD.is_completed IS NOT NEW.is_completed
+             OR OLD.is_recurring IS NOT NEW.is_recurring
+             OR OLD.date IS NOT NEW.date
+             OR OLD.import_hash IS NOT NEW.import_hash
+             OR OLD.recurrence_id IS NOT NEW.recurrence_id)
+        BEGIN
+            INSERT INTO change_log (op, table_name, row_id, old_values, new_values)
+            VALUES ('U', 'transactions', NEW.id, json_array(OLD.item_id, OLD.amount_cents, OLD.is_completed, OLD.is_recurring, OLD.date, OLD.import_hash, OLD.recurrence_id),
+                    json_array(NEW.item_id, NEW.amount_cents, NEW.is_completed, NEW.is_recurring, NEW.date, NEW.import_hash, NEW.recurrence_id));
+        END;
+
+        CREATE TRIGGER trg_transactions_journal_delete AFTER DELETE ON transactions
+        WHEN NOT EXISTS (SELECT 1 FROM change_log_pause)
+        BEGIN
+            INSERT INTO change_log (op, table_name, row_id, old_values)
+            VALUES ('D', 'transactions', OLD.id, json_array(OLD.item_id, OLD.amount_cents, OLD.is_completed, OLD.is_recurring, OLD.date, OLD.import_hash, OLD.recurrence_id));
+        END;
+
+        CREATE TRIGGER trg_items_journal_insert AFTER INSERT ON items
+        WHEN NOT EXISTS (SELECT 1 FROM change_log_pause)
+        BEGIN
+            INSERT INTO change_log (op, table_name, row_id, new_values)
+            VALUES ('I', 'items', NEW.id, json_array(NEW.name, NEW.category));
+        END;
+
+        CREATE TRIGGER trg_items_journal_update AFTER UPDATE ON items
+        WHEN NOT EXISTS (SELECT 1 FROM change_log_pause)
+        AND (OLD.name IS NOT NEW.name
+             OR OLD.category IS NOT NEW.category)
+        BEGIN
+            INSERT INTO change_log (op, table_name, row_id, old_values, new_values)
+            VALUES ('U', 'items', NEW.id, json_array(OLD.name, OLD.category),
+                    json_array(NEW.name, NEW.category));
+        END;
+
+        CREATE TRIGGER trg_items_journal_delete AFTER DELETE ON items
+        WHEN NOT EXISTS (SELECT 1 FROM change_log_pause)
+        BEGIN
+            INSERT INTO change_log (op, table_name, row_id, old_values)
+            VALUES ('D', 'items', OLD.id, json_array(OLD.name, OLD.category));
+        END;
+
+        CREATE TRIGGER trg_recurrences_journal_insert AFTER INSERT ON recurrences
+        WHEN NOT EXISTS (SELECT 1 FROM change_log_pause)
+        BEGIN
+            INSERT INTO change_log (op, table_name, row_id, new_values)
+            VALUES ('I', 'recurrences', NEW.id, json_array(NEW.item_id, NEW.amount_cents, NEW.interval_months, NEW.start_date, NEW.end_date, NEW.materialized_until));
+        END;
+
+        CREATE TRIGGER trg_recurrences_journal_update AFTER UPDATE ON recurrences
+        WHEN NOT EXISTS (SELECT 1 FROM change_log_pause)
+        AND (OLD.item_id IS NOT NEW.item_id
+             OR OLD.amount_cents IS NOT NEW.amount_cents
+             OR OLD.interval_months IS NOT NEW.interval_months
+             OR OLD.start_date IS NOT NEW.start_date
+             OR OLD.end_date IS NOT NEW.end_date
+             OR OLD.materialized_until IS NOT NEW.materialized_until)
+        BEGIN
+            INSERT INTO change_log (op, table_name, row_id, old_values, new_values)
+            VALUES ('U', 'recurrences', NEW.id, json_array(OLD.item_id, OLD.amount_cents, OLD.interval_months, OLD.start_date, OLD.end_date, OLD.materialized_until),
+                    json_array(NEW.item_id, NEW.amount_cents, NEW.interval_months, NEW.start_date, NEW.end_date, NEW.materialized_until));
+        END;
+
+        CREATE TRIGGER trg_recurrences_journal_delete AFTER DELETE ON recurrences
+        WHEN NOT EXISTS (SELECT 1 FROM change_log_pause)
+        BEGIN
+            INSERT INTO change_log (op, table_name, row_id, old_values)
+            VALUES ('D', 'recurrences', OLD.id, json_array(OLD.item_id, OLD.amount_cents, OLD.interval_months, OLD.start_date, OLD.end_date, OLD.materialized_until));
+        END;
+    """,
+}
+
+SCHEMA_VERSION = max(MIGRATIONS, default=1)
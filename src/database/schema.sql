@@ -4,13 +4,243 @@ CREATE TABLE IF NOT EXISTS items (
     category TEXT NOT NULL
 );
 
+CREATE UNIQUE INDEX IF NOT EXISTS idx_items_name_category ON items (name, category);
+
+-- Índice de busca por trecho (3+ caracteres) do nome e da categoria, sem
+-- diferenciar maiúsculas; o conteúdo fica em items e é mantido pelos triggers
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(name, category, content='items', content_rowid='id', tokenize='trigram');
+
+CREATE TRIGGER IF NOT EXISTS trg_items_fts_insert AFTER INSERT ON items
+BEGIN
+    INSERT INTO items_fts (rowid, name, category) VALUES (NEW.id, NEW.name, NEW.category);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_items_fts_delete AFTER DELETE ON items
+BEGIN
+    INSERT INTO items_fts (items_fts, rowid, name, category) VALUES ('delete', OLD.id, OLD.name, OLD.category);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_items_fts_update AFTER UPDATE OF name, category ON items
+BEGIN
+    INSERT INTO items_fts (items_fts, rowid, name, category) VALUES ('delete', OLD.id, OLD.name, OLD.category);
+    INSERT INTO items_fts (rowid, name, category) VALUES (NEW.id, NEW.name, NEW.category);
+END;
+
 CREATE TABLE IF NOT EXISTS transactions (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     item_id INTEGER NOT NULL,
-    value REAL NOT NULL,
-    type TEXT NOT NULL,
+    amount_cents INTEGER NOT NULL,  -- centavos com sinal: débitos negativos
     is_completed BOOLEAN NOT NULL DEFAULT 0,
     is_recurring BOOLEAN NOT NULL DEFAULT 0,
     date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    import_hash TEXT,  -- identifica linhas importadas de extratos
+    recurrence_id INTEGER,  -- recorrência que gerou a transação, se houver
+    FOREIGN KEY (item_id) REFERENCES items (id),
+    FOREIGN KEY (recurrence_id) REFERENCES recurrences (id)
+);
+
+-- Lançamentos agendados: a cada interval_months meses, no dia de start_date
+CREATE TABLE IF NOT EXISTS recurrences (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    item_id INTEGER NOT NULL,
+    amount_cents INTEGER NOT NULL,  -- centavos com sinal: débitos negativos
+    interval_months INTEGER NOT NULL DEFAULT 1,  -- 1 mensal, 12 anual, N a cada N meses
+    start_date TEXT NOT NULL,
+    end_date TEXT,  -- inclusivo; NULL sem fim
+    materialized_until TEXT,  -- última data já gravada em transactions
     FOREIGN KEY (item_id) REFERENCES items (id)
-);
\ No newline at end of file
+);
+
+-- Anos movidos para bancos anuais separados (ver repository/partitions.py);
+-- path é relativo ao diretório do banco principal
+CREATE TABLE IF NOT EXISTS archived_years (
+    year INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    row_count INTEGER NOT NULL,
+    total_cents INTEGER NOT NULL,  -- soma em centavos com sinal, conferida na verificação
+    archived_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))  -- identifica o arquivamento (ver ArchivedYear.schema)
+);
+
+-- Anos arquivados são somente leitura: restaure o ano antes de gravar nele
+CREATE TRIGGER IF NOT EXISTS trg_transactions_archived_insert BEFORE INSERT ON transactions
+WHEN EXISTS (SELECT 1 FROM archived_years WHERE year = CAST(substr(NEW.date, 1, 4) AS INTEGER))
+BEGIN
+    SELECT RAISE(ABORT, 'ano arquivado');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_archived_update BEFORE UPDATE OF date ON transactions
+WHEN EXISTS (SELECT 1 FROM archived_years WHERE year = CAST(substr(NEW.date, 1, 4) AS INTEGER))
+BEGIN
+    SELECT RAISE(ABORT, 'ano arquivado');
+END;
+
+CREATE INDEX IF NOT EXISTS idx_transactions_item_date ON transactions (item_id, date);
+CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (date);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_import_hash ON transactions (import_hash) WHERE import_hash IS NOT NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_recurrence ON transactions (recurrence_id, date) WHERE recurrence_id IS NOT NULL;
+
+-- Totais mensais por item, mantidos pelos triggers abaixo
+CREATE TABLE IF NOT EXISTS monthly_balances (
+    item_id INTEGER NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    signed_total INTEGER NOT NULL,  -- centavos com sinal
+    count INTEGER NOT NULL,
+    PRIMARY KEY (item_id, year, month)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_monthly_balances_year ON monthly_balances (year, month);
+
+-- Mantém monthly_balances atualizada a cada escrita em transactions
+CREATE TRIGGER IF NOT EXISTS trg_transactions_balance_insert AFTER INSERT ON transactions
+BEGIN
+    INSERT INTO monthly_balances (item_id, year, month, signed_total, count)
+    VALUES (NEW.item_id, CAST(substr(NEW.date, 1, 4) AS INTEGER), CAST(substr(NEW.date, 6, 2) AS INTEGER), NEW.amount_cents, 1)
+    ON CONFLICT (item_id, year, month) DO UPDATE
+    SET signed_total = signed_total + excluded.signed_total, count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_balance_delete AFTER DELETE ON transactions
+BEGIN
+    UPDATE monthly_balances
+    SET signed_total = signed_total - OLD.amount_cents, count = count - 1
+    WHERE item_id = OLD.item_id
+      AND year = CAST(substr(OLD.date, 1, 4) AS INTEGER)
+      AND month = CAST(substr(OLD.date, 6, 2) AS INTEGER);
+    DELETE FROM monthly_balances
+    WHERE item_id = OLD.item_id
+      AND year = CAST(substr(OLD.date, 1, 4) AS INTEGER)
+      AND month = CAST(substr(OLD.date, 6, 2) AS INTEGER)
+      AND count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_balance_update AFTER UPDATE OF item_id, amount_cents, date ON transactions
+BEGIN
+    UPDATE monthly_balances
+    SET signed_total = signed_total - OLD.amount_cents, count = count - 1
+    WHERE item_id = OLD.item_id
+      AND year = CAST(substr(OLD.date, 1, 4) AS INTEGER)
+      AND month = CAST(substr(OLD.date, 6, 2) AS INTEGER);
+    DELETE FROM monthly_balances
+    WHERE item_id = OLD.item_id
+      AND year = CAST(substr(OLD.date, 1, 4) AS INTEGER)
+      AND month = CAST(substr(OLD.date, 6, 2) AS INTEGER)
+      AND count <= 0;
+    INSERT INTO monthly_balances (item_id, year, month, signed_total, count)
+    VALUES (NEW.item_id, CAST(substr(NEW.date, 1, 4) AS INTEGER), CAST(substr(NEW.date, 6, 2) AS INTEGER), NEW.amount_cents, 1)
+    ON CONFLICT (item_id, year, month) DO UPDATE
+    SET signed_total = signed_total + excluded.signed_total, count = count + 1;
+END;
+
+-- Histórico das gravações em transactions, items e recurrences, gravado
+-- pelos triggers abaixo na mesma transação da escrita (ver
+-- repository/journal_repository.py). op: 'I' inclusão, 'U' alteração,
+-- 'D' exclusão; 'A'/'R' marcam o arquivamento/restauração do ano row_id.
+-- old_values/new_values: valores das colunas (sem o id) em um array JSON
+CREATE TABLE IF NOT EXISTS change_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    op TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    row_id INTEGER NOT NULL,
+    old_values TEXT,
+    new_values TEXT
+);
+
+-- Lotes de entradas que podem ser desfeitos juntos (edições da matriz);
+-- kind: 'edit', 'undo' ou 'redo' (estes revertem o lote reverts)
+CREATE TABLE IF NOT EXISTS change_batches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scope TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    reverts INTEGER REFERENCES change_batches (id),
+    first_seq INTEGER NOT NULL,
+    last_seq INTEGER NOT NULL,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_change_batches_scope ON change_batches (scope, id);
+
+-- Com uma linha aqui (só dentro de uma transação), os triggers não registram
+-- nada: usado ao mover anos entre o banco principal e os arquivos
+CREATE TABLE IF NOT EXISTS change_log_pause (paused INTEGER PRIMARY KEY);
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_journal_insert AFTER INSERT ON transactions
+WHEN NOT EXISTS (SELECT 1 FROM change_log_pause)
+BEGIN
+    INSERT INTO change_log (op, table_name, row_id, new_values)
+    VALUES ('I', 'transactions', NEW.id, json_array(NEW.item_id, NEW.amount_cents, NEW.is_completed, NEW.is_recurring, NEW.date, NEW.import_hash, NEW.recurrence_id));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_journal_update AFTER UPDATE ON transactions
+WHEN NOT EXISTS (SELECT 1 FROM change_log_pause)
+AND (OLD.item_id IS NOT NEW.item_id
+     OR OLD.amount_cents IS NOT NEW.amount_cents
+     OR OLD.is_completed IS NOT NEW.is_completed
+     OR OLD.is_recurring IS NOT NEW.is_recurring
+     OR OLD.date IS NOT NEW.date
+     OR OLD.import_hash IS NOT NEW.import_hash
+     OR OLD.recurrence_id IS NOT NEW.recurrence_id)
+BEGIN
+    INSERT INTO change_log (op, table_name, row_id, old_values, new_values)
+    VALUES ('U', 'transactions', NEW.id, json_array(OLD.item_id, OLD.amount_cents, OLD.is_completed, OLD.is_recurring, OLD.date, OLD.import_hash, OLD.recurrence_id),
+            json_array(NEW.item_id, NEW.amount_cents, NEW.is_completed, NEW.is_recurring, NEW.date, NEW.import_hash, NEW.recurrence_id));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_journal_delete AFTER DELETE ON transactions
+WHEN NOT EXISTS (SELECT 1 FROM change_log_pause)
+BEGIN
+    INSERT INTO change_log (op, table_name, row_id, old_values)
+    VALUES ('D', 'transactions', OLD.id, json_array(OLD.item_id, OLD.amount_cents, OLD.is_completed, OLD.is_recurring, OLD.date, OLD.import_hash, OLD.recurrence_id));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_items_journal_insert AFTER INSERT ON items
+WHEN NOT EXISTS (SELECT 1 FROM change_log_pause)
+BEGIN
+    INSERT INTO change_log (op, table_name, row_id, new_values)
+    VALUES ('I', 'items', NEW.id, json_array(NEW.name, NEW.category));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_items_journal_update AFTER UPDATE ON items
+WHEN NOT EXISTS (SELECT 1 FROM change_log_pause)
+AND (OLD.name IS NOT NEW.name
+     OR OLD.category IS NOT NEW.category)
+BEGIN
+    INSERT INTO change_log (op, table_name, row_id, old_values, new_values)
+    VALUES ('U', 'items', NEW.id, json_array(OLD.name, OLD.category),
+            json_array(NEW.name, NEW.category));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_items_journal_delete AFTER DELETE ON items
+WHEN NOT EXISTS (SELECT 1 FROM change_log_pause)
+BEGIN
+    INSERT INTO change_log (op, table_name, row_id, old_values)
+    VALUES ('D', 'items', OLD.id, json_array(OLD.name, OLD.category));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_recurrences_journal_insert AFTER INSERT ON recurrences
+WHEN NOT EXISTS (SELECT 1 FROM change_log_pause)
+BEGIN
+    INSERT INTO change_log (op, table_name, row_id, new_values)
+    VALUES ('I', 'recurrences', NEW.id, json_array(NEW.item_id, NEW.amount_cents, NEW.interval_months, NEW.start_date, NEW.end_date, NEW.materialized_until));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_recurrences_journal_update AFTER UPDATE ON recurrences
+WHEN NOT EXISTS (SELECT 1 FROM change_log_pause)
+AND (OLD.item_id IS NOT NEW.item_id
+     OR OLD.amount_cents IS NOT NEW.amount_cents
+     OR OLD.interval_months IS NOT NEW.interval_months
+     OR OLD.start_date IS NOT NEW.start_date
+     OR OLD.end_date IS NOT NEW.end_date
+     OR OLD.materialized_until IS NOT NEW.materialized_until)
+BEGIN
+    INSERT INTO change_log (op, table_name, row_id, old_values, new_values)
+    VALUES ('U', 'recurrences', NEW.id, json_array(OLD.item_id, OLD.amount_cents, OLD.interval_months, OLD.start_date, OLD.end_date, OLD.materialized_until),
+            json_array(NEW.item_id, NEW.amount_cents, NEW.interval_months, NEW.start_date, NEW.end_date, NEW.materialized_until));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_recurrences_journal_delete AFTER DELETE ON recurrences
+WHEN NOT EXISTS (SELECT 1 FROM change_log_pause)
+BEGIN
+    INSERT INTO change_log (op, table_name, row_id, old_values)
+    VALUES ('D', 'recurrences', OLD.id, json_array(OLD.item_id, OLD.amount_cents, OLD.interval_months, OLD.start_date, OLD.end_date, OLD.materialized_until));
+END;
@@ -0,0 +1,16 @@
+# src/models/archived_year.py
+from dataclasses import dataclass
+
+@dataclass(slots=True)
+class ArchivedYear:
+    year: int = 0
+    path: str = ""  # arquivo do ano, relativo ao diretório do banco principal
+    row_count: int = 0
+    total_cents: int = 0  # soma com sinal das transações do ano
+    archived_at: str = ""
+
+    @property
+    def schema(self) -> str:
+        """Nome do banco anexado; muda a cada arquivamento do mesmo ano."""
+        stamp = "".join(ch for ch in self.archived_at if ch.isdigit())
+        return f"archive_{self.year}_{stamp}"
@@ -0,0 +1,29 @@
+# src/models/change.py
+from dataclasses import dataclass
+
+# Operações registradas em change_log
+OPERATIONS = {"I": "inclusão", "U": "alteração", "D": "exclusão", "A": "arquivamento", "R": "restauração"}
+
+@dataclass(slots=True)
+class Change:
+    seq: int = 0
+    op: str = ""  # chave de OPERATIONS
+    table: str = ""
+    row_id: int = 0  # id da linha; o ano em arquivamentos e restaurações
+    old: dict | None = None  # colunas antes da alteração (sem o id); None em inclusões
+    new: dict | None = None  # colunas depois da alteração; None em exclusões
+
+    def values(self) -> list[dict]:
+        """Os estados da linha presentes na entrada: antes e/ou depois."""
+        return [values for values in (self.old, self.new) if values is not None]
+
+
+@dataclass(slots=True)
+class ChangeBatch:
+    id: int = 0
+    scope: str = ""  # quem gravou o lote, ex.: 'matrix'
+    kind: str = "edit"  # 'edit', 'undo' ou 'redo'
+    reverts: int | None = None  # lote revertido por 'undo' e 'redo'
+    first_seq: int = 0
+    last_seq: int = 0
+    created_at: str = ""
@@ -1,7 +1,7 @@
 # src/models/item.py
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(slots=True)
 class Item:
     id: int | None = None
     name: str = ""
@@ -0,0 +1,11 @@
+# src/models/monthly_total.py
+from dataclasses import dataclass
+
+@dataclass
+class MonthlyTotal:
+    item_id: int = 0
+    name: str = ""
+    category: str = ""
+    month: int = 0
+    total_cents: int = 0  # soma com sinal: créditos positivos, débitos negativos
+    year: int = 0
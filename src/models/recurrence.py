@@ -0,0 +1,23 @@
+# src/models/recurrence.py
+from dataclasses import dataclass, field
+from datetime import date
+
+# Cadências oferecidas na interface, em meses entre as ocorrências
+CADENCES = {"Mensal": 1, "Bimestral": 2, "Trimestral": 3, "Semestral": 6, "Anual": 12}
+
+@dataclass(slots=True)
+class Recurrence:
+    id: int | None = None
+    item_id: int = 0
+    amount_cents: int = 0  # centavos com sinal: negativo para débito
+    interval_months: int = 1
+    start_date: date = field(default_factory=date.today)  # primeira ocorrência; o dia se repete
+    end_date: date | None = None  # inclusivo
+    materialized_until: date | None = None  # última data já gravada em transactions
+
+    @property
+    def cadence(self) -> str:
+        for name, months in CADENCES.items():
+            if months == self.interval_months:
+                return name
+        return f"A cada {self.interval_months} meses"
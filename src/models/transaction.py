@@ -1,8 +1,9 @@
 # src/models/transaction.py
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 
-@dataclass
+@dataclass(slots=True)
 class Transaction:
     id: int | None = None
     item_id: int = 0
@@ -12,12 +13,29 @@ class Transaction:
     is_recurring: bool = False
     date: datetime = datetime.now()
 
+    @property
+    def amount_cents(self) -> int:
+        """Valor em centavos com sinal: negativo para débito, positivo para crédito"""
+        cents = round(self.value * 100)
+        return -cents if self.type == "D" else cents
+
+    @amount_cents.setter
+    def amount_cents(self, cents: int) -> None:
+        self.value = abs(cents) / 100
+        self.type = "D" if cents < 0 else "C"
+
     @staticmethod
     def format_date(date_str: str) -> datetime:
         """Converte string de data para datetime"""
         if isinstance(date_str, datetime):
             return date_str
         try:
-            return datetime.strptime(date_str, "%Y-%m-%d")
+            return _parse_date(date_str)
         except ValueError:
-            return datetime.now()
\ No newline at end of file
+            return datetime.now()
+
+
+@lru_cache(maxsize=8192)
+def _parse_date(date_str: str) -> datetime:
+    # Poucas datas distintas se repetem em muitas linhas; datetime é imutável
+    return datetime.fromisoformat(date_str)
\ No newline at end of file
@@ -0,0 +1,13 @@
+# src/models/transaction_filter.py
+from dataclasses import dataclass
+from datetime import date
+
+@dataclass
+class TransactionFilter:
+    start: date | None = None  # inclusivo
+    end: date | None = None  # exclusivo
+    item_id: int | None = None
+    category: str | None = None
+    is_completed: bool | None = None
+    min_value: float | None = None  # valor absoluto, em reais
+    max_value: float | None = None
@@ -0,0 +1,99 @@
+# src/pages/exportacao.py
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import streamlit as st
+from src.database.connection import get_connection
+from src.models.transaction_filter import TransactionFilter
+from src.repository.recurrence_repository import RecurrenceRepository
+from src.repository.report_repository import ReportRepository
+from src.repository.transaction_repository import TransactionRepository
+
+MIME_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# Repositórios do banco; cada uso pega a conexão da thread atual (rerun,
+# fragmento ou callback), não a da thread que carregou a página
+transaction_repo = TransactionRepository(get_connection())
+report_repo = ReportRepository(get_connection())
+recurrence_repo = RecurrenceRepository(get_connection())
+
+# Título principal
+st.title("Controle Financeiro - Exportação")
+
+
+def prepare(fmt: str, write) -> None:
+    """Gera o arquivo em disco, em blocos, e guarda o caminho na sessão.
+
+    O arquivo anterior da sessão é apagado; o download só é oferecido
+    depois que o arquivo está pronto.
+    """
+    previous = st.session_state.pop("export_file", None)
+    if previous and os.path.exists(previous[0]):
+        os.remove(previous[0])
+    handle, path = tempfile.mkstemp(suffix=f".{fmt}")
+    os.close(handle)
+    with st.spinner("Gerando arquivo..."):
+        write(path)
+    st.session_state["export_file"] = (path, fmt)
+
+
+col1, col2 = st.columns(2)
+
+with col1:
+    st.subheader("Transações")
+    with st.form("ledger_export_form"):
+        period = st.date_input("Período (vazio para todas)", value=(), format="DD/MM/YYYY")
+        fmt = st.selectbox("Formato", options=["csv", "parquet"], format_func=lambda f: {"csv": "CSV (Excel pt-BR)", "parquet": "Parquet"}[f])
+        submit_ledger = st.form_submit_button("Gerar arquivo")
+
+    if submit_ledger:
+        # pandas e PyArrow só são importados ao gerar um arquivo
+        from src.services.export import export_ledger
+
+        filters = TransactionFilter(
+            start=period[0] if len(period) > 0 else None,
+            end=period[1] + timedelta(days=1) if len(period) > 1 else None,
+        )
+        prepare(fmt, lambda path: st.session_state.__setitem__(
+            "export_rows", export_ledger(transaction_repo, path, fmt, filters)
+        ))
+
+with col2:
+    st.subheader("Matriz anual")
+    with st.form("pivot_export_form"):
+        years = report_repo.get_years()
+        selected_years = st.multiselect("Anos", options=years, default=years[-1:])
+        submit_pivot = st.form_submit_button("Gerar planilha")
+
+    if submit_pivot and selected_years:
+        from src.services.dashboard import load_matrix
+        from src.services.export import pivot_sheet, write_xlsx
+
+        def write_pivot(path: str) -> None:
+            sheets = []
+            for year in selected_years:
+                matrix, month_columns = load_matrix(report_repo, year, datetime.now(), recurrence_repo)
+                sheets.append((str(year), pivot_sheet(matrix, month_columns)))
+            write_xlsx(sheets, path)
+            st.session_state["export_rows"] = None
+        prepare("xlsx", write_pivot)
+
+export_file = st.session_state.get("export_file")
+if export_file and os.path.exists(export_file[0]):
+    path, fmt = export_file
+    rows = st.session_state.get("export_rows")
+    size = os.path.getsize(path) / 1024 / 1024
+    st.caption(f"Arquivo pronto: {size:.1f} MB" + (f", {rows:,} transações" if rows is not None else ""))
+    with open(path, "rb") as data:
+        st.download_button(
+            "Baixar",
+            data=data,
+            file_name=f"controle_financeiro_{datetime.now():%Y%m%d}.{fmt}",
+            mime=MIME_TYPES[fmt],
+            type="primary"
+        )
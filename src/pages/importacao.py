@@ -0,0 +1,56 @@
+# src/pages/importacao.py
+import io
+import streamlit as st
+from src.database.connection import get_connection
+from src.repository.item_repository import ItemRepository
+from src.repository.transaction_repository import TransactionRepository
+from src.services.importer import import_statement, load_rules
+from src.services.pickers import item_picker
+
+# Repositórios do banco; cada uso pega a conexão da thread atual (rerun,
+# fragmento ou callback), não a da thread que carregou a página
+item_repo = ItemRepository(get_connection())
+transaction_repo = TransactionRepository(get_connection())
+
+# Título principal
+st.title("Controle Financeiro - Importação")
+
+default_item = item_picker(item_repo, key="import_default", label="Item para linhas sem regra")
+
+with st.form("import_form"):
+    statement = st.file_uploader("Extrato (CSV ou OFX)", type=["csv", "ofx", "qfx"])
+    rules_file = st.file_uploader("Regras descrição → item (JSON)", type=["json"])
+    encoding = st.selectbox("Codificação", options=["utf-8-sig", "latin-1"])
+    submit_import = st.form_submit_button("Importar")
+
+    if submit_import:
+        if statement is None:
+            st.error("Por favor, selecione um extrato.")
+        else:
+            try:
+                rules = load_rules(rules_file, item_repo) if rules_file else []
+            except (ValueError, KeyError) as e:
+                st.error(f"Regras inválidas: {e}")
+                st.stop()
+
+            with st.spinner("Importando..."):
+                stream = io.TextIOWrapper(statement, encoding=encoding, newline="")
+                try:
+                    result, errors = import_statement(
+                        stream, statement.name, transaction_repo, rules, default_item.id if default_item else None
+                    )
+                except ValueError as e:
+                    st.error(str(e))
+                    st.stop()
+
+            st.success(f"Importação concluída em {result.seconds:.2f} s ({result.rows_per_second:,.0f} linhas/s).")
+            cols = st.columns(5)
+            cols[0].metric("Lidas", result.read)
+            cols[1].metric("Inseridas", result.inserted)
+            cols[2].metric("Duplicadas", result.duplicates)
+            cols[3].metric("Sem regra", result.unmatched)
+            cols[4].metric("Inválidas", result.invalid)
+            if result.archived:
+                st.warning(f"{result.archived} linhas de anos arquivados não foram importadas; restaure o ano para importá-las.")
+            for message in errors.messages:
+                st.warning(message)
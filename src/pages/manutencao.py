@@ -1,30 +1,51 @@
 # src/pages/home.py
 import streamlit as st
-from datetime import datetime
+from datetime import datetime, timedelta
 from src.database.connection import get_connection
 from src.repository.item_repository import ItemRepository
 from src.repository.transaction_repository import TransactionRepository
+from src.repository.recurrence_repository import RecurrenceRepository
 from src.models.item import Item
+from src.models.recurrence import CADENCES, Recurrence
 from src.models.transaction import Transaction
+from src.models.transaction_filter import TransactionFilter
+from src.repository.partitions import archived_years
+from src.services.pickers import item_picker
 
-# Conexão com o banco de dados
-conn = get_connection()
-item_repo = ItemRepository(conn)
-transaction_repo = TransactionRepository(conn)
+# Transações exibidas por página
+PAGE_SIZE = 50
+
+# Repositórios do banco; cada uso pega a conexão da thread atual (rerun,
+# fragmento ou callback), não a da thread que carregou a página
+item_repo = ItemRepository(get_connection())
+transaction_repo = TransactionRepository(get_connection())
+recurrence_repo = RecurrenceRepository(get_connection())
 
 # Título principal
 st.title("Controle Financeiro - Manutenção")
 
+# Nomes dos itens para as tabelas; a escolha de itens é feita por busca (item_picker)
+items = item_repo.get_all()
+items_dict = {item.id: item for item in items}
+
+
+def transaction_label(t: Transaction) -> str:
+    item_name = items_dict[t.item_id].name if t.item_id in items_dict else "N/A"
+    return f"{datetime.strftime(t.date, '%d/%m/%Y')} - {item_name} - R$ {t.value:.2f}"
+
+
+def recurrence_label(r: Recurrence) -> str:
+    item_name = items_dict[r.item_id].name if r.item_id in items_dict else "N/A"
+    return f"{item_name} - {r.cadence} - R$ {abs(r.amount_cents) / 100:.2f}"
+
+
 # Primeira linha: Formulários lado a lado
 col1, col2 = st.columns(2)
 
 with col1:
     st.subheader("Nova Transação")
+    selected_item = item_picker(item_repo, key="transaction")
     with st.form("transaction_form"):
-        items = item_repo.get_all()
-        item_options = {f"{item.name} ({item.category})": item.id for item in items}
-
-        selected_item = st.selectbox("Item", options=list(item_options.keys()))
         value = st.number_input("Valor", min_value=0.00, step=0.01)
         date = st.date_input("Data", format="DD/MM/YYYY")
         trans_type = st.selectbox("Tipo", options=["Débito", "Crédito"])
@@ -32,9 +53,11 @@ with col1:
         is_recurring = st.checkbox("Recorrente")
         submit_trans = st.form_submit_button("Registrar Transação")
 
-        if submit_trans and selected_item and value:
+        if submit_trans and selected_item and value and date.year in archived_years(get_connection()):
+            st.error(f"O ano {date.year} está arquivado; restaure-o para lançar transações nele.")
+        elif submit_trans and selected_item and value:
             transaction = Transaction(
-                item_id=item_options[selected_item],
+                item_id=selected_item.id,
                 value=value,
                 type="D" if trans_type == "Débito" else "C",
                 is_completed=is_completed,
@@ -52,42 +75,101 @@ with col2:
         submit_item = st.form_submit_button("Cadastrar Item")
 
         if submit_item and item_name and category:
-            item = Item(name=item_name, category=category)
-            item_repo.add(item)
-            st.success("Item cadastrado com sucesso!")
+            if item_repo.get_by_name_category(item_name, category):
+                st.error("Item já cadastrado nesta categoria.")
+            else:
+                item = Item(name=item_name, category=category)
+                item_repo.add(item)
+                st.success("Item cadastrado com sucesso!")
 
 # Segunda linha: Formulários de alteração/exclusão
 col3, col4 = st.columns(2)
 
 with col3:
     st.subheader("Alterar/Excluir Transação")
-    
-    # Lista de transações para seleção
-    transactions = transaction_repo.get_all()
-    items_dict = {item.id: item for item in item_repo.get_all()}
-    
+
+    categories = sorted({item.category for item in items})
+
+    # Filtros aplicados no banco; só uma página de transações é carregada
+    with st.expander("Filtros"):
+        filter_period = st.date_input("Período", value=(), format="DD/MM/YYYY")
+        filter_item = item_picker(item_repo, key="filter", empty_label="Todos")
+        filter_category = st.selectbox("Categoria", options=[None, *categories], format_func=lambda c: "Todas" if c is None else c, key="filter_category")
+        filter_status = st.selectbox("Status", options=[None, True, False], format_func=lambda s: {None: "Todos", True: "Efetivado", False: "Pendente"}[s], key="filter_status")
+        filter_values = st.columns(2)
+        filter_min = filter_values[0].number_input("Valor mínimo", min_value=0.00, step=1.00, value=None)
+        filter_max = filter_values[1].number_input("Valor máximo", min_value=0.00, step=1.00, value=None)
+
+    filters = TransactionFilter(
+        start=filter_period[0] if len(filter_period) > 0 else None,
+        end=filter_period[1] + timedelta(days=1) if len(filter_period) > 1 else None,
+        item_id=filter_item.id if filter_item else None,
+        category=filter_category,
+        is_completed=filter_status,
+        min_value=filter_min,
+        max_value=filter_max
+    )
+
+    # Cursores das páginas já visitadas; recomeça quando os filtros mudam
+    if st.session_state.get("transaction_filters") != filters:
+        st.session_state["transaction_filters"] = filters
+        st.session_state["transaction_cursors"] = [None]
+    cursors = st.session_state["transaction_cursors"]
+
+    transactions, next_cursor = transaction_repo.get_page(filters, limit=PAGE_SIZE, after=cursors[-1])
+
     if transactions:
-        # Criar opções para o selectbox
-        transaction_options = {
-            f"{datetime.strftime(t.date, '%d/%m/%Y')} - {items_dict.get(t.item_id).name if items_dict.get(t.item_id) else 'N/A'} - R$ {t.value:.2f}": t 
-            for t in transactions
-        }
-        
-        selected_transaction_key = st.selectbox(
+        # Tabela da página atual
+        st.dataframe(
+            [
+                {
+                    "Data": t.date.strftime("%d/%m/%Y"),
+                    "Item": items_dict[t.item_id].name if t.item_id in items_dict else "N/A",
+                    "Categoria": items_dict[t.item_id].category if t.item_id in items_dict else "N/A",
+                    "Valor": t.value if t.type == "C" else -t.value,
+                    "Status": "Efetivado" if t.is_completed else "Pendente",
+                }
+                for t in transactions
+            ],
+            hide_index=True,
+            use_container_width=True
+        )
+
+        col_pages = st.columns([1, 2, 1])
+        with col_pages[0]:
+            if st.button("Anterior", disabled=len(cursors) == 1):
+                cursors.pop()
+                st.rerun()
+        with col_pages[1]:
+            st.caption(f"Página {len(cursors)}")
+        with col_pages[2]:
+            if st.button("Próxima", disabled=next_cursor is None):
+                cursors.append(next_cursor)
+                st.rerun()
+
+        # Opções pelo id: transações iguais (mesmo dia, item e valor) continuam distintas
+        transaction_options = {t.id: t for t in transactions}
+
+        selected_transaction_id = st.selectbox(
             "Selecione a Transação",
-            options=list(transaction_options.keys())
+            options=list(transaction_options),
+            format_func=lambda transaction_id: transaction_label(transaction_options[transaction_id])
         )
-        
-        if selected_transaction_key:
-            selected_transaction = transaction_options[selected_transaction_key]
-            
+
+        if selected_transaction_id is not None and transaction_options[selected_transaction_id].date.year in archived_years(get_connection()):
+            st.info("Transação de um ano arquivado: restaure o ano para alterá-la.")
+        elif selected_transaction_id is not None:
+            selected_transaction = transaction_options[selected_transaction_id]
+
+            # O item atual vem selecionado; a busca fica fora do formulário
+            edit_item = item_picker(
+                item_repo,
+                key=f"edit_transaction_{selected_transaction.id}",
+                current=items_dict.get(selected_transaction.item_id)
+            )
+
             with st.form("edit_transaction_form"):
                 # Campos do formulário preenchidos com os valores atuais
-                items = item_repo.get_all()
-                item_options = {f"{item.name} ({item.category})": item.id for item in items}
-                current_item = f"{items_dict[selected_transaction.item_id].name} ({items_dict[selected_transaction.item_id].category})"
-                
-                edit_item = st.selectbox("Item", options=list(item_options.keys()), index=list(item_options.keys()).index(current_item))
                 edit_value = st.number_input("Valor", min_value=0.00, step=0.01, value=float(selected_transaction.value))
                 edit_date = st.date_input("Data", value=selected_transaction.date, format="DD/MM/YYYY")
                 edit_type = st.selectbox("Tipo", options=["Débito", "Crédito"], 
@@ -101,8 +183,10 @@ with col3:
                 with col_buttons[1]:
                     delete_button = st.form_submit_button("Excluir", type="secondary")
                 
-                if update_button:
-                    selected_transaction.item_id = item_options[edit_item]
+                if update_button and edit_item and edit_date.year in archived_years(get_connection()):
+                    st.error(f"O ano {edit_date.year} está arquivado; restaure-o para lançar transações nele.")
+                elif update_button and edit_item:
+                    selected_transaction.item_id = edit_item.id
                     selected_transaction.value = edit_value
                     selected_transaction.date = datetime.combine(edit_date, datetime.min.time())
                     selected_transaction.type = "D" if edit_type == "Débito" else "C"
@@ -117,22 +201,16 @@ with col3:
                     transaction_repo.delete(selected_transaction.id)
                     st.success("Transação excluída com sucesso!")
                     st.rerun()
+    else:
+        st.info("Nenhuma transação encontrada.")
 
 with col4:
     st.subheader("Alterar/Excluir Item")
     
-    items = item_repo.get_all()
     if items:
-        # Criar opções para o selectbox
-        item_options = {f"{item.name} ({item.category})": item for item in items}
-        selected_item_key = st.selectbox(
-            "Selecione o Item",
-            options=list(item_options.keys())
-        )
-        
-        if selected_item_key:
-            selected_item = item_options[selected_item_key]
-            
+        selected_item = item_picker(item_repo, key="edit_item", label="Item")
+
+        if selected_item:
             with st.form("edit_item_form"):
                 # Campos do formulário preenchidos com os valores atuais
                 edit_name = st.text_input("Nome do Item", value=selected_item.name)
@@ -145,23 +223,91 @@ with col4:
                     delete_item_button = st.form_submit_button("Excluir", type="secondary")
                 
                 if update_item_button:
-                    selected_item.name = edit_name
-                    selected_item.category = edit_category
-                    
-                    item_repo.update(selected_item)
-                    st.success("Item atualizado com sucesso!")
-                    st.rerun()
+                    existing = item_repo.get_by_name_category(edit_name, edit_category)
+                    if existing and existing.id != selected_item.id:
+                        st.error("Já existe um item com este nome nesta categoria.")
+                    else:
+                        selected_item.name = edit_name
+                        selected_item.category = edit_category
+
+                        item_repo.update(selected_item)
+                        st.success("Item atualizado com sucesso!")
+                        st.rerun()
                 
                 elif delete_item_button:
-                    # Verificar se existem transações vinculadas
-                    transactions = transaction_repo.get_all()
-                    has_transactions = any(t.item_id == selected_item.id for t in transactions)
-                    
-                    if has_transactions:
+                    # Verificar se existem transações ou recorrências vinculadas
+                    if transaction_repo.exists_for_item(selected_item.id):
                         st.error("Não é possível excluir o item pois existem transações vinculadas.")
+                    elif recurrence_repo.exists_for_item(selected_item.id):
+                        st.error("Não é possível excluir o item pois existem recorrências vinculadas.")
                     else:
                         item_repo.delete(selected_item.id)
                         st.success("Item excluído com sucesso!")
                         st.rerun()
     else:
-        st.info("Nenhum item disponível para edição.")
\ No newline at end of file
+        st.info("Nenhum item disponível para edição.")
+
+# Terceira linha: recorrências agendadas
+st.subheader("Recorrências")
+col5, col6 = st.columns(2)
+
+with col5:
+    rec_item = item_picker(item_repo, key="recurrence")
+    with st.form("recurrence_form"):
+        rec_value = st.number_input("Valor", min_value=0.00, step=0.01, key="recurrence_value")
+        rec_type = st.selectbox("Tipo", options=["Débito", "Crédito"], key="recurrence_type")
+        rec_cadence = st.selectbox("Cadência", options=list(CADENCES), key="recurrence_cadence")
+        rec_start = st.date_input("Primeira ocorrência", format="DD/MM/YYYY", key="recurrence_start")
+        rec_end = st.date_input("Última ocorrência (opcional)", value=None, format="DD/MM/YYYY", key="recurrence_end")
+        submit_recurrence = st.form_submit_button("Agendar")
+
+        if submit_recurrence and rec_item and rec_value:
+            if rec_end is not None and rec_end < rec_start:
+                st.error("A última ocorrência deve ser posterior à primeira.")
+            else:
+                cents = round(rec_value * 100)
+                recurrence_repo.add(Recurrence(
+                    item_id=rec_item.id,
+                    amount_cents=-cents if rec_type == "Débito" else cents,
+                    interval_months=CADENCES[rec_cadence],
+                    start_date=rec_start,
+                    end_date=rec_end
+                ))
+                st.success("Recorrência agendada com sucesso!")
+
+with col6:
+    recurrences = recurrence_repo.get_all()
+    if recurrences:
+        st.dataframe(
+            [
+                {
+                    "Item": items_dict[r.item_id].name if r.item_id in items_dict else "N/A",
+                    "Valor": r.amount_cents / 100,
+                    "Cadência": r.cadence,
+                    "Início": r.start_date.strftime("%d/%m/%Y"),
+                    "Fim": r.end_date.strftime("%d/%m/%Y") if r.end_date else "",
+                    "Gravada até": r.materialized_until.strftime("%d/%m/%Y") if r.materialized_until else "",
+                }
+                for r in recurrences
+            ],
+            hide_index=True,
+            use_container_width=True
+        )
+        recurrence_options = {r.id: r for r in recurrences}
+        selected_recurrence = recurrence_options[st.selectbox(
+            "Selecione a Recorrência",
+            options=list(recurrence_options),
+            format_func=lambda recurrence_id: recurrence_label(recurrence_options[recurrence_id])
+        )]
+        col_buttons = st.columns([1, 1])
+        with col_buttons[0]:
+            if st.button("Encerrar hoje"):
+                selected_recurrence.end_date = datetime.now().date()
+                recurrence_repo.update(selected_recurrence)
+                st.rerun()
+        with col_buttons[1]:
+            if st.button("Excluir recorrência"):
+                recurrence_repo.delete(selected_recurrence.id)
+                st.rerun()
+    else:
+        st.info("Nenhuma recorrência agendada.")
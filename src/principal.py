@@ -1,155 +1,153 @@
 # src/main.py
-import os
-import sys
 import streamlit as st
-import sqlite3
-from datetime import datetime, timedelta
-import pandas as pd
-import numpy as np
-
-# Adiciona o diretório raiz ao path do Python
-current_dir = os.path.dirname(os.path.abspath(__file__))
-parent_dir = os.path.dirname(current_dir)
-sys.path.append(parent_dir)
+from datetime import date, datetime
 
 from src.database.connection import get_connection
 from src.repository.item_repository import ItemRepository
 from src.repository.transaction_repository import TransactionRepository
+from src.repository.report_repository import ReportRepository
+from src.repository.recurrence_repository import RecurrenceRepository
+from src.repository.journal_repository import JournalRepository
 from src.models.item import Item
 from src.models.transaction import Transaction
+from src.repository.partitions import archived_years
+from src.services import profiling
+from src.services.pickers import item_picker
+
+# Os serviços do painel (pandas e NumPy) são importados em painel() e no
+# callback da matriz: o título e a barra lateral aparecem antes deles
 
 # Configuração inicial do Streamlit
 st.set_page_config(page_title="Controle Financeiro", layout="wide")
 
-# Conexão com o banco de dados
-conn = get_connection()
-item_repo = ItemRepository(conn)
-transaction_repo = TransactionRepository(conn)
-
-def update_database():
-    if "data_editor" not in st.session_state:
+# Repositórios do banco; cada uso pega a conexão da thread atual (rerun,
+# fragmento ou callback), não a da thread que carregou a página
+item_repo = ItemRepository(get_connection())
+transaction_repo = TransactionRepository(get_connection())
+report_repo = ReportRepository(get_connection())
+recurrence_repo = RecurrenceRepository(get_connection())
+journal_repo = JournalRepository(get_connection())
+
+def update_database(key):
+    # Os callbacks rodam antes do script; a medição é registrada à parte
+    with profiling.session("update_database", get_connection(), active=profiling.enabled(st.query_params)) as run:
+        _update_database(key)
+    if run is not None:
+        st.session_state["profiling_callback"] = run
+
+def _update_database(key):
+    from src.services.dashboard import edits_to_cells, pending_edits
+    from src.services.display import MESES
+
+    state = st.session_state.get("matrix_state")
+    if state is None or key not in st.session_state:
         return
 
-    edited_rows = st.session_state["data_editor"]["edited_rows"]
+    # Só as células alteradas desde o último callback
+    edited_rows = pending_edits(st.session_state[key]["edited_rows"], state.applied)
     if not edited_rows:
         return
 
-    current_df = st.session_state.get("current_df")
-    if current_df is None:
-        return
-        
-    selected_year_str = st.session_state.get("selected_year")
-    if not selected_year_str:
+    with profiling.timed("edits_to_cells"):
+        cells, invalid = edits_to_cells(edited_rows, state.frame, state.year)
+    for col_name in invalid:
+        st.warning(f"Valor inválido inserido para {col_name}")
+
+    # Grava todas as células em uma única transação
+    inserted, updated, conflicts = transaction_repo.upsert_cells(cells)
+
+    # Aplica as mesmas células à matriz da sessão; se ninguém mais gravar no
+    # banco até o próximo rerun, o editor não é recarregado
+    blocked = {(item_id, month_idx) for item_id, _, month_idx in conflicts}
+    state.apply([cell for cell in cells if (cell[0], cell[2]) not in blocked])
+    state.version = matrix_version()
+    state.seq = journal_repo.last_seq()
+
+    for item_id, _, month_idx in conflicts:
+        st.warning(f"Não é possível editar: existem múltiplas transações para {item_repo.get_by_id(item_id).name} em {MESES[month_idx - 1]}.")
+    if updated:
+        st.toast(f"Transações atualizadas: {updated}")
+    if inserted:
+        st.toast(f"Novas transações criadas: {inserted}")
+
+def desfazer_edicao(acao):
+    """Desfaz (``"undo"``) ou refaz (``"redo"``) o último lote de edições da matriz."""
+    try:
+        batch = journal_repo.undo() if acao == "undo" else journal_repo.redo()
+    except ValueError as e:
+        st.warning(str(e))
         return
-    year = int(selected_year_str.strip())
-
-    items = item_repo.get_all()
-    
-    meses = [
-        "Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho", 
-        "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"
-    ]
-
-    for idx, changes in edited_rows.items():
-        try:
-            row = current_df.iloc[int(idx)]
-        except:
-            continue
-            
-        item_name = row["Item"]
-        category = row["Categoria"]
-        
-        # Find item
-        item_id = next((i.id for i in items if i.name == item_name and i.category == category), None)
-        if not item_id:
-            continue
-
-        for col_name, new_value in changes.items():
-            if col_name not in meses:
-                continue
-                
-            month_idx = meses.index(col_name) + 1
-            
-            # Parse value
-            try:
-                if isinstance(new_value, str):
-                    clean_val = new_value.replace('R$', '').strip()
-                    if ',' in clean_val and '.' in clean_val:
-                         clean_val = clean_val.replace('.', '').replace(',', '.')
-                    elif ',' in clean_val:
-                         clean_val = clean_val.replace(',', '.')
-                    val = float(clean_val)
-                else:
-                    val = float(new_value)
-            except ValueError:
-                st.warning(f"Valor inválido inserido para {col_name}")
-                continue
-
-            # Get existing transactions
-            transactions = transaction_repo.get_by_item_month_year(item_id, month_idx, year)
-            
-            if len(transactions) > 1:
-                st.warning(f"Não é possível editar: existem múltiplas transações para {item_name} em {col_name}.")
-                continue
-            
-            if len(transactions) == 1:
-                t = transactions[0]
-                if val < 0:
-                    t.type = 'D'
-                    t.value = abs(val)
-                else:
-                    t.type = 'C'
-                    t.value = val
-                transaction_repo.update(t)
-                st.toast(f"Transação atualizada: {item_name} - {col_name}")
-            else:
-                t = Transaction(
-                    item_id=item_id,
-                    value=abs(val),
-                    type='D' if val < 0 else 'C',
-                    is_completed=True,
-                    is_recurring=False,
-                    date=datetime(year, month_idx, 1)
-                )
-                transaction_repo.add(t)
-                st.toast(f"Nova transação criada: {item_name} - {col_name}")
+    if batch is not None:
+        verbo = "desfeitas" if acao == "undo" else "refeitas"
+        st.toast(f"Alterações {verbo}: {batch.last_seq - batch.first_seq + 1}")
+
+def atualizar_matriz(state, version):
+    """Aplica à matriz da sessão só as alterações gravadas desde que ela foi
+    montada (outra sessão, desfazer/refazer); False se for preciso recalculá-la."""
+    from src.services.dashboard import REFRESH_LIMIT, refresh_matrix
+    from src.services.display import estilizar_matriz
+
+    # O mês atual define a projeção: mudou, recalcula
+    if state.version[1:] != version[1:]:
+        return False
+    try:
+        changes = journal_repo.changes_since(state.seq, limit=REFRESH_LIMIT)
+    except ValueError:
+        return False
+    if len(changes) == REFRESH_LIMIT or not refresh_matrix(state, changes, report_repo, datetime.now()):
+        return False
+
+    # Os valores do editor mudaram: ele é recriado com a matriz atualizada
+    state.styled = estilizar_matriz(state.frame, state.month_columns)
+    state.generation += 1
+    state.applied = {}
+    state.version = version
+    return True
+
+def matrix_version():
+    """Versão dos dados e mês atual (que define a projeção) em que a matriz foi montada."""
+    hoje = datetime.now()
+    return report_repo.cache.data_version, hoje.year, hoje.month
 
 def main():
     st.title("Controle Financeiro")
-    
-    # Sidebar para formulários
-    # ... existing code ...
 
+    # Sidebar para formulários
     with st.sidebar:
+        formularios()
+
+    # Área principal - seletor de ano, matriz e visões consolidadas
+    painel()
+
+@st.fragment
+def formularios():
+    """Formulários da barra lateral; enviar um deles reexecuta só este trecho."""
+    with profiling.session("formularios", get_connection(), active=profiling.enabled(st.query_params)):
+        mensagem = st.session_state.pop("mensagem", None)
+        if mensagem:
+            st.success(mensagem)
+
         st.header("Nova Transação")
+        # Busca de item fora do formulário: cada texto digitado atualiza a lista
+        selected_item = item_picker(item_repo, key="transaction")
         with st.form("transaction_form"):
-            items = item_repo.get_all()
-            item_options = {f"{item.name} ({item.category})": item.id for item in items}
-            
-            # Adiciona opção vazia no início
-            item_options = {"": None, **item_options}
-            
-            selected_item = st.selectbox(
-                "Item", 
-                options=list(item_options.keys()),
-                index=0  # Seleciona o primeiro item (vazio)
-            )
-            
             value = st.number_input("Valor", min_value=0.00, step=1.00)
             date = st.date_input("Data", value="today", format="DD/MM/YYYY")
             trans_type = st.selectbox("Tipo", options=["Débito", "Crédito"])
             is_completed = st.checkbox("Efetivado", value=True)  # Marcado por padrão
             is_recurring = st.checkbox("Recorrente")
             submit_trans = st.form_submit_button("Registrar Transação")
-            
+
             if submit_trans:
                 if not selected_item:  # Verifica se um item foi selecionado
                     st.error("Por favor, selecione um item.")
                 elif value <= 0:  # Opcional: verificar se o valor é maior que zero
                     st.error("Por favor, insira um valor maior que zero.")
+                elif date.year in archived_years(get_connection()):
+                    st.error(f"O ano {date.year} está arquivado; restaure-o para lançar transações nele.")
                 else:
                     transaction = Transaction(
-                        item_id=item_options[selected_item],
+                        item_id=selected_item.id,
                         value=value,
                         type="D" if trans_type == "Débito" else "C",
                         is_completed=is_completed,
@@ -157,192 +155,169 @@ def main():
                         date=date
                     )
                     transaction_repo.add(transaction)
-                    st.success("Transação registrada com sucesso!")
-    
+                    # A matriz depende da transação: recarrega a página inteira
+                    st.session_state["mensagem"] = "Transação registrada com sucesso!"
+                    st.rerun()
+
         st.header("Cadastro de Item")
         with st.form("item_form"):
             item_name = st.text_input("Nome do Item")
             category = st.text_input("Categoria")
             submit_item = st.form_submit_button("Cadastrar Item")
-            
+
             if submit_item and item_name and category:
-                item = Item(name=item_name, category=category)
-                item_repo.add(item)
-                st.success("Item cadastrado com sucesso!")
-        
-        
-    # Área principal - Matriz de transações
-    transactions = transaction_repo.get_all()
-    items_dict = {item.id: item for item in item_repo.get_all()}
-    
-    if transactions:
-        # Criar opções para o selectbox
-        transaction_year = {
-            f"{datetime.strftime(t.date, '%Y')} ": t 
-            for t in transactions
-        }
-        
-        selected_transaction_year = st.selectbox(
-            "Selecione ano",
-            options=list(transaction_year.keys()),
-            key="selected_year"
-        )
-        
-        data = []
-        for t in transactions:
-            item = items_dict.get(t.item_id)
-            data.append({
-                "Ano": t.date.strftime("%Y"),
-                "Ref": t.date.strftime("%m"),
-                "Data": t.date.strftime("%d/%m/%Y"),
-                "Item": item.name if item else "N/A",
-                "Categoria": item.category if item else "N/A",
-                "Valor": f"R$ {t.value:.2f}",
-                "Tipo": "Débito" if t.type == "D" else "Crédito",
-                "Status": "Efetivado" if t.is_completed else "Pendente",
-                "Recorrente": "Sim" if t.is_recurring else "Não"
-            })
-
-        # Definindo as datas atuais
-        data_atual = datetime.now()
-        mes_atual = data_atual.month
-        ano_atual = data_atual.year
-
-        # Definindo as datas da referência anterior
-        data_mes_anterior = data_atual.replace(day=1) - timedelta(days=1)
-        mes_data_anterior = data_mes_anterior.strftime("%m")
-        ano_data_anterior = data_mes_anterior.strftime("%Y")
-
-        # Tratamento do histórico de transações
-        data = pd.DataFrame(data)
-        data["Ano"] = data["Ano"].astype(int)
-        data["Ref"] = data["Ref"].astype(int)
-
-        # Dataframe com transações recorrentes da referência anterior
-        transacoes_recorrentes = data[(data["Ref"] == int(mes_data_anterior)) & (data["Ano"] == int(ano_data_anterior)) & (data["Recorrente"] == "Sim")]
-        transacoes_recorrentes = transacoes_recorrentes.drop("Ano", axis=1)
-
-        # Seleciona as transações do ano desejado
-        data = data[data["Ano"] == int(selected_transaction_year)] 
-        data = data.drop("Ano", axis=1)
-
-        # Se o ano selecionado for o atual, projeta as transações recorrentes para os meses seguintes
-        if ano_atual == int(selected_transaction_year):
-            # Adiciona as transações recorrentes para os meses seguintes
-            for i in range(13 - mes_atual):
-                transacoes_recorrentes["Ref"] = i + mes_atual
-
-                # Cria uma chave de identificação única
-                transacoes_recorrentes['chave'] = transacoes_recorrentes['Item'] + transacoes_recorrentes['Ref'].astype(str)
-                data['chave'] = data['Item'] + data['Ref'].astype(str)
-
-                # Atualiza usando merge
-                transacoes_recorrentes = (
-                    transacoes_recorrentes.merge(
-                        data,
-                        on='chave',
-                        how='left',
-                        suffixes=('', '_novo')
+                if item_repo.get_by_name_category(item_name, category):
+                    st.error("Item já cadastrado nesta categoria.")
+                else:
+                    item = Item(name=item_name, category=category)
+                    item_repo.add(item)
+                    # Item sem transações não altera a matriz, que não é recalculada
+                    st.success("Item cadastrado com sucesso!")
+
+@st.fragment
+def painel():
+    """Seletor de ano e abas; trocar o ano ou editar a matriz reexecuta só este trecho."""
+    from src.services.dashboard import MatrixState, load_matrix
+    from src.services.display import estilizar_matriz, grafico_linha
+    from src.services.recurrences import occurrences, scheduled_totals
+    from src.services.rollups import cash_flow_forecast, category_by_month, load_rollup, running_balance, year_over_year
+
+    with profiling.session("painel", get_connection(), active=profiling.enabled(st.query_params)):
+        years = report_repo.get_years()
+        ano_atual = datetime.now().year
+
+        # Com recorrências agendadas, o ano atual e o seguinte já têm projeção
+        if len(recurrence_repo.get_columns()["id"]):
+            years = sorted({*years, ano_atual, ano_atual + 1})
+
+        if years:
+            # Seleciona o ano atual por padrão, se houver transações nele
+            selected_transaction_year = st.selectbox(
+                "Selecione ano",
+                options=years,
+                index=years.index(ano_atual) if ano_atual in years else len(years) - 1,
+                key="selected_year"
+            )
+
+            tab_matriz, tab_categorias, tab_anos, tab_saldo = st.tabs(
+                ["Itens", "Categorias", "Ano a ano", "Saldo e previsão"]
+            )
+
+            with tab_matriz:
+                # A matriz da sessão só é recalculada quando o ano muda; gravações de
+                # outras sessões e desfazer/refazer atualizam só as células alteradas,
+                # e as edições desta sessão já estão nela
+                state = st.session_state.get("matrix_state")
+                version = matrix_version()
+                if state is not None and state.year == selected_transaction_year and state.version != version:
+                    with profiling.timed("atualizar_matriz"):
+                        atualizada = atualizar_matriz(state, version)
+                else:
+                    atualizada = state is not None and state.year == selected_transaction_year
+                if not atualizada:
+                    # Lido antes da matriz: o que for gravado durante a leitura é reaplicado depois
+                    seq = journal_repo.last_seq()
+
+                    # Totais mensais do ano, com a projeção dos recorrentes e das recorrências agendadas,
+                    # pivotados por item × mês; recalculados só quando o ano ou os dados mudam
+                    with profiling.timed("load_matrix"):
+                        df_exibicao, colunas_meses = load_matrix(report_repo, selected_transaction_year, datetime.now(), recurrence_repo)
+
+                    with profiling.timed("estilizar_matriz"):
+                        matriz_estilizada = estilizar_matriz(df_exibicao, colunas_meses)
+
+                    state = MatrixState(
+                        year=selected_transaction_year,
+                        version=version,
+                        frame=df_exibicao.copy(),
+                        month_columns=colunas_meses,
+                        styled=matriz_estilizada,
+                        generation=state.generation + 1 if state else 0,
+                        seq=seq
                     )
+                    st.session_state["matrix_state"] = state
+
+                # Exibindo o dataframe com data_editor (inclui a serialização do Styler);
+                # o índice (item_id) identifica as linhas e fica oculto
+                editor_key = f"data_editor_{state.generation}"
+                desfazer, refazer = journal_repo.history()
+                col_desfazer, col_refazer, _ = st.columns([1, 1, 6])
+                col_desfazer.button(
+                    "Desfazer", key="desfazer_matriz", disabled=not desfazer, on_click=desfazer_edicao, args=("undo",),
+                    help="Desfaz a última edição gravada pela matriz", use_container_width=True
+                )
+                col_refazer.button(
+                    "Refazer", key="refazer_matriz", disabled=not refazer, on_click=desfazer_edicao, args=("redo",),
+                    help="Refaz a última edição desfeita", use_container_width=True
                 )
+                if selected_transaction_year in archived_years(get_connection()):
+                    # Ano arquivado: totais de monthly_balances, somente leitura
+                    st.caption("Ano arquivado: restaure-o para editar os valores.")
+                    st.dataframe(state.styled, use_container_width=True, hide_index=True)
+                else:
+                    with profiling.timed("data_editor"):
+                        st.data_editor(
+                            state.styled,
+                            use_container_width=True,
+                            hide_index=True,
+                            key=editor_key,
+                            on_change=update_database,
+                            args=(editor_key,)
+                        )
+
+            # Visões consolidadas: todas filtram o mesmo agregado do histórico
+            with profiling.timed("rollups"):
+                rollup = load_rollup(report_repo)
+
+                with tab_categorias:
+                    df_categorias, colunas_categorias = category_by_month(rollup, selected_transaction_year)
+                    st.dataframe(estilizar_matriz(df_categorias, colunas_categorias), use_container_width=True, hide_index=True)
+
+                with tab_anos:
+                    df_anos, colunas_anos = year_over_year(rollup)
+                    st.dataframe(estilizar_matriz(df_anos, colunas_anos), use_container_width=True, hide_index=True)
+
+                with tab_saldo:
+                    saldo = running_balance(rollup, until=datetime.now())
+                    hoje = datetime.now()
+                    inicio = date(hoje.year, hoje.month, 1)
+                    agendado = scheduled_totals(occurrences(recurrence_repo, inicio, inicio.replace(year=inicio.year + 1)))
+                    previsao = cash_flow_forecast(rollup, hoje, scheduled=agendado)
+                    st.subheader("Saldo acumulado")
+                    st.vega_lite_chart(saldo, grafico_linha("Período", "Saldo"), use_container_width=True)
+                    st.subheader("Previsão para os próximos 12 meses")
+                    st.caption("Valores já lançados no mês, as recorrências agendadas ou a média dos últimos 3 meses de cada item.")
+                    st.vega_lite_chart(previsao, grafico_linha("Período", "Saldo"), use_container_width=True)
+                    st.dataframe(
+                        estilizar_matriz(previsao.assign(Período=previsao["Período"].dt.strftime("%m/%Y")), ["Fluxo", "Saldo"]),
+                        use_container_width=True,
+                        hide_index=True
+                    )
 
-                # Atualiza as colunas onde há correspondência
-                colunas = ['Ref', 'Data', 'Item','Categoria', 'Valor', 'Tipo', 'Status', 'Recorrente']
-                for col in colunas:
-                    mascara = ~transacoes_recorrentes[f'{col}_novo'].isna()
-                    transacoes_recorrentes.loc[mascara, col] = transacoes_recorrentes.loc[mascara, f'{col}_novo']
-
-                # Remove as colunas temporárias
-                transacoes_recorrentes = transacoes_recorrentes.drop([col + '_novo' for col in colunas] + ['chave'], axis=1)
-
-                # Concatena os dataframes
-                data = pd.concat([data, transacoes_recorrentes], ignore_index=True)
-
-        # Remove duplicatas
-        data.drop_duplicates(inplace=True)
-
-        # Trata possíveis erros e garante a conversão correta da coluna Valor para numérico
-        data['Valor'] = pd.to_numeric(
-            data['Valor'].str.replace('R$', '').str.strip(),
-            errors='coerce'
-        )
-
-        # Multiplica o valor por -1 se o tipo for Débito
-        data['Valor'] = np.where(data['Tipo'] == 'Débito', data['Valor'] * -1, data['Valor'])
-
-        # Pivotando a tabela: linhas itens, colunas mês
-        df_exibicao = pd.pivot_table(
-            data,
-            values="Valor",
-            index="Item",
-            columns="Ref",
-            aggfunc='sum'
-        ).reset_index()
-
-        # Ajustando nome dos meses da tabela pivotada
-        colunas = df_exibicao.columns
-        meses = [
-            "Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho", 
-            "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"
-        ]
-        novas_colunas = [colunas[0]] + [meses[int(num) - 1] for num in colunas[1:]]
-        df_exibicao.columns = novas_colunas
-
-        #função de estilo
-        def style_valor(valor):
-            try:
-                # Remove R$ e converte para float
-                num = float(valor.replace('R$ ', '').replace('.', '').replace(',', '.'))
-                if num < 0:
-                    return 'color: red; text-align: center'
-                elif num > 0:
-                    return 'color: blue; text-align: center'
-                return 'text-align: center'  # para valores zero ou vazios
-            except:
-                return 'text-align: center'  # para casos de erro
-
-        # formata o dataframe para exibição
-        for num in colunas[1:]:
-            df_exibicao[meses[int(num) - 1]] = df_exibicao[meses[int(num) - 1]].apply(
-                # lambda x: f"R$ {x:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.') if pd.notna(x) else ""
-                lambda x: f"{x:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.') if pd.notna(x) else ""
+        else:
+            st.info("Nenhuma transação registrada ainda.")
+
+def debug_panel(run):
+    """Tempos do rerun atual e do último callback de edição."""
+    with st.expander("Depuração"):
+        runs = [run, st.session_state.get("profiling_callback")]
+        for profile in filter(None, runs):
+            st.caption(
+                f"{profile.name}: {profile.seconds * 1000:.1f} ms · "
+                f"{profile.sql_statements} instruções SQL · {profile.rows} linhas"
             )
-
-        # Adiciona as colunas de categoria aos itens
-        df_item = data[["Item", "Categoria", "Tipo"]]
-        df_item = df_item.drop_duplicates()
-        df_exibicao = df_exibicao.merge(df_item, on="Item", how="left")
-
-        # Classifica o dataframe: Créditos primeiro
-        df_exibicao.sort_values(by=["Tipo", "Categoria", "Item"], inplace=True)
-
-        # Reorganiza as colunas
-        colunas = df_exibicao.columns.tolist()
-        nova_ordem = ['Item', 'Categoria', 'Tipo'] + [col for col in colunas if col not in ['Item', 'Categoria', 'Tipo']]
-        df_exibicao = df_exibicao.reindex(columns=nova_ordem)
-        df_exibicao.drop(columns=["Tipo"], inplace=True)
-
-        # Aplicando o estilo ao dataframe
-        df_exibicao = df_exibicao.style.apply(
-            # lambda x: [style_valor(v) if isinstance(v, str) and 'R$' in v else 'text-align: center' for v in x],
-            lambda x: [style_valor(v) if isinstance(v, str) else 'text-align: center' for v in x],
-            axis=1
-        )
-
-        # Salva o dataframe atual na sessão para uso no callback
-        st.session_state['current_df'] = df_exibicao
-
-        # Exibindo o dataframe com data_editor
-        st.data_editor(
-            df_exibicao,
-            use_container_width=True,
-            hide_index=True,
-            key="data_editor",
-            on_change=update_database
-        )
-
-    else:
-        st.info("Nenhuma transação registrada ainda.")
+            st.dataframe(profile.as_rows(), hide_index=True, use_container_width=True)
+            if profile.capture:
+                st.code(profile.capture, language="text")
+        stats = report_repo.cache.stats()
+        st.caption(f"Cache: {stats}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    capture = profiling.capture_mode(st.query_params)
+    with profiling.session("main", get_connection(), active=profiling.enabled(st.query_params) or bool(capture), capture=capture) as run:
+        main()
+    if run is not None:
+        debug_panel(run)
+        # A captura vale para um único rerun
+        if "profile" in st.query_params:
+            del st.query_params["profile"]
\ No newline at end of file
@@ -0,0 +1,244 @@
+# src/repository/archive_repository.py
+import os
+import sqlite3
+from datetime import date
+from typing import List
+
+from src.database.connection import database_path, write_transaction
+from src.models.archived_year import ArchivedYear
+from src.repository.base_repository import ConnectedRepository
+from src.repository.journal_repository import paused
+from src.repository.partitions import (
+    ARCHIVE_DIR, TRANSACTION_COLUMNS, archive_path, archived_years, attach, readonly_uri,
+)
+from src.repository.report_repository import BALANCES_FROM
+from src.services.profiling import instrument
+
+# Anos mantidos no banco principal: o atual e o anterior
+HOT_YEARS = 2
+
+# Schema de cada arquivo anual: só as transações, com os mesmos índices de leitura
+ARCHIVE_SCHEMA = """
+CREATE TABLE transactions (
+    id INTEGER PRIMARY KEY,
+    item_id INTEGER NOT NULL,
+    amount_cents INTEGER NOT NULL,
+    is_completed BOOLEAN NOT NULL DEFAULT 0,
+    is_recurring BOOLEAN NOT NULL DEFAULT 0,
+    date TIMESTAMP NOT NULL,
+    import_hash TEXT,
+    recurrence_id INTEGER
+);
+CREATE INDEX idx_transactions_item_date ON transactions (item_id, date);
+CREATE INDEX idx_transactions_date ON transactions (date);
+"""
+
+@instrument("archive")
+class ArchiveRepository(ConnectedRepository):
+    """Move anos encerrados para bancos anuais e os traz de volta.
+
+    O arquivo de um ano (``archive/<banco>_<ano>.db``, ao lado do banco
+    principal) guarda as transações do ano; ``monthly_balances`` continua
+    com os totais do ano, de modo que o dashboard não precisa dele. As
+    transações arquivadas são lidas pelas partições (``partitions.py``) e
+    não podem ser alteradas sem restaurar o ano.
+    """
+
+    def get_all(self) -> List[ArchivedYear]:
+        return list(archived_years(self.conn).values())
+
+    def closed_years(self, today: date | None = None) -> List[int]:
+        """Anos ainda no banco principal que já podem ser arquivados."""
+        today = today or date.today()
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT DISTINCT year FROM monthly_balances
+            WHERE year <= ? AND year NOT IN (SELECT year FROM archived_years)
+            ORDER BY year
+        """, (today.year - HOT_YEARS,))
+        return [row[0] for row in cursor.fetchall()]
+
+    def archive(self, year: int, today: date | None = None) -> ArchivedYear:
+        """Copia as transações do ano para o arquivo anual e as remove do banco principal.
+
+        O arquivo é gravado e renomeado antes de qualquer alteração no banco
+        principal; a remoção, os totais do ano e o registro em
+        ``archived_years`` são gravados em uma única transação, depois de
+        conferir que o arquivo tem as mesmas transações.
+        """
+        today = today or date.today()
+        if year > today.year - HOT_YEARS:
+            raise ValueError("Só anos encerrados podem ser arquivados: o ano atual e o anterior ficam no banco principal")
+        if year in archived_years(self.conn):
+            raise ValueError(f"O ano {year} já está arquivado")
+        db_path = database_path(self.conn)
+        if db_path is None:
+            raise ValueError("Bancos em memória não podem ser arquivados")
+
+        bounds = (f"{year:04d}-01-01", f"{year + 1:04d}-01-01")
+        relative = os.path.join(ARCHIVE_DIR, f"{os.path.splitext(os.path.basename(db_path))[0]}_{year}.db")
+        path = os.path.join(os.path.dirname(os.path.abspath(db_path)), relative)
+        self._write_archive(db_path, path, bounds)
+
+        self.conn.execute("ATTACH DATABASE ? AS archive_new", (readonly_uri(path),))
+        try:
+            with write_transaction(self.conn):
+                cursor = self.conn.cursor()
+                cursor.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(amount_cents), 0) FROM transactions WHERE date >= ? AND date < ?",
+                    bounds
+                )
+                hot = cursor.fetchone()
+                cursor.execute("SELECT COUNT(*), COALESCE(SUM(amount_cents), 0) FROM archive_new.transactions")
+                copied = cursor.fetchone()
+                if hot != copied:
+                    raise ValueError(f"As transações de {year} mudaram durante o arquivamento; tente novamente")
+                if not copied[0]:
+                    raise ValueError(f"Nenhuma transação em {year}")
+
+                # Os triggers descontam dos totais cada linha removida: os
+                # totais do ano são regravados a partir do arquivo. As
+                # transações não mudam: o histórico registra só o arquivamento
+                with paused(self.conn, "A", "transactions", year):
+                    cursor.execute("DELETE FROM transactions WHERE date >= ? AND date < ?", bounds)
+                cursor.execute("DELETE FROM monthly_balances WHERE year = ?", (year,))
+                cursor.execute(
+                    "INSERT INTO monthly_balances (item_id, year, month, signed_total, count) "
+                    + BALANCES_FROM.format(source="archive_new.transactions")
+                )
+                cursor.execute(
+                    "INSERT INTO archived_years (year, path, row_count, total_cents) VALUES (?, ?, ?, ?)",
+                    (year, relative, *copied)
+                )
+        except BaseException:
+            self.conn.execute("DETACH DATABASE archive_new")
+            os.remove(path)
+            raise
+        self.conn.execute("DETACH DATABASE archive_new")
+        self.cache.invalidate()
+        return archived_years(self.conn)[year]
+
+    def restore(self, year: int) -> int:
+        """Devolve as transações do ano ao banco principal e apaga o arquivo.
+
+        Retorna o número de transações restauradas.
+        """
+        archived = archived_years(self.conn).get(year)
+        if archived is None:
+            raise ValueError(f"O ano {year} não está arquivado")
+        [schema] = attach(self.conn, [year])
+        try:
+            with write_transaction(self.conn):
+                # Sem o registro o ano volta a aceitar gravações; os triggers
+                # recalculam os totais a cada linha inserida
+                self.conn.execute("DELETE FROM archived_years WHERE year = ?", (year,))
+                self.conn.execute("DELETE FROM monthly_balances WHERE year = ?", (year,))
+                with paused(self.conn, "R", "transactions", year):
+                    cursor = self.conn.execute(
+                        f"INSERT INTO transactions ({TRANSACTION_COLUMNS}) "
+                        f"SELECT {TRANSACTION_COLUMNS} FROM {schema}.transactions ORDER BY date, id"
+                    )
+                if cursor.rowcount != archived.row_count:
+                    raise ValueError(f"O arquivo de {year} tem {cursor.rowcount} transações; esperadas {archived.row_count}")
+        finally:
+            # Com ou sem erro, o anexo não fica ocupando uma vaga da conexão
+            self.conn.execute(f"DETACH DATABASE {schema}")
+        self.cache.invalidate()
+        os.remove(archive_path(self.conn, archived))
+        return cursor.rowcount
+
+    def compact(self) -> int:
+        """Devolve ao sistema o espaço das transações arquivadas (``VACUUM``).
+
+        Reescreve o banco principal inteiro; retorna quantos bytes ele diminuiu.
+        """
+        path = database_path(self.conn)
+        before = os.path.getsize(path)
+        self.conn.execute("VACUUM")
+        # Em WAL, o arquivo só diminui quando as páginas voltam do log
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return before - os.path.getsize(path)
+
+    def verify(self, years: List[int] | None = None) -> List[str]:
+        """Confere os arquivos dos anos (todos, se ``years`` for omitido).
+
+        Para cada ano: o arquivo existe e está íntegro, tem a quantidade e a
+        soma registradas, só datas do ano e os mesmos totais por item e mês
+        de ``monthly_balances``, e o banco principal não tem transações do
+        ano. Retorna a descrição de cada problema; lista vazia se não houver.
+        """
+        problems = []
+        cursor = self.conn.cursor()
+        for year, archived in archived_years(self.conn).items():
+            if years is not None and year not in years:
+                continue
+            try:
+                [schema] = attach(self.conn, [year])
+            except (FileNotFoundError, sqlite3.DatabaseError) as e:
+                problems.append(f"{year}: {e}")
+                continue
+
+            check = cursor.execute(f"PRAGMA {schema}.quick_check").fetchone()[0]
+            if check != "ok":
+                problems.append(f"{year}: arquivo corrompido ({check})")
+                continue
+
+            cursor.execute(f"""
+                SELECT COUNT(*), COALESCE(SUM(amount_cents), 0), MIN(date), MAX(date)
+                FROM {schema}.transactions
+            """)
+            count, total, first, last = cursor.fetchone()
+            if (count, total) != (archived.row_count, archived.total_cents):
+                problems.append(
+                    f"{year}: {count} transações somando {total} centavos; "
+                    f"registradas {archived.row_count} somando {archived.total_cents}"
+                )
+            if count and (first < f"{year:04d}-01-01" or last >= f"{year + 1:04d}-01-01"):
+                problems.append(f"{year}: transações fora do ano no arquivo ({first} a {last})")
+
+            cursor.execute(f"""
+                WITH expected AS ({BALANCES_FROM.format(source=f"{schema}.transactions")}),
+                     balances AS (SELECT * FROM monthly_balances WHERE year = ?)
+                SELECT COUNT(*) FROM (
+                    SELECT * FROM (SELECT * FROM expected EXCEPT SELECT * FROM balances)
+                    UNION ALL
+                    SELECT * FROM (SELECT * FROM balances EXCEPT SELECT * FROM expected)
+                )
+            """, (year,))
+            drift = cursor.fetchone()[0]
+            if drift:
+                problems.append(f"{year}: {drift} totais mensais diferentes de monthly_balances")
+
+            cursor.execute(
+                "SELECT COUNT(*) FROM transactions WHERE date >= ? AND date < ?",
+                (f"{year:04d}-01-01", f"{year + 1:04d}-01-01")
+            )
+            duplicated = cursor.fetchone()[0]
+            if duplicated:
+                problems.append(f"{year}: {duplicated} transações do ano também no banco principal")
+        return problems
+
+    @staticmethod
+    def _write_archive(db_path: str, path: str, bounds: tuple[str, str]) -> None:
+        """Grava o arquivo anual em ``path`` (via arquivo temporário) a partir do banco principal."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.tmp"
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        archive = sqlite3.connect(temporary)
+        try:
+            archive.executescript(ARCHIVE_SCHEMA)
+            archive.execute("ATTACH DATABASE ? AS hot", (readonly_uri(db_path),))
+            archive.execute(
+                f"INSERT INTO transactions ({TRANSACTION_COLUMNS}) "
+                f"SELECT {TRANSACTION_COLUMNS} FROM hot.transactions WHERE date >= ? AND date < ? ORDER BY date, id",
+                bounds
+            )
+            archive.commit()
+            archive.execute("DETACH DATABASE hot")
+        except BaseException:
+            archive.close()
+            os.remove(temporary)
+            raise
+        archive.close()
+        os.replace(temporary, path)
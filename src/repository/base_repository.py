@@ -2,11 +2,34 @@
 from abc import ABC, abstractmethod
 from typing import List, TypeVar, Generic
 
+from src.database.connection import manager_of
+from src.repository.cache import get_cache
+
 T = TypeVar('T')
 
-class BaseRepository(ABC, Generic[T]):
+class ConnectedRepository:
+    """Repositório ligado a um banco, não a uma conexão.
+
+    Guarda o gerenciador que abriu ``conn`` e, a cada uso de ``self.conn``,
+    pede a conexão da thread atual: os repositórios criados quando a página
+    é carregada continuam válidos nos reruns de fragmentos e nos callbacks,
+    que rodam em outras threads. Conexões abertas fora do gerenciador são
+    usadas como recebidas.
+    """
+
     def __init__(self, conn):
-        self.conn = conn
+        self._conn = conn
+        self._manager = manager_of(conn)
+        self.cache = get_cache(conn)
+
+    @property
+    def conn(self):
+        if self._manager is None:
+            return self._conn
+        return self._manager.get_connection()
+
+
+class BaseRepository(ConnectedRepository, ABC, Generic[T]):
     
     @abstractmethod
     def add(self, entity: T) -> T:
@@ -0,0 +1,115 @@
+# src/repository/cache.py
+import threading
+from typing import Any, Callable, Hashable
+
+from cachetools import LRUCache
+
+from src.database.connection import ConnectionManager, database_path, get_manager, manager_of
+
+
+class QueryCache:
+    """Cache de consultas compartilhado pelos repositórios de um banco.
+
+    Cada entrada é guardada junto com a versão dos dados em que foi lida:
+    um contador incrementado pelas escritas dos próprios repositórios
+    (``invalidate``) e o ``PRAGMA data_version`` do SQLite, que muda quando
+    outra conexão (de outra thread ou processo, ex.: a importação pela linha
+    de comando) grava no banco, lido por ``probe`` sempre na mesma conexão
+    (``ConnectionManager.data_version``). O número de entradas é limitado e
+    as menos usadas são descartadas; pedidos simultâneos da mesma entrada
+    ausente executam a leitura uma única vez.
+    """
+
+    def __init__(self, probe: Callable[[], int], maxsize: int = 256):
+        self.probe = probe
+        self.hits = 0
+        self.misses = 0
+        self._local_version = 0
+        self._entries: LRUCache = LRUCache(maxsize=maxsize)
+        self._lock = threading.RLock()
+        self._loading: dict[Hashable, threading.Lock] = {}
+
+    @property
+    def data_version(self) -> tuple[int, int]:
+        # Lida fora de _lock: a conexão da versão tem o seu próprio lock
+        return self._local_version, self.probe()
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        versioned_key = (key, self.data_version)
+        with self._lock:
+            try:
+                value = self._entries[versioned_key]
+                self.hits += 1
+                return value
+            except KeyError:
+                self.misses += 1
+            loading = self._loading.setdefault(versioned_key, threading.Lock())
+
+        # Sessões que pedem a mesma entrada ao mesmo tempo esperam uma única leitura
+        with loading:
+            with self._lock:
+                if versioned_key in self._entries:
+                    return self._entries[versioned_key]
+            try:
+                value = loader()
+                with self._lock:
+                    self._entries[versioned_key] = value
+            finally:
+                with self._lock:
+                    self._loading.pop(versioned_key, None)
+        return value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._local_version += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._entries),
+                "maxsize": self._entries.maxsize,
+                "data_version": self.data_version,
+            }
+
+
+_caches: dict[ConnectionManager, QueryCache] = {}
+_memory_caches: dict[int, tuple[Any, QueryCache]] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(conn) -> QueryCache:
+    """Cache único por gerenciador de conexões (um por arquivo de banco),
+    compartilhado pelas conexões de todas as threads e preservado entre os
+    reruns do Streamlit. Conexões abertas fora do gerenciador usam o do
+    arquivo delas.
+
+    Bancos em memória só existem na própria conexão: o cache é dela.
+    """
+    manager = manager_of(conn)
+    if manager is None or manager.path is None:
+        path = database_path(conn)
+        if path is None:
+            return _memory_cache(conn)
+        manager = get_manager(path)
+
+    cache = _caches.get(manager)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(manager)
+            if cache is None:
+                cache = _caches[manager] = QueryCache(manager.data_version)
+    return cache
+
+
+def _memory_cache(conn) -> QueryCache:
+    with _caches_lock:
+        entry = _memory_caches.get(id(conn))
+        if entry is None or entry[0] is not conn:
+            entry = (conn, QueryCache(lambda: conn.execute("PRAGMA data_version").fetchone()[0]))
+            _memory_caches[id(conn)] = entry
+    return entry[1]
@@ -1,49 +1,109 @@
 # src/repository/item_repository.py
-import os
-import sys
+from dataclasses import replace
 from typing import List
 
-# Adiciona o diretório raiz ao path do Python
-current_dir = os.path.dirname(os.path.abspath(__file__))
-parent_dir = os.path.dirname(os.path.dirname(current_dir))
-sys.path.append(parent_dir)
-
 from src.repository.base_repository import BaseRepository
+from src.database.connection import write_transaction
 from src.models.item import Item
+from src.services.profiling import instrument
 
+@instrument("items")
 class ItemRepository(BaseRepository[Item]):
     def add(self, item: Item) -> Item:
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "INSERT INTO items (name, category) VALUES (?, ?)",
-            (item.name, item.category)
-        )
-        self.conn.commit()
+        with write_transaction(self.conn):
+            cursor = self.conn.cursor()
+            cursor.execute(
+                "INSERT INTO items (name, category) VALUES (?, ?)",
+                (item.name, item.category)
+            )
+        self.cache.invalidate()
         item.id = cursor.lastrowid
         return item
     
+    def add_many(self, items: List[Item]) -> List[Item]:
+        """Insere vários itens com um único ``executemany`` e um único commit."""
+        if not items:
+            return items
+        with write_transaction(self.conn):
+            cursor = self.conn.cursor()
+            cursor.executemany(
+                "INSERT INTO items (name, category) VALUES (?, ?)",
+                [(item.name, item.category) for item in items]
+            )
+            # Dentro da mesma transação os ids AUTOINCREMENT são consecutivos
+            last_id = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+        self.cache.invalidate()
+        for offset, item in enumerate(reversed(items)):
+            item.id = last_id - offset
+        return items
+    
     def get_all(self) -> List[Item]:
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT id, name, category FROM items")
-        return [Item(*row) for row in cursor.fetchall()]
+        # Cópias, para que alterações nos objetos não afetem o cache
+        return [replace(item) for item in self._by_id().values()]
     
     def get_by_id(self, id: int) -> Item:
+        item = self._by_id().get(id)
+        return replace(item) if item else None
+
+    def get_by_name_category(self, name: str, category: str) -> Item:
+        """Busca exata pelo índice único ``(name, category)``."""
         cursor = self.conn.cursor()
-        cursor.execute("SELECT id, name, category FROM items WHERE id = ?", (id,))
+        cursor.execute("SELECT id, name, category FROM items WHERE name = ? AND category = ?", (name, category))
         row = cursor.fetchone()
         return Item(*row) if row else None
+
+    def search(self, query: str, limit: int = 50) -> List[Item]:
+        """Itens cujo nome ou categoria contém ``query``, sem diferenciar
+        maiúsculas (acentos são diferenciados: ``cafe`` não encontra ``Café``).
+
+        Com 3 caracteres ou mais a busca usa o índice ``items_fts`` (FTS5
+        trigram), com os itens que casam pelo nome primeiro; consultas mais
+        curtas comparam o início do nome. Sem consulta, retorna os primeiros
+        itens em ordem alfabética.
+        """
+        query = query.strip()
+        cursor = self.conn.cursor()
+        if len(query) >= 3:
+            # Entre aspas, o texto é um trecho literal e não a sintaxe de consulta do FTS5
+            cursor.execute(
+                """SELECT i.id, i.name, i.category
+                   FROM items_fts f
+                   JOIN items i ON i.id = f.rowid
+                   WHERE items_fts MATCH ?
+                   ORDER BY bm25(items_fts, 10.0, 1.0), i.name
+                   LIMIT ?""",
+                ('"' + query.replace('"', '""') + '"', limit)
+            )
+        else:
+            cursor.execute(
+                """SELECT id, name, category FROM items
+                   WHERE name LIKE ? ESCAPE '\\'
+                   ORDER BY name COLLATE NOCASE, category COLLATE NOCASE
+                   LIMIT ?""",
+                (query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%", limit)
+            )
+        return [Item(*row) for row in cursor.fetchall()]
     
     def update(self, item: Item) -> Item:
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "UPDATE items SET name = ?, category = ? WHERE id = ?",
-            (item.name, item.category, item.id)
-        )
-        self.conn.commit()
+        with write_transaction(self.conn):
+            cursor = self.conn.cursor()
+            cursor.execute(
+                "UPDATE items SET name = ?, category = ? WHERE id = ?",
+                (item.name, item.category, item.id)
+            )
+        self.cache.invalidate()
         return item
     
     def delete(self, id: int) -> bool:
-        cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM items WHERE id = ?", (id,))
-        self.conn.commit()
-        return cursor.rowcount > 0
\ No newline at end of file
+        with write_transaction(self.conn):
+            cursor = self.conn.cursor()
+            cursor.execute("DELETE FROM items WHERE id = ?", (id,))
+        self.cache.invalidate()
+        return cursor.rowcount > 0
+
+    def _by_id(self) -> dict[int, Item]:
+        def load():
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT id, name, category FROM items")
+            return {row[0]: Item(*row) for row in cursor.fetchall()}
+        return self.cache.get("items_by_id", load)
\ No newline at end of file
@@ -0,0 +1,222 @@
+# src/repository/journal_repository.py
+"""Histórico de alterações (``change_log``) e desfazer/refazer da matriz.
+
+Os triggers de ``transactions``, ``items`` e ``recurrences`` registram cada
+inclusão, alteração e exclusão na mesma transação da escrita: todo caminho
+de gravação (repositórios, importação, materialização das recorrências)
+entra no histórico, e uma escrita desfeita some junto com as suas entradas.
+Cada entrada tem um ``seq`` crescente; quem guarda o último ``seq`` que
+processou pede só o que mudou depois dele (``changes_since``) em vez de
+reler o histórico inteiro.
+
+As gravações da matriz do dashboard formam lotes (``record_batch``) que
+podem ser desfeitos e refeitos. Desfazer grava as alterações inversas, que
+entram no histórico como quaisquer outras: nada é apagado, a não ser pelo
+descarte explícito das entradas antigas (``prune``).
+"""
+import json
+import sqlite3
+from contextlib import contextmanager
+from typing import Dict, List
+
+from src.database.connection import write_transaction
+from src.models.change import Change, ChangeBatch
+from src.repository.base_repository import ConnectedRepository
+from src.services.profiling import instrument
+
+# Colunas registradas de cada tabela, na ordem dos arrays JSON gravados pelos triggers
+JOURNAL_COLUMNS: Dict[str, tuple] = {
+    "transactions": ("item_id", "amount_cents", "is_completed", "is_recurring", "date", "import_hash", "recurrence_id"),
+    "items": ("name", "category"),
+    "recurrences": ("item_id", "amount_cents", "interval_months", "start_date", "end_date", "materialized_until"),
+}
+
+# Lotes gravados pelo editor da matriz do dashboard
+MATRIX_SCOPE = "matrix"
+
+
+def last_seq(conn: sqlite3.Connection) -> int:
+    """``seq`` da última entrada gravada (0 se nenhuma), mesmo que já descartada."""
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'").fetchone()
+    return row[0] if row else 0
+
+
+@contextmanager
+def record_batch(conn: sqlite3.Connection, scope: str, kind: str = "edit", reverts: int | None = None):
+    """Registra como um lote as entradas gravadas dentro do bloco.
+
+    Deve envolver apenas escritas feitas dentro de ``write_transaction``,
+    que as serializa: as entradas do bloco são exatamente as de ``seq``
+    entre o último antes dele e o último ao final. Blocos sem alterações
+    não geram lote.
+    """
+    first = last_seq(conn) + 1
+    yield
+    last = last_seq(conn)
+    if last >= first:
+        conn.execute(
+            "INSERT INTO change_batches (scope, kind, reverts, first_seq, last_seq) VALUES (?, ?, ?, ?, ?)",
+            (scope, kind, reverts, first, last)
+        )
+
+
+@contextmanager
+def paused(conn: sqlite3.Connection, op: str, table: str, row_id: int):
+    """Não registra as escritas do bloco, substituídas por uma única entrada ``op``.
+
+    Para movimentações que não alteram os dados, como levar um ano para o
+    arquivo anual e trazê-lo de volta. Deve ser usado dentro de
+    ``write_transaction``: a pausa só é vista pela própria transação.
+    """
+    conn.execute("INSERT INTO change_log_pause (paused) VALUES (1)")
+    try:
+        yield
+    finally:
+        conn.execute("DELETE FROM change_log_pause")
+    conn.execute("INSERT INTO change_log (op, table_name, row_id) VALUES (?, ?, ?)", (op, table, row_id))
+
+
+@instrument("journal")
+class JournalRepository(ConnectedRepository):
+    """Leitura do histórico de alterações e desfazer/refazer de lotes."""
+
+    def last_seq(self) -> int:
+        return last_seq(self.conn)
+
+    def changes_since(self, seq: int, tables: List[str] | None = None, limit: int | None = None) -> List[Change]:
+        """Entradas com ``seq`` maior que ``seq``, em ordem; no máximo ``limit``.
+
+        Se entradas posteriores a ``seq`` já foram descartadas (``prune``), o
+        histórico não basta para atualizar quem parou em ``seq``: lança
+        ``ValueError`` e o consumidor deve recarregar tudo.
+        """
+        oldest = self.conn.execute("SELECT MIN(seq) FROM change_log").fetchone()[0]
+        if seq < (oldest if oldest is not None else self.last_seq() + 1) - 1:
+            raise ValueError(f"As alterações posteriores a {seq} já foram descartadas do histórico")
+
+        conditions, params = ["seq > ?"], [seq]
+        if tables is not None:
+            conditions.append(f"table_name IN ({', '.join('?' * len(tables))})")
+            params.extend(tables)
+        query = f"""
+            SELECT seq, op, table_name, row_id, old_values, new_values
+            FROM change_log WHERE {' AND '.join(conditions)} ORDER BY seq
+        """
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        cursor = self.conn.cursor()
+        cursor.execute(query, params)
+        return [self._from_row(row) for row in cursor.fetchall()]
+
+    def history(self, scope: str = MATRIX_SCOPE) -> tuple[List[ChangeBatch], List[ChangeBatch]]:
+        """Pilhas ``(desfazer, refazer)`` dos lotes de ``scope``; o topo é o último elemento."""
+        return self.cache.get(("journal_history", scope), lambda: self._load_history(scope))
+
+    def undo(self, scope: str = MATRIX_SCOPE) -> ChangeBatch | None:
+        """Desfaz o último lote de ``scope`` ainda não desfeito e o retorna; None se não houver."""
+        return self._step(scope, "undo")
+
+    def redo(self, scope: str = MATRIX_SCOPE) -> ChangeBatch | None:
+        """Refaz o último lote desfeito de ``scope`` e retorna o lote que o desfez; None se não houver."""
+        return self._step(scope, "redo")
+
+    def prune(self, before_seq: int) -> int:
+        """Descarta as entradas com ``seq`` menor que ``before_seq`` e os lotes que as usam.
+
+        Retorna quantas entradas foram descartadas.
+        """
+        with write_transaction(self.conn):
+            cursor = self.conn.execute("DELETE FROM change_log WHERE seq < ?", (before_seq,))
+            self.conn.execute("DELETE FROM change_batches WHERE first_seq < ?", (before_seq,))
+        self.cache.invalidate()
+        return cursor.rowcount
+
+    def _step(self, scope: str, kind: str) -> ChangeBatch | None:
+        # As pilhas são lidas dentro da transação: duas sessões não desfazem o mesmo lote
+        with write_transaction(self.conn):
+            undo, redo = self._load_history(scope)
+            stack = undo if kind == "undo" else redo
+            if not stack:
+                return None
+            batch = stack[-1]
+            self._revert(batch, kind)
+        self.cache.invalidate()
+        return batch
+
+    def _revert(self, batch: ChangeBatch, kind: str) -> None:
+        """Grava o inverso das entradas do lote, da última para a primeira, como um novo lote."""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT op, table_name, row_id, old_values, new_values
+            FROM change_log WHERE seq BETWEEN ? AND ? ORDER BY seq DESC
+        """, (batch.first_seq, batch.last_seq))
+        entries = cursor.fetchall()
+        if len(entries) != batch.last_seq - batch.first_seq + 1:
+            raise ValueError("As alterações deste lote já foram descartadas do histórico")
+
+        # Cada linha deve estar como o lote a deixou: nada gravado depois é sobrescrito
+        final = {}
+        for op, table, row_id, _, new_values in entries:
+            if op not in ("I", "U", "D"):
+                raise ValueError(f"Entrada '{op}' não pode ser desfeita")
+            final.setdefault((table, row_id), new_values)
+        for (table, row_id), expected in final.items():
+            columns = ", ".join(JOURNAL_COLUMNS[table])
+            current = cursor.execute(f"SELECT json_array({columns}) FROM {table} WHERE id = ?", (row_id,)).fetchone()
+            if (current[0] if current else None) != expected:
+                raise ValueError("Os valores foram alterados depois desta edição; ela não pode mais ser desfeita")
+
+        try:
+            with record_batch(self.conn, batch.scope, kind, batch.id):
+                for op, table, row_id, old_values, _ in entries:
+                    columns = JOURNAL_COLUMNS[table]
+                    if op == "I":
+                        cursor.execute(f"DELETE FROM {table} WHERE id = ?", (row_id,))
+                    elif op == "D":
+                        cursor.execute(
+                            f"INSERT INTO {table} (id, {', '.join(columns)}) VALUES (?{', ?' * len(columns)})",
+                            (row_id, *json.loads(old_values))
+                        )
+                    else:
+                        cursor.execute(
+                            f"UPDATE {table} SET {', '.join(f'{column} = ?' for column in columns)} WHERE id = ?",
+                            (*json.loads(old_values), row_id)
+                        )
+        except sqlite3.IntegrityError as e:
+            raise ValueError(f"A edição não pode ser desfeita: {e}") from e
+
+    def _load_history(self, scope: str) -> tuple[List[ChangeBatch], List[ChangeBatch]]:
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT id, scope, kind, reverts, first_seq, last_seq, created_at
+            FROM change_batches WHERE scope = ? ORDER BY id
+        """, (scope,))
+        # Uma edição nova esvazia a pilha de refazer; desfazer move o lote
+        # revertido para ela, e refazer o traz de volta
+        undo, redo = [], []
+        for row in cursor.fetchall():
+            batch = ChangeBatch(*row)
+            if batch.kind == "edit":
+                undo.append(batch)
+                redo.clear()
+            elif batch.kind == "undo":
+                undo[:] = [entry for entry in undo if entry.id != batch.reverts]
+                redo.append(batch)
+            else:
+                redo[:] = [entry for entry in redo if entry.id != batch.reverts]
+                undo.append(batch)
+        return undo, redo
+
+    @staticmethod
+    def _from_row(row) -> Change:
+        seq, op, table, row_id, old_values, new_values = row
+        columns = JOURNAL_COLUMNS.get(table, ())
+        return Change(
+            seq=seq,
+            op=op,
+            table=table,
+            row_id=row_id,
+            old=dict(zip(columns, json.loads(old_values))) if old_values is not None else None,
+            new=dict(zip(columns, json.loads(new_values))) if new_values is not None else None,
+        )
@@ -0,0 +1,164 @@
+# src/repository/partitions.py
+"""Partições anuais da tabela ``transactions``.
+
+Anos encerrados podem ser movidos para bancos próprios, um arquivo por ano
+registrado em ``archived_years`` (``ArchiveRepository``); o banco principal
+fica só com os anos recentes. As leituras por período anexam (``ATTACH``,
+somente leitura) apenas os anos arquivados que o período alcança:
+
+- ``union_sources``: origem ``FROM`` de uma consulta, ``transactions``
+  quando nenhum ano arquivado é alcançado ou uma ``UNION ALL`` das tabelas
+  envolvidas. O SQLite leva o ``WHERE`` para dentro de cada parte e usa os
+  índices de cada arquivo;
+- ``ordered_partitions``: as mesmas partições em ordem cronológica, para
+  leituras ordenadas por data (exportação, paginação) feitas uma partição
+  de cada vez, sem ordenar a união.
+
+Uma conexão anexa no máximo ``SQLITE_LIMIT_ATTACHED`` bancos (10 por
+padrão): períodos com mais anos arquivados são lidos em várias uniões, e os
+anexos que o pedido não usa são desfeitos para abrir espaço.
+"""
+import os
+import sqlite3
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, Iterator, List
+from urllib.request import pathname2url
+
+from src.database.connection import database_path
+from src.models.archived_year import ArchivedYear
+from src.repository.cache import get_cache
+
+# Colunas de transactions, na ordem do schema
+TRANSACTION_COLUMNS = "id, item_id, amount_cents, is_completed, is_recurring, date, import_hash, recurrence_id"
+
+# Diretório dos arquivos anuais, ao lado do banco principal
+ARCHIVE_DIR = "archive"
+
+
+@dataclass(frozen=True)
+class Partition:
+    """Um ano arquivado ou um trecho do banco principal entre anos arquivados."""
+    year: int | None  # None para o banco principal
+    start: str | None = None  # limites da partição ('AAAA-MM-DD', fim exclusivo); None sem limite
+    end: str | None = None
+
+    def table(self, conn: sqlite3.Connection) -> str:
+        if self.year is None:
+            return "transactions"
+        return f"{attach(conn, [self.year])[0]}.transactions"
+
+    def conditions(self) -> tuple[List[str], list]:
+        """Condições que restringem a consulta ao trecho (vazias para anos arquivados)."""
+        conditions, params = [], []
+        if self.year is None and self.start is not None:
+            conditions.append("date >= ?")
+            params.append(self.start)
+        if self.year is None and self.end is not None:
+            conditions.append("date < ?")
+            params.append(self.end)
+        return conditions, params
+
+
+def archived_years(conn: sqlite3.Connection) -> Dict[int, ArchivedYear]:
+    """Anos arquivados, por ano; lidos uma vez por versão dos dados."""
+    return get_cache(conn).get("archived_years", lambda: _load_archived_years(conn))
+
+
+def archive_path(conn: sqlite3.Connection, archived: ArchivedYear) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(database_path(conn))), archived.path)
+
+
+def readonly_uri(path: str) -> str:
+    return f"file:{pathname2url(os.path.abspath(path))}?mode=ro"
+
+
+def attach(conn: sqlite3.Connection, years: List[int]) -> List[str]:
+    """Anexa, somente leitura, os arquivos dos anos; devolve os nomes dos bancos.
+
+    Anexos de arquivamentos que não existem mais (ano restaurado ou
+    arquivado de novo) são desfeitos, assim como os que este pedido não usa
+    quando faltam vagas. Não pode ser chamada dentro de uma transação.
+    """
+    archived = archived_years(conn)
+    wanted = {archived[year].schema: archived[year] for year in years}
+    limit = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+    if len(wanted) > limit:
+        raise ValueError(f"No máximo {limit} anos arquivados podem ser anexados ao mesmo tempo")
+
+    attached = [row[1] for row in conn.execute("PRAGMA database_list") if row[1].startswith("archive_")]
+    current = {entry.schema for entry in archived.values()}
+    missing = [schema for schema in wanted if schema not in attached]
+    free = limit - len(attached)
+    for schema in attached:
+        if schema not in wanted and (schema not in current or free < len(missing)):
+            conn.execute(f"DETACH DATABASE {schema}")
+            free += 1
+
+    for schema in missing:
+        path = archive_path(conn, wanted[schema])
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Arquivo do ano {wanted[schema].year} não encontrado: {path}")
+        conn.execute(f"ATTACH DATABASE ? AS {schema}", (readonly_uri(path),))
+    return list(wanted)
+
+
+def ordered_partitions(conn: sqlite3.Connection, start=None, end=None) -> List[Partition]:
+    """Partições com transações em ``start <= date < end``, em ordem cronológica.
+
+    Os trechos do banco principal antes, entre e depois dos anos arquivados
+    são partições separadas, com os próprios limites: ler as partições em
+    ordem, cada uma ordenada por data, dá a ordem por data do período todo.
+    Sem anos arquivados no período, é só ``[Partition(None)]``.
+    """
+    start, end = _day(start), _day(end)
+    partitions, cursor = [], None
+    for year in sorted(archived_years(conn)):
+        first, last = f"{year:04d}-01-01", f"{year + 1:04d}-01-01"
+        if (start is not None and last <= start) or (end is not None and first >= end):
+            continue
+        lower = cursor or start
+        if lower is None or lower < first:
+            partitions.append(Partition(None, cursor, first))
+        partitions.append(Partition(year, first, last))
+        cursor = last
+    if cursor is None or end is None or cursor < end:
+        partitions.append(Partition(None, cursor))
+    return partitions
+
+
+def union_sources(conn: sqlite3.Connection, start=None, end=None) -> Iterator[str]:
+    """Origens ``FROM`` que, juntas, cobrem as transações de ``start <= date < end``.
+
+    Em geral uma só: ``transactions`` ou a ``UNION ALL`` das tabelas dos
+    anos arquivados alcançados com a do banco principal. Com mais anos do
+    que o limite de anexos, uma união por grupo; cada origem deve ser lida
+    por completo antes de pedir a seguinte, que pode desfazer os anexos.
+    """
+    partitions = ordered_partitions(conn, start, end)
+    years = [partition.year for partition in partitions if partition.year is not None]
+    if not years:
+        yield "transactions"
+        return
+
+    hot = any(partition.year is None for partition in partitions)
+    limit = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+    for offset in range(0, len(years), limit):
+        tables = [f"{schema}.transactions" for schema in attach(conn, years[offset:offset + limit])]
+        if hot and offset + limit >= len(years):
+            tables.append("main.transactions")
+        if len(tables) == 1:
+            yield tables[0]
+        else:
+            yield "(" + " UNION ALL ".join(f"SELECT {TRANSACTION_COLUMNS} FROM {table}" for table in tables) + ")"
+
+
+def _load_archived_years(conn: sqlite3.Connection) -> Dict[int, ArchivedYear]:
+    cursor = conn.execute("SELECT year, path, row_count, total_cents, archived_at FROM archived_years ORDER BY year")
+    return {row[0]: ArchivedYear(*row) for row in cursor.fetchall()}
+
+
+def _day(value) -> str | None:
+    if isinstance(value, (datetime, date)):
+        return value.strftime("%Y-%m-%d")
+    return value
@@ -0,0 +1,166 @@
+# src/repository/recurrence_repository.py
+from datetime import date
+from typing import TYPE_CHECKING, Dict, List
+
+from src.repository.base_repository import BaseRepository
+from src.database.connection import write_transaction
+from src.models.recurrence import Recurrence
+from src.repository.transaction_repository import date_param
+from src.services.profiling import instrument
+
+if TYPE_CHECKING:
+    import numpy as np
+
+_COLUMNS = "id, item_id, amount_cents, interval_months, start_date, end_date, materialized_until"
+
+@instrument("recurrences")
+class RecurrenceRepository(BaseRepository[Recurrence]):
+    """Recorrências agendadas (``recurrences``).
+
+    As ocorrências não são gravadas ao cadastrar: são calculadas sob demanda
+    por ``src.services.recurrences`` para o período pedido e, opcionalmente,
+    gravadas em ``transactions`` por ``add_occurrences`` (comando
+    ``python -m src.cli recorrencias --materializar``).
+    """
+
+    def add(self, recurrence: Recurrence) -> Recurrence:
+        with write_transaction(self.conn):
+            cursor = self.conn.execute(
+                """INSERT INTO recurrences
+                   (item_id, amount_cents, interval_months, start_date, end_date, materialized_until)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                self._to_params(recurrence)
+            )
+        self.cache.invalidate()
+        recurrence.id = cursor.lastrowid
+        return recurrence
+
+    def get_all(self) -> List[Recurrence]:
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT {_COLUMNS} FROM recurrences ORDER BY id")
+        return [self._from_row(row) for row in cursor.fetchall()]
+
+    def get_by_id(self, id: int) -> Recurrence:
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT {_COLUMNS} FROM recurrences WHERE id = ?", (id,))
+        row = cursor.fetchone()
+        return self._from_row(row) if row else None
+
+    def exists_for_item(self, item_id: int) -> bool:
+        """Se o item tem recorrências agendadas, inclusive encerradas."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT 1 FROM recurrences WHERE item_id = ? LIMIT 1", (item_id,))
+        return cursor.fetchone() is not None
+
+    def update(self, recurrence: Recurrence) -> Recurrence:
+        """Atualiza a recorrência; ao definir um fim, as transações pendentes
+        já geradas depois dele são removidas."""
+        with write_transaction(self.conn):
+            if recurrence.end_date:
+                self.conn.execute(
+                    "DELETE FROM transactions WHERE recurrence_id = ? AND is_completed = 0 AND date > ?",
+                    (recurrence.id, date_param(recurrence.end_date))
+                )
+            self.conn.execute(
+                """UPDATE recurrences
+                   SET item_id = ?, amount_cents = ?, interval_months = ?,
+                       start_date = ?, end_date = ?, materialized_until = ?
+                   WHERE id = ?""",
+                (*self._to_params(recurrence), recurrence.id)
+            )
+        self.cache.invalidate()
+        return recurrence
+
+    def delete(self, id: int) -> bool:
+        """Remove a recorrência; as transações já geradas por ela são mantidas."""
+        with write_transaction(self.conn):
+            self.conn.execute("UPDATE transactions SET recurrence_id = NULL WHERE recurrence_id = ?", (id,))
+            cursor = self.conn.execute("DELETE FROM recurrences WHERE id = ?", (id,))
+        self.cache.invalidate()
+        return cursor.rowcount > 0
+
+    def get_columns(self) -> Dict[str, "np.ndarray"]:
+        """Todas as recorrências em arrays NumPy, com nome e categoria do item.
+
+        Datas ausentes (sem fim, nada gravado) vêm como ``NaT``. O resultado
+        fica no cache até a próxima escrita e não deve ser alterado.
+        """
+        def load():
+            import numpy as np
+
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                SELECT r.id, r.item_id, COALESCE(i.name, 'N/A'), COALESCE(i.category, 'N/A'),
+                       r.amount_cents, r.interval_months, r.start_date, r.end_date, r.materialized_until
+                FROM recurrences r
+                LEFT JOIN items i ON i.id = r.item_id
+                ORDER BY r.id
+            """)
+            rows = cursor.fetchall()
+            names = ("id", "item_id", "name", "category", "amount_cents", "interval_months",
+                     "start_date", "end_date", "materialized_until")
+            values = list(zip(*rows)) if rows else [()] * len(names)
+            columns = dict(zip(names, values))
+            return {
+                "id": np.array(columns["id"], dtype=np.int64),
+                "item_id": np.array(columns["item_id"], dtype=np.int64),
+                "name": np.array(columns["name"], dtype=object),
+                "category": np.array(columns["category"], dtype=object),
+                "amount_cents": np.array(columns["amount_cents"], dtype=np.int64),
+                "interval_months": np.array(columns["interval_months"], dtype=np.int64),
+                **{
+                    name: np.array([value or "NaT" for value in columns[name]], dtype="datetime64[D]")
+                    for name in ("start_date", "end_date", "materialized_until")
+                },
+            }
+        return self.cache.get("recurrence_columns", load)
+
+    def add_occurrences(self, rows: List[tuple]) -> int:
+        """Grava ocorrências ``(recurrence_id, item_id, centavos, data)`` como
+        transações pendentes e recorrentes.
+
+        Ocorrências já gravadas são ignoradas pelo índice único
+        ``(recurrence_id, date)``. Retorna quantas foram inseridas.
+        """
+        if not rows:
+            return 0
+        with write_transaction(self.conn):
+            cursor = self.conn.executemany(
+                """INSERT OR IGNORE INTO transactions
+                   (recurrence_id, item_id, amount_cents, is_completed, is_recurring, date)
+                   VALUES (?, ?, ?, 0, 1, ?)""",
+                [(recurrence_id, item_id, cents, date_param(day)) for recurrence_id, item_id, cents, day in rows]
+            )
+        self.cache.invalidate()
+        return cursor.rowcount
+
+    def mark_materialized(self, until: date) -> None:
+        """Registra que as ocorrências até ``until`` (inclusive) já foram gravadas."""
+        with write_transaction(self.conn):
+            self.conn.execute(
+                """UPDATE recurrences SET materialized_until = ?
+                   WHERE start_date <= ? AND (materialized_until IS NULL OR materialized_until < ?)""",
+                (date_param(until),) * 3
+            )
+        self.cache.invalidate()
+
+    @staticmethod
+    def _to_params(recurrence: Recurrence) -> tuple:
+        return (
+            recurrence.item_id, recurrence.amount_cents, recurrence.interval_months,
+            date_param(recurrence.start_date),
+            date_param(recurrence.end_date) if recurrence.end_date else None,
+            date_param(recurrence.materialized_until) if recurrence.materialized_until else None,
+        )
+
+    @staticmethod
+    def _from_row(row) -> Recurrence:
+        return Recurrence(
+            id=row[0],
+            item_id=row[1],
+            amount_cents=row[2],
+            interval_months=row[3],
+            start_date=date.fromisoformat(row[4]),
+            end_date=date.fromisoformat(row[5]) if row[5] else None,
+            materialized_until=date.fromisoformat(row[6]) if row[6] else None,
+        )
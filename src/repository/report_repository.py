@@ -0,0 +1,172 @@
+# src/repository/report_repository.py
+from typing import List
+
+from src.database.connection import write_transaction
+from src.models.monthly_total import MonthlyTotal
+from src.repository.base_repository import ConnectedRepository
+from src.repository.partitions import union_sources
+from src.repository.transaction_repository import date_param
+from src.services.profiling import instrument
+
+# Totais por item e mês recalculados a partir de uma tabela de transações
+BALANCES_FROM = """
+    SELECT item_id, CAST(substr(date, 1, 4) AS INTEGER) AS year,
+           CAST(substr(date, 6, 2) AS INTEGER) AS month,
+           SUM(amount_cents) AS signed_total, COUNT(*) AS count
+    FROM {source}
+    GROUP BY 1, 2, 3
+"""
+
+# Conteúdo esperado de monthly_balances para os anos do banco principal
+EXPECTED_BALANCES = BALANCES_FROM.format(source="transactions")
+
+# monthly_balances sem os anos arquivados, conferidos por ArchiveRepository.verify
+HOT_BALANCES = "SELECT * FROM monthly_balances WHERE year NOT IN (SELECT year FROM archived_years)"
+
+@instrument("reports")
+class ReportRepository(ConnectedRepository):
+    """Consultas agregadas somente leitura usadas pelo dashboard.
+
+    Os totais por ano vêm da tabela ``monthly_balances``, mantida por
+    triggers a cada escrita em ``transactions``: o custo não depende de
+    quantos anos de histórico existem, e os anos arquivados continuam nela.
+    Os demais totais são calculados pelo SQLite (``GROUP BY item_id,
+    month``) sobre as partições do período pedido. Os resultados ficam no
+    cache da conexão até a próxima escrita.
+    """
+
+    def get_years(self) -> List[int]:
+        return self.cache.get("years", self._load_years)
+
+    def get_monthly_totals(self, start, end, recurring_only: bool = False) -> List[MonthlyTotal]:
+        """Soma em centavos com sinal por item e mês para ``start <= date < end``."""
+        start, end = date_param(start), date_param(end)
+        return self.cache.get(
+            ("monthly_totals", start, end, recurring_only),
+            lambda: self._load_monthly_totals(start, end, recurring_only)
+        )
+
+    def get_year_totals(self, year: int) -> List[MonthlyTotal]:
+        return self.cache.get(("year_totals", year), lambda: self._load_year_totals(year))
+
+    def get_all_totals(self) -> List[MonthlyTotal]:
+        """Totais de todo o histórico por item, ano e mês (base das visões consolidadas)."""
+        return self.cache.get("all_totals", self._load_all_totals)
+
+    def get_cells(self, year: int, cells: List[tuple[int, int]]) -> dict[tuple[int, int], int]:
+        """Totais em centavos de algumas células ``(item_id, mês)`` do ano.
+
+        Células sem transações ficam de fora. Não usa o cache: é a leitura
+        pontual de quem atualiza a matriz a partir do histórico de alterações.
+        """
+        if not cells:
+            return {}
+        item_ids = sorted({item_id for item_id, _ in cells})
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            SELECT item_id, month, signed_total FROM monthly_balances
+            WHERE year = ? AND item_id IN ({', '.join('?' * len(item_ids))})
+        """, [year, *item_ids])
+        wanted = set(cells)
+        return {(item_id, month): total for item_id, month, total in cursor.fetchall() if (item_id, month) in wanted}
+
+    def verify_balances(self) -> List[tuple]:
+        """Compara ``monthly_balances`` com os totais recalculados dos anos
+        do banco principal.
+
+        Retorna as divergências como ``(item_id, ano, mês, total_gravado,
+        qtd_gravada, total_esperado, qtd_esperada)``; lista vazia se não houver.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            WITH expected AS ({EXPECTED_BALANCES}),
+                 balances AS ({HOT_BALANCES}),
+                 drift AS (
+                     SELECT item_id, year, month FROM (
+                         SELECT * FROM expected EXCEPT SELECT * FROM balances
+                     )
+                     UNION
+                     SELECT item_id, year, month FROM (
+                         SELECT * FROM balances EXCEPT SELECT * FROM expected
+                     )
+                 )
+            SELECT d.item_id, d.year, d.month, b.signed_total, b.count, e.signed_total, e.count
+            FROM drift d
+            LEFT JOIN balances b USING (item_id, year, month)
+            LEFT JOIN expected e USING (item_id, year, month)
+            ORDER BY d.year, d.month, d.item_id
+        """)
+        return cursor.fetchall()
+
+    def rebuild_balances(self) -> int:
+        """Recalcula ``monthly_balances`` dos anos do banco principal; retorna o
+        número de linhas. Os totais dos anos arquivados são mantidos.
+        """
+        with write_transaction(self.conn):
+            self.conn.execute("DELETE FROM monthly_balances WHERE year NOT IN (SELECT year FROM archived_years)")
+            cursor = self.conn.execute(
+                f"INSERT INTO monthly_balances (item_id, year, month, signed_total, count) {EXPECTED_BALANCES}"
+            )
+        self.cache.invalidate()
+        return cursor.rowcount
+
+    def _load_years(self) -> List[int]:
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT DISTINCT year FROM monthly_balances ORDER BY year")
+        return [row[0] for row in cursor.fetchall()]
+
+    def _load_year_totals(self, year: int) -> List[MonthlyTotal]:
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT b.item_id,
+                   COALESCE(i.name, 'N/A'),
+                   COALESCE(i.category, 'N/A'),
+                   b.month,
+                   b.signed_total
+            FROM monthly_balances b
+            LEFT JOIN items i ON i.id = b.item_id
+            WHERE b.year = ?
+        """, (year,))
+        return [MonthlyTotal(*row) for row in cursor.fetchall()]
+
+    def _load_all_totals(self) -> List[MonthlyTotal]:
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT b.item_id,
+                   COALESCE(i.name, 'N/A'),
+                   COALESCE(i.category, 'N/A'),
+                   b.month,
+                   b.signed_total,
+                   b.year
+            FROM monthly_balances b
+            LEFT JOIN items i ON i.id = b.item_id
+        """)
+        return [MonthlyTotal(*row) for row in cursor.fetchall()]
+
+    def _load_monthly_totals(self, start: str, end: str, recurring_only: bool) -> List[MonthlyTotal]:
+        query = """
+            SELECT t.item_id,
+                   COALESCE(i.name, 'N/A'),
+                   COALESCE(i.category, 'N/A'),
+                   CAST(substr(t.date, 6, 2) AS INTEGER) AS month,
+                   SUM(t.amount_cents)
+            FROM {source} t
+            LEFT JOIN items i ON i.id = t.item_id
+            WHERE t.date >= ? AND t.date < ?
+        """
+        if recurring_only:
+            query += " AND t.is_recurring = 1"
+        query += " GROUP BY t.item_id, month"
+
+        # Com vários grupos de partições, os totais de cada um são somados
+        cursor = self.conn.cursor()
+        totals: dict[tuple[int, int], MonthlyTotal] = {}
+        for source in union_sources(self.conn, start, end):
+            cursor.execute(query.format(source=source), (start, end))
+            for row in cursor.fetchall():
+                total = MonthlyTotal(*row)
+                if (total.item_id, total.month) in totals:
+                    totals[total.item_id, total.month].total_cents += total.total_cents
+                else:
+                    totals[total.item_id, total.month] = total
+        return list(totals.values())
@@ -1,117 +1,436 @@
 # src/repository/transaction_repository.py
-import os
-import sys
-from typing import List
-from datetime import datetime
-
-# Adiciona o diretório raiz ao path do Python
-current_dir = os.path.dirname(os.path.abspath(__file__))
-parent_dir = os.path.dirname(os.path.dirname(current_dir))
-sys.path.append(parent_dir)
+from typing import TYPE_CHECKING, Dict, Iterator, List
+from datetime import date, datetime
 
 from src.repository.base_repository import BaseRepository
+from src.database.connection import write_transaction
 from src.models.transaction import Transaction
+from src.models.transaction_filter import TransactionFilter
+from src.repository.journal_repository import MATRIX_SCOPE, record_batch
+from src.repository.partitions import archived_years, ordered_partitions, union_sources
+from src.services.profiling import instrument
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Colunas devolvidas por get_columns e seus tipos NumPy (o NumPy só é
+# importado na primeira leitura)
+COLUMN_DTYPES = {
+    "id": "int64",
+    "item_id": "int64",
+    "amount_cents": "int64",
+    "is_completed": "bool",
+    "is_recurring": "bool",
+    "date": "datetime64[D]",
+}
+# Formato lido do cursor: a data chega como texto 'YYYY-MM-DD'
+_ROW_FIELDS = [(name, "U10" if name == "date" else dtype) for name, dtype in COLUMN_DTYPES.items()]
 
+@instrument("transactions")
 class TransactionRepository(BaseRepository[Transaction]):
+    """Transações do banco principal e dos anos arquivados.
+
+    As leituras alcançam só as partições do período pedido (ver
+    ``repository/partitions.py``); as escritas vão sempre para o banco
+    principal, que recusa datas de anos arquivados (``ano arquivado``).
+    """
+
     def add(self, transaction: Transaction) -> Transaction:
-        cursor = self.conn.cursor()
-        date_str = transaction.date.strftime("%Y-%m-%d") if isinstance(transaction.date, datetime) else transaction.date
+        with write_transaction(self.conn):
+            cursor = self.conn.cursor()
+            date_str = date_param(transaction.date)
         
-        cursor.execute(
-            """INSERT INTO transactions 
-               (item_id, value, type, is_completed, is_recurring, date) 
-               VALUES (?, ?, ?, ?, ?, ?)""",
-            (transaction.item_id, transaction.value, transaction.type,
-             transaction.is_completed, transaction.is_recurring, date_str)
-        )
-        self.conn.commit()
+            cursor.execute(
+                """INSERT INTO transactions 
+                   (item_id, amount_cents, is_completed, is_recurring, date) 
+                   VALUES (?, ?, ?, ?, ?)""",
+                (transaction.item_id, transaction.amount_cents,
+                 transaction.is_completed, transaction.is_recurring, date_str)
+            )
+        self.cache.invalidate()
         transaction.id = cursor.lastrowid
         return transaction
     
     def get_all(self) -> List[Transaction]:
+        """Todas as transações, partição por partição em ordem cronológica."""
         cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT id, item_id, value, type, is_completed, is_recurring, date 
-            FROM transactions
-        """)
-        return [
-            Transaction(
-                id=row[0],
-                item_id=row[1],
-                value=row[2],
-                type=row[3],
-                is_completed=bool(row[4]),
-                is_recurring=bool(row[5]),
-                date=Transaction.format_date(row[6])
-            )
-            for row in cursor.fetchall()
-        ]
+        transactions = []
+        for partition in ordered_partitions(self.conn):
+            conditions, params = partition.conditions()
+            query = f"SELECT id, item_id, amount_cents, is_completed, is_recurring, date FROM {partition.table(self.conn)}"
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            cursor.execute(query, params)
+            transactions.extend(self._from_row(row) for row in cursor.fetchall())
+        return transactions
     
     def get_by_id(self, id: int) -> Transaction:
         cursor = self.conn.cursor()
         cursor.execute("""
-            SELECT id, item_id, value, type, is_completed, is_recurring, date 
+            SELECT id, item_id, amount_cents, is_completed, is_recurring, date 
             FROM transactions WHERE id = ?
         """, (id,))
         row = cursor.fetchone()
-        if row:
-            return Transaction(
-                id=row[0],
-                item_id=row[1],
-                value=row[2],
-                type=row[3],
-                is_completed=bool(row[4]),
-                is_recurring=bool(row[5]),
-                date=Transaction.format_date(row[6])
-            )
-        return None
+        # Fora do banco principal, só pode estar em um ano arquivado
+        if row is None and archived_years(self.conn):
+            for source in union_sources(self.conn):
+                cursor.execute(f"SELECT id, item_id, amount_cents, is_completed, is_recurring, date FROM {source} WHERE id = ?", (id,))
+                row = cursor.fetchone()
+                if row is not None:
+                    break
+        return self._from_row(row) if row else None
     
     def update(self, transaction: Transaction) -> Transaction:
-        cursor = self.conn.cursor()
-        date_str = transaction.date.strftime("%Y-%m-%d") if isinstance(transaction.date, datetime) else transaction.date
+        with write_transaction(self.conn):
+            cursor = self.conn.cursor()
+            date_str = date_param(transaction.date)
         
-        cursor.execute(
-            """UPDATE transactions 
-               SET item_id = ?, value = ?, type = ?, is_completed = ?, 
-                   is_recurring = ?, date = ?
-               WHERE id = ?""",
-            (transaction.item_id, transaction.value, transaction.type,
-             transaction.is_completed, transaction.is_recurring, 
-             date_str, transaction.id)
-        )
-        self.conn.commit()
+            cursor.execute(
+                """UPDATE transactions 
+                   SET item_id = ?, amount_cents = ?, is_completed = ?, 
+                       is_recurring = ?, date = ?
+                   WHERE id = ?""",
+                (transaction.item_id, transaction.amount_cents,
+                 transaction.is_completed, transaction.is_recurring, 
+                 date_str, transaction.id)
+            )
+        self.cache.invalidate()
         return transaction
 
     def delete(self, id: int) -> bool:
-        cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM transactions WHERE id = ?", (id,))
-        self.conn.commit()
+        with write_transaction(self.conn):
+            cursor = self.conn.cursor()
+            cursor.execute("DELETE FROM transactions WHERE id = ?", (id,))
+        self.cache.invalidate()
         return cursor.rowcount > 0
 
+    def add_many(self, transactions: List[Transaction]) -> List[Transaction]:
+        """Insere várias transações com um único ``executemany`` e um único commit."""
+        if not transactions:
+            return transactions
+        with write_transaction(self.conn):
+            cursor = self.conn.cursor()
+            cursor.executemany(
+                """INSERT INTO transactions 
+                   (item_id, amount_cents, is_completed, is_recurring, date) 
+                   VALUES (?, ?, ?, ?, ?)""",
+                [self._to_params(t) for t in transactions]
+            )
+            # Dentro da mesma transação os ids AUTOINCREMENT são consecutivos
+            last_id = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+        self.cache.invalidate()
+        for offset, transaction in enumerate(reversed(transactions)):
+            transaction.id = last_id - offset
+        return transactions
+
+    def update_many(self, transactions: List[Transaction]) -> List[Transaction]:
+        """Atualiza várias transações com um único ``executemany`` e um único commit."""
+        if not transactions:
+            return transactions
+        with write_transaction(self.conn):
+            self.conn.executemany(
+                """UPDATE transactions 
+                   SET item_id = ?, amount_cents = ?, is_completed = ?, 
+                       is_recurring = ?, date = ?
+                   WHERE id = ?""",
+                [self._to_params(t) + (t.id,) for t in transactions]
+            )
+        self.cache.invalidate()
+        return transactions
+
+    def upsert_cells(self, cells: List[tuple[int, int, int, int]]) -> tuple[int, int, List[tuple[int, int, int]]]:
+        """Grava células da matriz ``(item_id, ano, mês, centavos)`` em uma transação.
+
+        A célula atualiza a única transação do item no mês ou, se não houver
+        nenhuma, cria uma transação efetivada no dia 1º. Células com mais de
+        uma transação no mês não são alteradas e voltam em ``conflicts``.
+        As gravações formam um lote que pode ser desfeito
+        (``JournalRepository.undo``). Retorna ``(inseridas, atualizadas, conflicts)``.
+        """
+        if not cells:
+            return 0, 0, []
+
+        # Uma única consulta para todos os meses e itens afetados, feita dentro
+        # da transação de escrita para que ninguém grave entre a leitura e o UPDATE
+        periods = [(year, month) for _, year, month, _ in cells]
+        start = month_bounds(*min(periods))[0]
+        end = month_bounds(*max(periods))[1]
+        item_ids = sorted({item_id for item_id, _, _, _ in cells})
+        with write_transaction(self.conn), record_batch(self.conn, MATRIX_SCOPE):
+            cursor = self.conn.cursor()
+            cursor.execute(f"""
+                SELECT id, item_id, CAST(substr(date, 1, 4) AS INTEGER), CAST(substr(date, 6, 2) AS INTEGER)
+                FROM transactions
+                WHERE date >= ? AND date < ? AND item_id IN ({', '.join('?' * len(item_ids))})
+            """, [date_param(start), date_param(end), *item_ids])
+            existing: dict[tuple[int, int, int], List[int]] = {}
+            for transaction_id, item_id, year, month in cursor.fetchall():
+                existing.setdefault((item_id, year, month), []).append(transaction_id)
+
+            inserts, updates, conflicts = [], [], []
+            for item_id, year, month, cents in cells:
+                ids = existing.get((item_id, year, month), [])
+                if len(ids) > 1:
+                    conflicts.append((item_id, year, month))
+                elif ids:
+                    updates.append((cents, ids[0]))
+                else:
+                    inserts.append((item_id, cents, True, False, date(year, month, 1).isoformat()))
+
+            self.conn.executemany(
+                "UPDATE transactions SET amount_cents = ? WHERE id = ?", updates
+            )
+            self.conn.executemany(
+                """INSERT INTO transactions 
+                   (item_id, amount_cents, is_completed, is_recurring, date) 
+                   VALUES (?, ?, ?, ?, ?)""",
+                inserts
+            )
+        self.cache.invalidate()
+        return len(inserts), len(updates), conflicts
+
+    def add_imported(self, rows: List[tuple]) -> int:
+        """Insere linhas ``(item_id, centavos, data, import_hash)`` de um extrato.
+
+        Linhas cujo ``import_hash`` já existe são ignoradas pelo índice único.
+        Retorna quantas linhas foram de fato inseridas.
+        """
+        if not rows:
+            return 0
+        with write_transaction(self.conn):
+            # rowcount não inclui as linhas gravadas pelos triggers de monthly_balances
+            cursor = self.conn.executemany(
+                """INSERT OR IGNORE INTO transactions 
+                   (item_id, amount_cents, is_completed, is_recurring, date, import_hash) 
+                   VALUES (?, ?, 1, 0, ?, ?)""",
+                rows
+            )
+        self.cache.invalidate()
+        return cursor.rowcount
+
+    def exists_for_item(self, item_id: int) -> bool:
+        """Se o item tem transações, inclusive em anos arquivados."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT 1 FROM transactions WHERE item_id = ? LIMIT 1", (item_id,))
+        if cursor.fetchone() is not None:
+            return True
+        for partition in ordered_partitions(self.conn):
+            if partition.year is not None:
+                cursor.execute(f"SELECT 1 FROM {partition.table(self.conn)} WHERE item_id = ? LIMIT 1", (item_id,))
+                if cursor.fetchone() is not None:
+                    return True
+        return False
+
+    def get_by_period(self, start, end, item_ids: List[int] | None = None) -> List[Transaction]:
+        """Transações com ``start <= date < end``, opcionalmente filtradas por item.
+
+        A comparação direta na coluna ``date`` usa os índices ``(date)`` e
+        ``(item_id, date)``, ao contrário de ``strftime(...)`` que força uma
+        varredura completa da tabela.
+        """
+        query = """
+            SELECT id, item_id, amount_cents, is_completed, is_recurring, date 
+            FROM {source} 
+            WHERE date >= ? AND date < ?
+        """
+        params = [date_param(start), date_param(end)]
+        if item_ids is not None:
+            item_ids = list(item_ids)
+            if not item_ids:
+                return []
+            query += f" AND item_id IN ({', '.join('?' * len(item_ids))})"
+            params.extend(item_ids)
+
+        cursor = self.conn.cursor()
+        transactions = []
+        for source in union_sources(self.conn, start, end):
+            cursor.execute(query.format(source=source), params)
+            transactions.extend(self._from_row(row) for row in cursor.fetchall())
+        return transactions
+
+    def get_page(
+        self,
+        filters: TransactionFilter | None = None,
+        limit: int = 50,
+        after: tuple[str, int] | None = None,
+    ) -> tuple[List[Transaction], tuple[str, int] | None]:
+        """Uma página de transações filtradas, da mais recente para a mais antiga.
+
+        Paginação por chave (keyset): ``after`` é o cursor ``(date, id)``
+        devolvido pela página anterior, e a consulta continua a partir dele
+        pelo índice de ``date`` em vez de usar ``OFFSET``. Retorna as
+        transações e o cursor da próxima página (``None`` na última).
+
+        As partições são lidas da mais recente para a mais antiga e a leitura
+        para quando a página está completa: anos arquivados só são anexados
+        quando a paginação chega a eles.
+        """
+        conditions, params = filter_conditions(filters)
+        if after is not None:
+            conditions.append("(date < ? OR (date = ? AND id < ?))")
+            params.extend([after[0], after[0], after[1]])
+
+        filters = filters or TransactionFilter()
+        cursor = self.conn.cursor()
+        rows = []
+        for partition in reversed(ordered_partitions(self.conn, filters.start, filters.end)):
+            # Partição inteira depois do cursor: já foi mostrada
+            if after is not None and partition.start is not None and after[0] < partition.start:
+                continue
+            bounds, bound_params = partition.conditions()
+            query = f"SELECT id, item_id, amount_cents, is_completed, is_recurring, date FROM {partition.table(self.conn)}"
+            if conditions or bounds:
+                query += " WHERE " + " AND ".join(conditions + bounds)
+            query += " ORDER BY date DESC, id DESC LIMIT ?"
+            cursor.execute(query, params + bound_params + [limit + 1 - len(rows)])
+            rows.extend(cursor.fetchall())
+            if len(rows) > limit:
+                break
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = (rows[-1][5], rows[-1][0])
+        return [self._from_row(row) for row in rows], next_cursor
+
+    def get_columns(self, filters: TransactionFilter | None = None, chunk_size: int = 65536) -> Dict[str, "np.ndarray"]:
+        """Transações filtradas como um array NumPy por coluna (ver ``COLUMN_DTYPES``).
+
+        Não cria um ``Transaction`` por linha: o cursor é lido em blocos de
+        ``chunk_size`` linhas, cada bloco vira um array estruturado e as
+        datas são convertidas de uma vez para ``datetime64[D]``. Ordenado por
+        ``id`` (ordem de gravação) dentro de cada partição, e as partições
+        em ordem cronológica.
+        """
+        conditions, params = filter_conditions(filters)
+
+        import numpy as np
+
+        filters = filters or TransactionFilter()
+        cursor = self.conn.cursor()
+        row_dtype = np.dtype(_ROW_FIELDS)
+        chunks = {name: [np.empty(0, dtype=dtype)] for name, dtype in COLUMN_DTYPES.items()}
+        for partition in ordered_partitions(self.conn, filters.start, filters.end):
+            bounds, bound_params = partition.conditions()
+            query = f"SELECT id, item_id, amount_cents, is_completed, is_recurring, date FROM {partition.table(self.conn)}"
+            if conditions or bounds:
+                query += " WHERE " + " AND ".join(conditions + bounds)
+            query += " ORDER BY id"
+            cursor.execute(query, params + bound_params)
+            while rows := cursor.fetchmany(chunk_size):
+                block = np.fromiter(rows, dtype=row_dtype, count=len(rows))
+                for name, dtype in COLUMN_DTYPES.items():
+                    chunks[name].append(block[name].astype(dtype))
+        return {name: np.concatenate(parts) for name, parts in chunks.items()}
+
+    def get_arrow(self, filters: TransactionFilter | None = None):
+        """Mesmo conteúdo de ``get_columns`` como uma ``pyarrow.Table``."""
+        import pyarrow as pa
+
+        return pa.table(self.get_columns(filters))
+
+    def iter_with_items(self, filters: TransactionFilter | None = None, chunk_size: int = 65536) -> Iterator[List[tuple]]:
+        """Transações filtradas com nome e categoria do item, em blocos de até
+        ``chunk_size`` linhas ``(id, data, item, categoria, centavos,
+        efetivado, recorrente)``, ordenadas por data e ``id``.
+
+        Só um bloco fica em memória por vez: usado pelas exportações. As
+        partições são lidas uma de cada vez, em ordem cronológica.
+        """
+        conditions, params = filter_conditions(filters)
+        filters = filters or TransactionFilter()
+        cursor = self.conn.cursor()
+        for partition in ordered_partitions(self.conn, filters.start, filters.end):
+            bounds, bound_params = partition.conditions()
+            query = f"""
+                SELECT t.id, t.date, COALESCE(i.name, 'N/A'), COALESCE(i.category, 'N/A'),
+                       t.amount_cents, t.is_completed, t.is_recurring
+                FROM {partition.table(self.conn)} t
+                LEFT JOIN items i ON i.id = t.item_id
+            """
+            if conditions or bounds:
+                query += " WHERE " + " AND ".join(conditions + bounds)
+            query += " ORDER BY t.date, t.id"
+
+            cursor.execute(query, params + bound_params)
+            while rows := cursor.fetchmany(chunk_size):
+                yield rows
+
     def get_by_item_month_year(self, item_id: int, month: int, year: int) -> List[Transaction]:
+        start, end = month_bounds(year, month)
+        return self.get_by_period(start, end, [item_id])
+
+    def sum_cents(self, start, end, item_ids: List[int] | None = None) -> int:
+        """Soma exata, em centavos com sinal, das transações do período."""
+        query = "SELECT COALESCE(SUM(amount_cents), 0) FROM {source} WHERE date >= ? AND date < ?"
+        params = [date_param(start), date_param(end)]
+        if item_ids is not None:
+            item_ids = list(item_ids)
+            query += f" AND item_id IN ({', '.join('?' * len(item_ids))})"
+            params.extend(item_ids)
+
         cursor = self.conn.cursor()
-        # SQLite strftime returns string, so we compare with string formatted month/year
-        # %m is 01-12, %Y is YYYY
-        month_str = f"{month:02d}"
-        year_str = str(year)
-        
-        cursor.execute("""
-            SELECT id, item_id, value, type, is_completed, is_recurring, date 
-            FROM transactions 
-            WHERE item_id = ? 
-            AND strftime('%m', date) = ? 
-            AND strftime('%Y', date) = ?
-        """, (item_id, month_str, year_str))
-        
-        return [
-            Transaction(
-                id=row[0],
-                item_id=row[1],
-                value=row[2],
-                type=row[3],
-                is_completed=bool(row[4]),
-                is_recurring=bool(row[5]),
-                date=Transaction.format_date(row[6])
-            )
-            for row in cursor.fetchall()
-        ]
\ No newline at end of file
+        total = 0
+        for source in union_sources(self.conn, start, end):
+            cursor.execute(query.format(source=source), params)
+            total += cursor.fetchone()[0]
+        return total
+
+    @staticmethod
+    def _to_params(transaction: Transaction) -> tuple:
+        return (transaction.item_id, transaction.amount_cents, transaction.is_completed,
+                transaction.is_recurring, date_param(transaction.date))
+
+    @staticmethod
+    def _from_row(row) -> Transaction:
+        transaction = Transaction(
+            id=row[0],
+            item_id=row[1],
+            is_completed=bool(row[3]),
+            is_recurring=bool(row[4]),
+            date=Transaction.format_date(row[5])
+        )
+        transaction.amount_cents = row[2]
+        return transaction
+
+
+def filter_conditions(filters: TransactionFilter | None) -> tuple[List[str], list]:
+    """Condições SQL (unidas por AND) e parâmetros equivalentes aos filtros."""
+    filters = filters or TransactionFilter()
+    conditions, params = [], []
+    if filters.start is not None:
+        conditions.append("date >= ?")
+        params.append(date_param(filters.start))
+    if filters.end is not None:
+        conditions.append("date < ?")
+        params.append(date_param(filters.end))
+    if filters.item_id is not None:
+        conditions.append("item_id = ?")
+        params.append(filters.item_id)
+    if filters.category is not None:
+        conditions.append("item_id IN (SELECT id FROM items WHERE category = ?)")
+        params.append(filters.category)
+    if filters.is_completed is not None:
+        conditions.append("is_completed = ?")
+        params.append(int(filters.is_completed))
+    if filters.min_value is not None:
+        conditions.append("ABS(amount_cents) >= ?")
+        params.append(round(filters.min_value * 100))
+    if filters.max_value is not None:
+        conditions.append("ABS(amount_cents) <= ?")
+        params.append(round(filters.max_value * 100))
+    return conditions, params
+
+
+def date_param(value) -> str:
+    """Converte date/datetime para o formato armazenado na coluna ``date``."""
+    if isinstance(value, (datetime, date)):
+        return value.strftime("%Y-%m-%d")
+    return value
+
+
+def month_bounds(year: int, month: int) -> tuple[date, date]:
+    """Primeiro dia do mês e primeiro dia do mês seguinte."""
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
@@ -0,0 +1,246 @@
+# src/services/dashboard.py
+"""Etapas da matriz item × mês do dashboard, sem dependência do Streamlit.
+
+``principal.py`` apenas encadeia estas funções e exibe o resultado; os
+benchmarks executam as mesmas etapas isoladamente.
+"""
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Hashable, List
+
+import numpy as np
+import pandas as pd
+
+from src.models.change import Change
+from src.models.monthly_total import MonthlyTotal
+from src.repository.recurrence_repository import RecurrenceRepository
+from src.repository.report_repository import ReportRepository
+from src.services.display import MESES
+from src.services.money import parse_cents_array
+from src.services.projection import add_scheduled, project_recurring
+from src.services.recurrences import occurrences, scheduled_totals
+
+# Acima desse número de alterações, recalcular a matriz sai mais barato que aplicá-las
+REFRESH_LIMIT = 5000
+
+# Colunas de MonthlyTotal e seus nomes na matriz
+TOTAL_COLUMNS = {"item_id": "item_id", "name": "Item", "category": "Categoria", "month": "Ref", "total_cents": "Valor"}
+
+
+def totals_frame(totals: List[MonthlyTotal]) -> pd.DataFrame:
+    return pd.DataFrame(totals, columns=list(TOTAL_COLUMNS)).rename(columns=TOTAL_COLUMNS)
+
+
+def load_year_data(
+    report_repo: ReportRepository,
+    year: int,
+    today: datetime,
+    recurrence_repo: RecurrenceRepository | None = None,
+) -> pd.DataFrame:
+    """Totais mensais do ano, com a projeção dos meses a partir do atual.
+
+    As recorrências agendadas (``recurrence_repo``) são projetadas no ano
+    atual e nos seguintes; no ano atual, os itens sem agendamento repetem
+    os recorrentes do mês anterior.
+    """
+    data = totals_frame(report_repo.get_year_totals(year))
+    scheduled_items = recurrence_repo.get_columns()["item_id"] if recurrence_repo is not None else []
+
+    # Se o ano selecionado for o atual, projeta as transações recorrentes para os meses seguintes
+    if today.year == year:
+        # Totais recorrentes da referência anterior
+        inicio_mes_atual = today.replace(day=1)
+        inicio_mes_anterior = (inicio_mes_atual - timedelta(days=1)).replace(day=1)
+        recorrentes = totals_frame(
+            report_repo.get_monthly_totals(inicio_mes_anterior, inicio_mes_atual, recurring_only=True)
+        )
+        recorrentes = recorrentes[~recorrentes["item_id"].isin(scheduled_items)]
+        data = project_recurring(recorrentes, data, first_month=today.month)
+
+    if len(scheduled_items) and year >= today.year:
+        first_month = today.month if year == today.year else 1
+        scheduled = scheduled_totals(occurrences(recurrence_repo, date(year, first_month, 1), date(year + 1, 1, 1)))
+        data = add_scheduled(scheduled, data)
+
+    return data
+
+
+def build_matrix(data: pd.DataFrame) -> tuple[pd.DataFrame, List[str]]:
+    """Pivota os totais em centavos para a matriz em reais exibida no editor.
+
+    Retorna a matriz (Item, Categoria e um coluna por mês com lançamentos,
+    indexada por ``item_id``) e a lista de colunas de mês. O índice é a
+    chave estável de cada linha: fica oculto no editor e é por ele que as
+    edições chegam ao banco.
+
+    As linhas são ordenadas por tipo, categoria e item. O tipo é o sinal da
+    soma do item no ano, projeção incluída: créditos (saldo positivo ou
+    zero) primeiro, depois débitos. Antes ele vinha do tipo (D/C) de cada
+    transação, e um item com créditos e débitos aparecia em duas linhas,
+    uma em cada grupo; com uma linha por item, ele fica só no grupo do
+    seu saldo.
+    """
+    # Pivotando a tabela: linhas itens, colunas mês
+    df_exibicao = pd.pivot_table(
+        data,
+        values="Valor",
+        index=["item_id", "Item", "Categoria"],
+        columns="Ref",
+        aggfunc='sum'
+    )
+
+    # Converte de centavos para reais e nomeia as colunas com os meses
+    df_exibicao = (df_exibicao / 100).round(2)
+    df_exibicao.columns = [MESES[int(num) - 1] for num in df_exibicao.columns]
+    colunas_meses = df_exibicao.columns.tolist()
+
+    # Classifica o dataframe: Créditos (itens com saldo anual positivo ou zero) primeiro
+    df_exibicao["Tipo"] = np.where(df_exibicao.sum(axis=1) < 0, "Débito", "Crédito")
+    df_exibicao = df_exibicao.reset_index().sort_values(by=["Tipo", "Categoria", "Item"])
+
+    # Reorganiza as colunas
+    df_exibicao = df_exibicao.set_index("item_id")[["Item", "Categoria"] + colunas_meses]
+    return df_exibicao, colunas_meses
+
+
+def load_matrix(
+    report_repo: ReportRepository,
+    year: int,
+    today: datetime,
+    recurrence_repo: RecurrenceRepository | None = None,
+) -> tuple[pd.DataFrame, List[str]]:
+    """``load_year_data`` + ``build_matrix`` memorizados por ano e versão dos dados.
+
+    O resultado fica no cache da conexão (invalidado a cada escrita) e é
+    compartilhado entre reruns e sessões: não deve ser alterado. O mês
+    atual entra na chave porque define a projeção dos recorrentes.
+    """
+    return report_repo.cache.get(
+        ("matrix", year, today.year, today.month, recurrence_repo is not None),
+        lambda: build_matrix(load_year_data(report_repo, year, today, recurrence_repo))
+    )
+
+
+@dataclass
+class MatrixState:
+    """Matriz em edição em uma sessão.
+
+    ``styled`` é o que o editor recebe e não muda entre as edições: o
+    ``st.data_editor`` mantém as alterações do usuário sobre ele e só é
+    recriado (``generation``) quando a matriz é recarregada. ``frame`` é a
+    cópia numérica que recebe cada edição gravada, célula a célula, e
+    ``applied`` guarda o último valor já processado de cada célula, para
+    que cada callback grave apenas o que mudou desde o anterior.
+    """
+    year: int
+    version: Hashable
+    frame: pd.DataFrame
+    month_columns: List[str]
+    styled: object = None
+    generation: int = 0
+    applied: dict = field(default_factory=dict)
+    seq: int = 0  # última entrada do histórico de alterações já refletida em frame
+
+    def apply(self, cells: List[tuple[int, int, int, int]]) -> None:
+        """Copia as células gravadas ``(item_id, ano, mês, centavos)`` para ``frame``."""
+        for item_id, _, month, cents in cells:
+            self.frame.at[item_id, MESES[month - 1]] = cents / 100
+
+
+def changed_cells(changes: List[Change], year: int, today: datetime) -> set[tuple[int, int]] | None:
+    """Células ``(item_id, mês)`` da matriz do ano alteradas por ``changes``.
+
+    Retorna None quando as alterações mudam mais do que os totais das
+    células e a matriz precisa ser recalculada: nomes de itens,
+    recorrências agendadas ou transações que alimentam a projeção (do mês
+    anterior ao atual em diante, no ano atual e nos seguintes).
+    """
+    projection_start = (today.replace(day=1) - timedelta(days=1)).strftime("%Y-%m-01")
+    cells = set()
+    for change in changes:
+        if change.table == "items" and change.op == "U":
+            return None
+        if change.table == "recurrences" and year >= today.year:
+            return None
+        if change.table != "transactions" or change.op not in ("I", "U", "D"):
+            continue
+        for values in change.values():
+            if year >= today.year and values["date"] >= projection_start:
+                return None
+            if int(values["date"][:4]) == year:
+                cells.add((values["item_id"], int(values["date"][5:7])))
+    return cells
+
+
+def refresh_matrix(
+    state: MatrixState,
+    changes: List[Change],
+    report_repo: ReportRepository,
+    today: datetime,
+) -> bool:
+    """Atualiza em ``state.frame`` só as células alteradas desde ``state.seq``.
+
+    Os totais das células vêm de ``monthly_balances``. Retorna False, sem
+    alterar nada, se a matriz precisar ser recalculada: alterações que
+    ``changed_cells`` não resolve ou células fora da matriz (item ou mês
+    ainda sem linha/coluna).
+    """
+    cells = changed_cells(changes, state.year, today)
+    if cells is None:
+        return False
+    if any(item_id not in state.frame.index or MESES[month - 1] not in state.frame.columns for item_id, month in cells):
+        return False
+
+    totals = report_repo.get_cells(state.year, list(cells))
+    for item_id, month in cells:
+        total = totals.get((item_id, month))
+        state.frame.at[item_id, MESES[month - 1]] = total / 100 if total is not None else np.nan
+    if changes:
+        state.seq = changes[-1].seq
+    return True
+
+
+def pending_edits(edited_rows: dict, applied: dict) -> dict:
+    """Edições do ``st.data_editor`` ainda não processadas, no mesmo formato
+    ``{linha: {coluna: valor}}``; ``applied`` é atualizado com elas."""
+    pending = {}
+    for idx, changes in edited_rows.items():
+        for col_name, value in changes.items():
+            if applied.get((int(idx), col_name), object()) != value:
+                pending.setdefault(int(idx), {})[col_name] = value
+                applied[(int(idx), col_name)] = value
+    return pending
+
+
+def edits_to_cells(
+    edited_rows: dict,
+    matrix: pd.DataFrame,
+    year: int,
+) -> tuple[List[tuple[int, int, int, int]], List[str]]:
+    """Converte as edições do ``st.data_editor`` em células para ``upsert_cells``.
+
+    As linhas editadas são posições em ``matrix``, cujo índice é o
+    ``item_id``. Retorna as células ``(item_id, ano, mês, centavos)`` e os
+    nomes das colunas cujo valor não pôde ser interpretado.
+    """
+    # Todas as células editadas são convertidas de uma vez
+    pending, values = [], []
+    for idx, changes in edited_rows.items():
+        try:
+            item_id = int(matrix.index[int(idx)])
+        except (IndexError, ValueError):
+            continue
+
+        for col_name, new_value in changes.items():
+            if col_name in MESES:
+                pending.append((item_id, MESES.index(col_name) + 1, col_name))
+                values.append(new_value)
+
+    cents, errors = parse_cents_array(values)
+    cells, invalid = [], []
+    for (item_id, month_idx, col_name), value, error in zip(pending, cents.tolist(), errors.tolist()):
+        if error:
+            invalid.append(col_name)
+        else:
+            cells.append((item_id, year, month_idx, value))
+    return cells, invalid
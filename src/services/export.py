@@ -0,0 +1,275 @@
+# src/services/export.py
+"""Exportação do livro-caixa (CSV/Parquet) e da matriz anual (XLSX).
+
+As transações são lidas do SQLite em blocos (``iter_with_items``), cada
+bloco vira um ``pyarrow.RecordBatch`` e é gravado antes do próximo ser
+lido: a memória usada não depende do número de linhas. Valores saem como
+decimais exatos com duas casas (``decimal128(18, 2)``), a partir dos
+centavos inteiros.
+
+A planilha XLSX é escrita diretamente no formato Office Open XML (um ZIP
+de arquivos XML), linha a linha, sem dependências além da biblioteca padrão.
+
+O histórico de alterações sai em JSON Lines (``export_changes``), a partir
+de um ``seq``: cópias mantidas fora do app se atualizam só com o que mudou.
+"""
+import json
+import zipfile
+from dataclasses import asdict
+from typing import IO, Iterator, List
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+
+from src.models.transaction_filter import TransactionFilter
+from src.repository.journal_repository import JournalRepository
+from src.repository.transaction_repository import TransactionRepository
+
+FORMATS = ("csv", "parquet", "xlsx")
+
+
+def format_from_path(path: str) -> str:
+    extension = path.rsplit(".", 1)[-1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Formato não suportado: .{extension} (use {', '.join(FORMATS)})")
+    return extension
+
+
+def _ledger_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("Id", pa.int64()),
+        ("Data", pa.date32()),
+        ("Item", pa.string()),
+        ("Categoria", pa.string()),
+        ("Valor", pa.decimal128(18, 2)),
+        ("Efetivado", pa.bool_()),
+        ("Recorrente", pa.bool_()),
+    ])
+
+
+def _decimal_cents(cents: np.ndarray):
+    """Centavos ``int64`` como ``decimal128(18, 2)``, sem passar por float."""
+    import pyarrow as pa
+
+    # decimal128 é um inteiro de 128 bits: palavra baixa e extensão do sinal
+    words = np.empty((len(cents), 2), dtype=np.int64)
+    words[:, 0] = cents
+    words[:, 1] = cents >> 63
+    return pa.Array.from_buffers(pa.decimal128(18, 2), len(cents), [None, pa.py_buffer(words.tobytes())])
+
+
+def ledger_batches(
+    transaction_repo: TransactionRepository,
+    filters: TransactionFilter | None = None,
+    chunk_size: int = 65536,
+) -> Iterator:
+    """Transações com item e categoria como ``RecordBatch`` de até ``chunk_size`` linhas."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    schema = _ledger_schema()
+    for rows in transaction_repo.iter_with_items(filters, chunk_size):
+        ids, dates, names, categories, cents, completed, recurring = zip(*rows)
+        count = len(ids)
+        yield pa.record_batch([
+            pa.array(np.fromiter(ids, dtype=np.int64, count=count)),
+            # Linhas antigas podem ter hora ('YYYY-MM-DD HH:MM:SS'): só a data é exportada
+            pc.utf8_slice_codeunits(pa.array(dates, pa.string()), 0, 10).cast(pa.date32()),
+            pa.array(names, pa.string()),
+            pa.array(categories, pa.string()),
+            _decimal_cents(np.fromiter(cents, dtype=np.int64, count=count)),
+            pa.array(np.fromiter(completed, dtype=np.bool_, count=count)),
+            pa.array(np.fromiter(recurring, dtype=np.bool_, count=count)),
+        ], schema=schema)
+
+
+def write_csv(batches, sink, delimiter: str = ";", decimal: str = ",") -> int:
+    """Grava os blocos como CSV em ``sink`` (caminho ou arquivo binário).
+
+    O padrão (``;`` e vírgula decimal) é o que o Excel em pt-BR abre
+    diretamente. Retorna o número de linhas gravadas.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pcsv
+
+    schema = _ledger_schema()
+    if decimal != ".":
+        schema = schema.set(schema.get_field_index("Valor"), pa.field("Valor", pa.string()))
+    rows = 0
+    with pcsv.CSVWriter(sink, schema, write_options=pcsv.WriteOptions(delimiter=delimiter)) as writer:
+        for batch in batches:
+            if decimal != ".":
+                index = batch.schema.get_field_index("Valor")
+                valor = pc.replace_substring(batch.column(index).cast(pa.string()), ".", decimal)
+                batch = pa.record_batch([*batch.columns[:index], valor, *batch.columns[index + 1:]], schema=schema)
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+
+def write_parquet(batches, sink, row_group_size: int = 1 << 20) -> int:
+    """Grava os blocos como Parquet (zstd) em ``sink``; retorna o número de linhas."""
+    import pyarrow.parquet as pq
+
+    rows = 0
+    with pq.ParquetWriter(sink, _ledger_schema(), compression="zstd") as writer:
+        for batch in batches:
+            writer.write_batch(batch, row_group_size=row_group_size)
+            rows += batch.num_rows
+    return rows
+
+
+def export_ledger(
+    transaction_repo: TransactionRepository,
+    sink,
+    fmt: str,
+    filters: TransactionFilter | None = None,
+    chunk_size: int = 65536,
+    **options,
+) -> int:
+    """Exporta as transações filtradas em ``fmt`` (``csv`` ou ``parquet``)."""
+    batches = ledger_batches(transaction_repo, filters, chunk_size)
+    if fmt == "csv":
+        return write_csv(batches, sink, **options)
+    if fmt == "parquet":
+        return write_parquet(batches, sink, **options)
+    raise ValueError(f"Formato não suportado para transações: {fmt}")
+
+
+# --- Histórico --------------------------------------------------------------
+
+def export_changes(
+    journal_repo: JournalRepository,
+    sink: IO[str],
+    since: int = 0,
+    tables: List[str] | None = None,
+    chunk_size: int = 10000,
+) -> tuple[int, int]:
+    """Grava em ``sink`` as alterações com ``seq`` maior que ``since``, uma por linha (JSON).
+
+    Cada linha tem ``seq``, ``op``, ``table``, ``row_id``, ``old`` e ``new``
+    (ver ``Change``); o histórico é lido em blocos de ``chunk_size``.
+    Retorna ``(linhas, seq)``: ``seq`` é o da última alteração gravada, a
+    partir do qual a próxima exportação continua.
+    """
+    rows, seq = 0, since
+    while True:
+        changes = journal_repo.changes_since(seq, tables, limit=chunk_size)
+        for change in changes:
+            sink.write(json.dumps(asdict(change), ensure_ascii=False) + "\n")
+        rows += len(changes)
+        if changes:
+            seq = changes[-1].seq
+        if len(changes) < chunk_size:
+            return rows, seq
+
+
+# --- XLSX -------------------------------------------------------------------
+
+_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>
+{sheets}</Types>"""
+
+_ROOT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>"""
+
+_WORKBOOK = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets>{sheets}</sheets>
+</workbook>"""
+
+_WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+{sheets}<Relationship Id="rIdStyles" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+</Relationships>"""
+
+# Estilos: 0 padrão, 1 cabeçalho em negrito, 2 valor "#,##0.00"
+_STYLES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font><font><b/><sz val="11"/><name val="Calibri"/></font></fonts>
+<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>
+<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>
+<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>
+<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/><xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/><xf numFmtId="4" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>
+</styleSheet>"""
+
+_SHEET_HEAD = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/></sheetView></sheetViews>
+<sheetData>
+"""
+_SHEET_TAIL = "</sheetData>\n</worksheet>"
+
+
+def _column_name(index: int) -> str:
+    name = ""
+    index += 1
+    while index:
+        index, rest = divmod(index - 1, 26)
+        name = chr(65 + rest) + name
+    return name
+
+
+def _cell(ref: str, value, header: bool = False) -> str:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ""
+    if isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool):
+        return f'<c r="{ref}" s="2"><v>{value}</v></c>'
+    style = ' s="1"' if header else ""
+    return f'<c r="{ref}" t="inlineStr"{style}><is><t>{escape(str(value))}</t></is></c>'
+
+
+def _sheet_rows(frame: pd.DataFrame) -> Iterator[str]:
+    columns = [_column_name(i) for i in range(len(frame.columns))]
+    yield '<row r="1">' + "".join(_cell(f"{c}1", name, header=True) for c, name in zip(columns, frame.columns)) + "</row>\n"
+    for number, row in enumerate(frame.itertuples(index=False, name=None), start=2):
+        yield f'<row r="{number}">' + "".join(_cell(f"{c}{number}", value) for c, value in zip(columns, row)) + "</row>\n"
+
+
+def write_xlsx(sheets: List[tuple[str, pd.DataFrame]], sink: str | IO[bytes]) -> None:
+    """Grava uma pasta de trabalho com uma planilha por ``(nome, DataFrame)``.
+
+    Textos viram células de texto e números ficam com o formato
+    ``#,##0.00``; células vazias (``NaN``) são omitidas.
+    """
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as package:
+        package.writestr("[Content_Types].xml", _CONTENT_TYPES.format(sheets="".join(
+            f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>\n'
+            for i in range(1, len(sheets) + 1)
+        )))
+        package.writestr("_rels/.rels", _ROOT_RELS)
+        package.writestr("xl/workbook.xml", _WORKBOOK.format(sheets="".join(
+            f'<sheet name="{escape(name[:31])}" sheetId="{i}" r:id="rId{i}"/>'
+            for i, (name, _) in enumerate(sheets, start=1)
+        )))
+        package.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS.format(sheets="".join(
+            f'<Relationship Id="rId{i}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            f'Target="worksheets/sheet{i}.xml"/>\n'
+            for i in range(1, len(sheets) + 1)
+        )))
+        package.writestr("xl/styles.xml", _STYLES)
+        for i, (_, frame) in enumerate(sheets, start=1):
+            with package.open(f"xl/worksheets/sheet{i}.xml", "w") as sheet:
+                sheet.write(_SHEET_HEAD.encode())
+                for row in _sheet_rows(frame):
+                    sheet.write(row.encode())
+                sheet.write(_SHEET_TAIL.encode())
+
+
+def pivot_sheet(matrix: pd.DataFrame, month_columns: List[str]) -> pd.DataFrame:
+    """Matriz do dashboard com a coluna e a linha de totais, para a planilha."""
+    sheet = matrix.assign(Total=matrix[month_columns].sum(axis=1).round(2))
+    totals = sheet[month_columns + ["Total"]].sum().round(2)
+    total_row = pd.DataFrame([{"Item": "Total", "Categoria": "", **totals.to_dict()}])
+    return pd.concat([sheet, total_row], ignore_index=True)
@@ -0,0 +1,379 @@
+# src/services/importer.py
+"""Importação de extratos bancários (CSV e OFX) em lote.
+
+Os arquivos são lidos de forma incremental: as linhas passam por um gerador,
+são associadas a itens pelas regras configuradas e gravadas em lotes de
+``batch_size`` com ``executemany``. A memória usada não depende do tamanho
+do extrato.
+
+Cada linha recebe um hash (data, valor, descrição, FITID e ordem entre
+linhas idênticas do mesmo dia) gravado em ``transactions.import_hash``;
+reimportar o mesmo extrato não duplica lançamentos.
+
+O item de cada descrição é resolvido uma única vez (``RuleMatcher``): as
+descrições novas de cada lote são comparadas com as regras de uma vez, por
+um índice FTS5 em memória quando são muitas.
+"""
+import csv
+import hashlib
+import itertools
+import json
+import re
+import sqlite3
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from functools import lru_cache
+from typing import IO, Iterable, Iterator, List
+
+from src.repository.item_repository import ItemRepository
+from src.repository.partitions import archived_years
+from src.repository.transaction_repository import TransactionRepository
+from src.services.money import parse_cents
+
+DATE_FORMATS = ("%d/%m/%Y", "%Y-%m-%d", "%d/%m/%y", "%d-%m-%Y")
+
+# Nomes de coluna aceitos nos CSVs (comparados sem acento e em minúsculas)
+DATE_COLUMNS = ("data", "date", "data lancamento", "data movimento")
+DESCRIPTION_COLUMNS = ("descricao", "historico", "description", "memo", "lancamento")
+AMOUNT_COLUMNS = ("valor", "amount", "value", "valor (r$)")
+
+
+@dataclass
+class StatementLine:
+    date: date
+    description: str
+    amount_cents: int
+    fitid: str = ""
+
+
+@dataclass
+class ImportRule:
+    """Associa descrições a um item por trecho (``contains``) ou regex."""
+    item_id: int
+    contains: str = ""
+    regex: str = ""
+    _pattern: re.Pattern | None = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        if self.regex:
+            self._pattern = re.compile(self.regex, re.IGNORECASE)
+        self.contains = normalize(self.contains)
+
+    @property
+    def indexable(self) -> bool:
+        """Pode ser buscada no índice trigram (trecho de 3 caracteres ou mais)."""
+        return self._pattern is None and len(self.contains) >= 3
+
+    def matches(self, description: str, normalized: str) -> bool:
+        if self._pattern is not None:
+            return self._pattern.search(description) is not None
+        return bool(self.contains) and self.contains in normalized
+
+
+class RuleMatcher:
+    """Primeira regra que casa com cada descrição, memorizada por descrição.
+
+    Extratos repetem muito as mesmas descrições: cada uma é comparada com as
+    regras só na primeira vez. As descrições novas de um lote são resolvidas
+    juntas; quando descrições × regras passam de ``INDEX_THRESHOLD``, elas
+    vão para uma tabela FTS5 trigram em memória e cada regra ``contains``
+    vira uma consulta ao índice, em vez de um teste de substring por
+    descrição. Regras regex (e trechos com menos de 3 caracteres) são
+    testadas em Python. A ordem das regras continua decidindo.
+    """
+    INDEX_THRESHOLD = 200_000
+    MEMO_LIMIT = 500_000
+
+    def __init__(self, rules: List[ImportRule]):
+        self.rules = rules
+        self._memo: dict[str, tuple[str, int | None]] = {}
+        self._index: sqlite3.Connection | None = None
+
+    def resolve(self, descriptions: Iterable[str]) -> None:
+        """Resolve de uma vez as descrições ainda não vistas."""
+        if len(self._memo) > self.MEMO_LIMIT:
+            self._memo.clear()
+        new = [d for d in dict.fromkeys(descriptions) if d not in self._memo]
+        if not new:
+            return
+        normalized = [normalize(d) for d in new]
+        item_ids: List[int | None] = [None] * len(new)
+
+        indexed = len(new) * len(self.rules) >= self.INDEX_THRESHOLD and any(r.indexable for r in self.rules)
+        if indexed:
+            self._fill_index(normalized)
+        pending = set(range(len(new)))
+        for rule in self.rules:
+            if not pending:
+                break
+            if indexed and rule.indexable:
+                matched = pending.intersection(self._search(rule.contains))
+            else:
+                matched = {i for i in pending if rule.matches(new[i], normalized[i])}
+            for i in matched:
+                item_ids[i] = rule.item_id
+            pending -= matched
+        self._memo.update(zip(new, zip(normalized, item_ids)))
+
+    def match(self, description: str) -> tuple[str, int | None]:
+        """Descrição normalizada e item da primeira regra (``None`` sem regra)."""
+        if description not in self._memo:
+            self.resolve([description])
+        return self._memo[description]
+
+    def _fill_index(self, normalized: List[str]) -> None:
+        if self._index is None:
+            self._index = sqlite3.connect(":memory:")
+            self._index.execute("CREATE VIRTUAL TABLE descriptions USING fts5(text, tokenize='trigram')")
+        self._index.execute("DELETE FROM descriptions")
+        self._index.executemany("INSERT INTO descriptions (rowid, text) VALUES (?, ?)", enumerate(normalized))
+
+    def _search(self, text: str) -> Iterator[int]:
+        # Entre aspas: trecho literal, como ``contains in normalized``
+        phrase = '"' + text.replace('"', '""') + '"'
+        return (row[0] for row in self._index.execute("SELECT rowid FROM descriptions WHERE descriptions MATCH ?", (phrase,)))
+
+
+@dataclass
+class ImportErrors:
+    """Conta linhas inválidas guardando só as primeiras mensagens."""
+    limit: int = 100
+    count: int = 0
+    messages: List[str] = field(default_factory=list)
+
+    def append(self, message: str) -> None:
+        self.count += 1
+        if len(self.messages) < self.limit:
+            self.messages.append(message)
+
+
+@dataclass
+class ImportResult:
+    read: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    unmatched: int = 0
+    invalid: int = 0
+    archived: int = 0  # linhas de anos arquivados, não gravadas
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.read / self.seconds if self.seconds else 0.0
+
+
+def normalize(text: str) -> str:
+    """Minúsculas e sem acentos, para comparar descrições e cabeçalhos."""
+    if text.isascii():
+        return text.lower().strip()
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c)).lower().strip()
+
+
+@lru_cache(maxsize=4096)
+def parse_date(text: str) -> date:
+    text = text.strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Data inválida: {text!r}")
+
+
+def _find_column(header: List[str], candidates: Iterable[str], explicit: str | None) -> int:
+    names = [normalize(h) for h in header]
+    wanted = [normalize(explicit)] if explicit else list(candidates)
+    for name in wanted:
+        if name in names:
+            return names.index(name)
+    raise ValueError(f"Coluna não encontrada no CSV: {', '.join(wanted)}")
+
+
+def read_csv(
+    stream: IO[str],
+    delimiter: str | None = None,
+    date_column: str | None = None,
+    description_column: str | None = None,
+    amount_column: str | None = None,
+    decimal: str | None = None,
+    errors: ImportErrors | None = None,
+) -> Iterator[StatementLine]:
+    """Lê um extrato CSV com cabeçalho, uma linha por vez.
+
+    O delimitador é detectado pela amostra inicial quando não informado;
+    ``decimal`` fixa o separador decimal dos valores (ver ``parse_cents``).
+    Linhas que não puderem ser interpretadas são descritas em ``errors``.
+    """
+    lines: Iterable[str] = stream
+    if delimiter is None:
+        # Amostra completada até o fim da linha e recolocada antes do restante
+        sample = stream.read(4096) + stream.readline()
+        lines = itertools.chain(sample.splitlines(keepends=True), stream)
+        try:
+            delimiter = csv.Sniffer().sniff(sample, delimiters=";,\t|").delimiter
+        except csv.Error:
+            delimiter = ";"
+
+    reader = csv.reader(lines, delimiter=delimiter)
+    header = next(reader, None)
+    if header is None:
+        return
+    date_idx = _find_column(header, DATE_COLUMNS, date_column)
+    description_idx = _find_column(header, DESCRIPTION_COLUMNS, description_column)
+    amount_idx = _find_column(header, AMOUNT_COLUMNS, amount_column)
+
+    for row in reader:
+        if not row or not any(row):
+            continue
+        try:
+            yield StatementLine(
+                date=parse_date(row[date_idx]),
+                description=row[description_idx].strip(),
+                amount_cents=parse_cents(row[amount_idx], decimal),
+            )
+        except (IndexError, ValueError) as e:
+            if errors is not None:
+                errors.append(f"linha {reader.line_num}: {e}")
+
+
+_OFX_TRANSACTION = re.compile(r"<STMTTRN>(.*?)</STMTTRN>", re.IGNORECASE | re.DOTALL)
+_OFX_FIELD = re.compile(r"<(DTPOSTED|TRNAMT|FITID|MEMO|NAME)>([^<\r\n]*)", re.IGNORECASE)
+
+
+def read_ofx(stream: IO[str], chunk_size: int = 1 << 16, errors: ImportErrors | None = None) -> Iterator[StatementLine]:
+    """Lê os blocos ``<STMTTRN>`` de um OFX (SGML ou XML) em pedaços."""
+    buffer = ""
+    while True:
+        chunk = stream.read(chunk_size)
+        buffer += chunk
+        last_end = 0
+        for match in _OFX_TRANSACTION.finditer(buffer):
+            last_end = match.end()
+            fields = {name.upper(): value.strip() for name, value in _OFX_FIELD.findall(match.group(1))}
+            try:
+                posted = fields["DTPOSTED"][:8]
+                yield StatementLine(
+                    date=date(int(posted[:4]), int(posted[4:6]), int(posted[6:8])),
+                    description=fields.get("MEMO") or fields.get("NAME", ""),
+                    amount_cents=parse_cents(fields["TRNAMT"]),
+                    fitid=fields.get("FITID", ""),
+                )
+            except (KeyError, ValueError) as e:
+                if errors is not None:
+                    errors.append(f"transação OFX inválida: {e}")
+        buffer = buffer[last_end:]
+        if not chunk:
+            break
+        # Mantém só o início de um bloco ainda incompleto
+        start = buffer.upper().rfind("<STMTTRN>")
+        buffer = buffer[start:] if start >= 0 else buffer[-16:]
+
+
+def load_rules(path_or_stream, item_repo: ItemRepository) -> List[ImportRule]:
+    """Carrega regras de um JSON no formato::
+
+        [{"contains": "NETFLIX", "item": "Streaming", "category": "Lazer"},
+         {"regex": "^PIX .*ALUGUEL", "item": "Aluguel", "category": "Casa"}]
+
+    Os itens são resolvidos por (nome, categoria) e precisam existir.
+    """
+    if isinstance(path_or_stream, str):
+        with open(path_or_stream, encoding="utf-8") as f:
+            raw_rules = json.load(f)
+    else:
+        raw_rules = json.load(path_or_stream)
+
+    rules = []
+    for raw in raw_rules:
+        item = item_repo.get_by_name_category(raw["item"], raw["category"])
+        if item is None:
+            raise ValueError(f"Item não cadastrado: {raw['item']} ({raw['category']})")
+        rules.append(ImportRule(item_id=item.id, contains=raw.get("contains", ""), regex=raw.get("regex", "")))
+    return rules
+
+
+def line_hash(line: StatementLine, normalized: str, occurrence: int) -> str:
+    key = f"{line.date.isoformat()}|{line.amount_cents}|{normalized}|{line.fitid}|{occurrence}"
+    return hashlib.blake2b(key.encode(), digest_size=12).hexdigest()
+
+
+def import_lines(
+    lines: Iterable[StatementLine],
+    transaction_repo: TransactionRepository,
+    rules: List[ImportRule],
+    default_item_id: int | None = None,
+    batch_size: int = 20000,
+) -> ImportResult:
+    """Associa cada linha a um item e grava em lotes, ignorando duplicatas.
+
+    Linhas sem regra correspondente vão para ``default_item_id`` ou, se ele
+    não for informado, são descartadas e contadas em ``unmatched``. Linhas
+    de anos arquivados não são gravadas e são contadas em ``archived``.
+    """
+    result = ImportResult()
+    started = time.perf_counter()
+    matcher = RuleMatcher(rules)
+    archived = set(archived_years(transaction_repo.conn))
+
+    batch = []
+    # Linhas idênticas no mesmo dia são distinguidas pela ordem de aparição
+    # no arquivo inteiro, esteja o extrato ordenado por data ou não
+    occurrences = {}
+    lines = iter(lines)
+    while chunk := list(itertools.islice(lines, batch_size)):
+        # As descrições novas do lote são associadas às regras de uma vez
+        matcher.resolve(line.description for line in chunk)
+        for line in chunk:
+            result.read += 1
+            if line.date.year in archived:
+                result.archived += 1
+                continue
+
+            normalized, item_id = matcher.match(line.description)
+            if item_id is None:
+                item_id = default_item_id
+            if item_id is None:
+                result.unmatched += 1
+                continue
+
+            identity = (line.date, line.amount_cents, normalized, line.fitid)
+            occurrence = occurrences.get(identity, 0)
+            occurrences[identity] = occurrence + 1
+
+            batch.append((item_id, line.amount_cents, line.date.isoformat(), line_hash(line, normalized, occurrence)))
+            if len(batch) >= batch_size:
+                result.inserted += transaction_repo.add_imported(batch)
+                batch = []
+
+    result.inserted += transaction_repo.add_imported(batch)
+    result.duplicates = result.read - result.unmatched - result.archived - result.inserted
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def read_statement(stream: IO[str], filename: str, errors: ImportErrors | None = None, **csv_options) -> Iterator[StatementLine]:
+    """Escolhe o leitor pela extensão do arquivo."""
+    if filename.lower().endswith((".ofx", ".qfx")):
+        return read_ofx(stream, errors=errors)
+    return read_csv(stream, errors=errors, **csv_options)
+
+
+def import_statement(
+    stream: IO[str],
+    filename: str,
+    transaction_repo: TransactionRepository,
+    rules: List[ImportRule],
+    default_item_id: int | None = None,
+    batch_size: int = 20000,
+    **csv_options,
+) -> tuple[ImportResult, ImportErrors]:
+    """Lê e importa um extrato, contabilizando as linhas inválidas."""
+    errors = ImportErrors()
+    lines = read_statement(stream, filename, errors=errors, **csv_options)
+    result = import_lines(lines, transaction_repo, rules, default_item_id, batch_size)
+    result.invalid = errors.count
+    result.read += errors.count
+    return result, errors
@@ -0,0 +1,167 @@
+# src/services/money.py
+"""Conversão de valores monetários digitados ou importados para centavos.
+
+As mesmas regras valem para um valor (``parse_cents``) e para colunas
+inteiras (``parse_cents_array``, usado pelo editor da matriz):
+
+- símbolos de moeda (``R$``, ``US$``, ``$``, ``€``, ``BRL``...) e espaços são
+  ignorados;
+- ``-`` no início ou no fim e parênteses indicam valor negativo:
+  ``-1.234,56``, ``1.234,56-`` e ``(1.234,56)``; parênteses só valem em
+  par, envolvendo o valor inteiro, e um único sinal é aceito (``(5``,
+  ``--5`` e ``(-5)`` são inválidos);
+- o separador decimal é ``decimal`` quando informado; senão é o último
+  entre ``,`` e ``.`` presentes, exceto quando um único tipo de separador
+  se repete (``1.234.567`` é milhar);
+- o outro separador é o de milhar e só pode aparecer antes do decimal,
+  separando grupos de três dígitos (``1.2.3,4`` e ``12,34,56`` são
+  inválidos);
+- mais de duas casas decimais são arredondadas meio para cima;
+- valores cujo total em centavos não cabe em ``int64`` são inválidos.
+"""
+import math
+import re
+from decimal import ROUND_HALF_UP, Decimal
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Espaços incluem os não separáveis usados como milhar (NBSP, NNBSP)
+_CURRENCY = re.compile(r"(?i)r\$|us\$|[$€£]|brl|usd|eur|[\s" + "\u00a0\u202f" + "]")
+_SIGN = re.compile(r"^[+-]|-$")
+_CENT = Decimal("0.01")
+
+# Centavos são gravados como INTEGER do SQLite e lidos como int64
+_CENTS_LIMIT = 2**63
+
+
+def _number(decimal: str) -> str:
+    """Valor sem sinal com o separador decimal ``decimal``: até 15 dígitos
+    inteiros, corridos ou em grupos de milhar, e as casas decimais."""
+    point, thousands = re.escape(decimal), re.escape("." if decimal == "," else ",")
+    # Agrupado por inteiro: o fullmatch do Arrow apenas acrescenta ^ e $
+    return rf"(?:(?:\d{{1,15}}|\d{{1,3}}(?:{thousands}\d{{3}}){{1,4}})(?:{point}\d*)?|{point}\d+)"
+
+
+_NUMBERS = {decimal: re.compile(_number(decimal)) for decimal in ",."}
+
+
+def _decimal_separator(clean: str, decimal: str | None) -> str:
+    if decimal:
+        return decimal
+    commas, dots = clean.count(","), clean.count(".")
+    if dots > 1 and not commas:
+        return ","
+    if commas > 1 and not dots:
+        return "."
+    return "," if clean.rfind(",") > clean.rfind(".") else "."
+
+
+def parse_cents(text, decimal: str | None = None) -> int:
+    """Converte ``"1.234,56"``, ``"1,234.56"``, ``"R$ -10"``, ``12.5`` etc. em centavos.
+
+    Números (``int``/``float``) são apenas multiplicados por 100. Levanta
+    ``ValueError`` se o valor não for válido.
+    """
+    if isinstance(text, (int, float)) and not isinstance(text, bool):
+        if not math.isfinite(text) or abs(round(text * 100)) >= _CENTS_LIMIT:
+            raise ValueError(f"Valor inválido: {text!r}")
+        return round(text * 100)
+    if not isinstance(text, str):
+        raise ValueError(f"Valor inválido: {text!r}")
+
+    clean = _CURRENCY.sub("", text)
+    # Parênteses só em par; os que sobrarem invalidam o valor
+    parenthesized = clean.startswith("(") and clean.endswith(")")
+    if parenthesized:
+        clean = clean[1:-1]
+    leading, trailing = clean[:1] in ("+", "-"), clean.endswith("-")
+    negative = parenthesized or clean.startswith("-") or trailing
+    clean = _SIGN.sub("", clean)
+
+    separator = _decimal_separator(clean, decimal)
+    if parenthesized + leading + trailing > 1 or not _NUMBERS[separator].fullmatch(clean):
+        raise ValueError(f"Valor inválido: {text!r}")
+    if separator == ",":
+        clean = clean.replace(".", "").replace(",", ".")
+    else:
+        clean = clean.replace(",", "")
+    cents = int(Decimal(clean).quantize(_CENT, rounding=ROUND_HALF_UP) * 100)
+    return -cents if negative else cents
+
+
+def parse_cents_array(values, decimal: str | None = None) -> tuple["np.ndarray", "np.ndarray"]:
+    """Versão vetorizada de ``parse_cents`` para Series, arrays ou listas.
+
+    Aceita textos e números misturados. Retorna ``(centavos, erros)``: um
+    array ``int64`` (0 nas linhas inválidas) e a máscara booleana das linhas
+    que não puderam ser interpretadas, na mesma ordem da entrada.
+    """
+    # pandas e NumPy só quando há colunas a converter: ``parse_cents`` é
+    # usado pela importação, que não depende deles
+    import numpy as np
+    import pandas as pd
+
+    series = pd.Series(values, dtype=object).reset_index(drop=True)
+    cents = np.zeros(len(series), dtype=np.int64)
+    errors = np.zeros(len(series), dtype=bool)
+    if series.empty:
+        return cents, errors
+
+    types = series.map(type)
+    is_text = types.eq(str).to_numpy()
+
+    # Números; vazios e booleanos contam como erro
+    numbers = pd.to_numeric(series[~is_text].where(types[~is_text] != bool), errors="coerce").to_numpy(dtype=float)
+    with np.errstate(invalid="ignore", over="ignore"):
+        finite = np.isfinite(numbers) & (np.abs(np.round(numbers * 100)) < _CENTS_LIMIT)
+    positions = np.flatnonzero(~is_text)
+    cents[positions[finite]] = np.round(numbers[finite] * 100)
+    errors[positions[~finite]] = True
+
+    if not is_text.any():
+        return cents, errors
+
+    # Textos, com as operações de string executadas pelo Arrow
+    text = series[is_text].astype("string[pyarrow]").str.replace(_CURRENCY.pattern, "", regex=True)
+    parenthesized = (text.str.startswith("(") & text.str.endswith(")")).to_numpy(dtype=bool)
+    text = text.where(~parenthesized, text.str.slice(1, -1))
+    leading = text.str.contains(r"^[+-]").to_numpy(dtype=bool)
+    trailing = text.str.endswith("-").to_numpy(dtype=bool)
+    negative = parenthesized | text.str.startswith("-").to_numpy(dtype=bool) | trailing
+    signs = parenthesized.astype(int) + leading + trailing
+    text = text.str.replace(_SIGN.pattern, "", regex=True)
+
+    if decimal:
+        comma_decimal = np.full(len(text), decimal == ",")
+    else:
+        commas = text.str.count(",").to_numpy()
+        dots = text.str.count(r"\.").to_numpy()
+        # Vírgula depois do último ponto: a vírgula é o separador decimal
+        last_comma = text.str.contains(r",[^.]*$").to_numpy(dtype=bool)
+        comma_decimal = np.where(
+            (dots > 1) & (commas == 0), True,
+            np.where((commas > 1) & (dots == 0), False, last_comma)
+        )
+    valid = (signs <= 1) & np.where(
+        comma_decimal,
+        text.str.fullmatch(_NUMBERS[","].pattern).to_numpy(dtype=bool),
+        text.str.fullmatch(_NUMBERS["."].pattern).to_numpy(dtype=bool),
+    )
+    normalized = text.where(
+        ~comma_decimal,
+        text.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    ).where(comma_decimal, text.str.replace(",", "", regex=False))
+
+    # "12.5" -> "12.5000": inteiro, duas casas e o dígito de arredondamento
+    padded = normalized[valid].str.replace(r"^(\d*)$", r"\1.", regex=True) + "000"
+    whole = padded.str.replace(r"^(\d*)\.(\d\d)\d*$", r"0\1\2", regex=True).astype("int64[pyarrow]").to_numpy()
+    round_up = padded.str.replace(r"^\d*\.\d\d(\d)\d*$", r"\1", regex=True).astype("int64[pyarrow]").to_numpy() >= 5
+    parsed = whole + round_up
+
+    text_positions = np.flatnonzero(is_text)
+    signed = np.where(negative[valid], -parsed, parsed)
+    cents[text_positions[valid]] = signed
+    errors[text_positions[~valid]] = True
+    return cents, errors
@@ -0,0 +1,47 @@
+# src/services/pickers.py
+"""Seletores de item com busca.
+
+Em vez de enviar todos os itens ao navegador em um ``st.selectbox``, o
+texto digitado é buscado no banco (``ItemRepository.search``) e só os
+primeiros resultados viram opções.
+"""
+import streamlit as st
+
+from src.models.item import Item
+from src.repository.item_repository import ItemRepository
+
+SEARCH_LIMIT = 50
+
+
+def item_label(item: Item | None, empty_label: str = "") -> str:
+    return empty_label if item is None else f"{item.name} ({item.category})"
+
+
+def item_picker(
+    item_repo: ItemRepository,
+    key: str,
+    label: str = "Item",
+    current: Item | None = None,
+    empty_label: str = "",
+    limit: int = SEARCH_LIMIT,
+) -> Item | None:
+    """Campo de busca seguido da lista de itens encontrados.
+
+    Retorna o item escolhido ou ``None`` (opção ``empty_label``). Com
+    ``current``, ele é a primeira opção e não há opção vazia. Deve ficar
+    fora de ``st.form``: cada busca precisa reexecutar o script.
+    """
+    query = st.text_input(f"Buscar {label.lower()}", key=f"{key}_query", placeholder="Nome ou categoria")
+    items = item_repo.search(query, limit)
+    if current is not None:
+        options = [current, *(item for item in items if item.id != current.id)]
+    else:
+        options = [None, *items]
+    if len(items) == limit:
+        st.caption(f"Mostrando os {limit} primeiros; digite para refinar a busca.")
+    return st.selectbox(
+        label,
+        options=options,
+        format_func=lambda item: item_label(item, empty_label),
+        key=f"{key}_item"
+    )
@@ -0,0 +1,224 @@
+# src/services/profiling.py
+"""Instrumentação opcional do tempo gasto em cada rerun.
+
+Desligada por padrão. Liga com a variável de ambiente ``APP_PROFILE=1`` ou
+com o parâmetro ``?debug=1`` na URL. Enquanto uma sessão (``session``) está
+ativa na thread do rerun:
+
+- ``timed(nome)`` acumula o tempo de cada etapa;
+- os métodos públicos das classes marcadas com ``@instrument`` (os
+  repositórios) são medidos e têm as linhas retornadas contadas;
+- as instruções SQL executadas na conexão são contadas.
+
+Ao final, a sessão é registrada como uma linha JSON no logger
+``app_financeiro.profiling``. Uma captura do rerun com cProfile (ou
+pyinstrument, se instalado) é pedida com ``APP_PROFILE_CAPTURE=cprofile`` ou
+``?profile=cprofile`` / ``?profile=pyinstrument``.
+
+Sem sessão ativa o custo é uma leitura de ``ContextVar`` por chamada.
+"""
+import cProfile
+import functools
+import inspect
+import io
+import json
+import logging
+import os
+import pstats
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping
+
+logger = logging.getLogger("app_financeiro.profiling")
+
+CAPTURE_MODES = ("cprofile", "pyinstrument")
+
+
+@dataclass
+class StageTiming:
+    calls: int = 0
+    seconds: float = 0.0
+    rows: int = 0
+
+
+@dataclass
+class RunProfile:
+    """Medições de um rerun (ou de um callback)."""
+    name: str
+    stages: Dict[str, StageTiming] = field(default_factory=dict)
+    sql_statements: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+    capture: str = ""
+    _depth: int = field(default=0, repr=False)
+
+    def record(self, name: str, seconds: float, rows: int = 0) -> None:
+        stage = self.stages.setdefault(name, StageTiming())
+        stage.calls += 1
+        stage.seconds += seconds
+        stage.rows += rows
+
+    def as_dict(self) -> dict:
+        return {
+            "event": "rerun",
+            "name": self.name,
+            "ms": round(self.seconds * 1000, 2),
+            "sql_statements": self.sql_statements,
+            "rows": self.rows,
+            "stages": {
+                name: {"calls": s.calls, "ms": round(s.seconds * 1000, 2), "rows": s.rows}
+                for name, s in self.stages.items()
+            },
+        }
+
+    def as_rows(self) -> List[dict]:
+        """Uma linha por etapa, da mais lenta para a mais rápida."""
+        return [
+            {"Etapa": name, "Chamadas": s.calls, "ms": round(s.seconds * 1000, 2), "Linhas": s.rows}
+            for name, s in sorted(self.stages.items(), key=lambda kv: kv[1].seconds, reverse=True)
+        ]
+
+
+_current: ContextVar[RunProfile | None] = ContextVar("run_profile", default=None)
+
+
+def current() -> RunProfile | None:
+    return _current.get()
+
+
+def enabled(query_params: Mapping[str, str] | None = None) -> bool:
+    if os.getenv("APP_PROFILE", "").lower() in ("1", "true"):
+        return True
+    return bool(query_params) and query_params.get("debug", "").lower() in ("1", "true")
+
+
+def capture_mode(query_params: Mapping[str, str] | None = None) -> str | None:
+    mode = (query_params or {}).get("profile") or os.getenv("APP_PROFILE_CAPTURE")
+    return mode.lower() if mode and mode.lower() in CAPTURE_MODES else None
+
+
+@contextmanager
+def timed(name: str):
+    """Acumula o tempo do bloco na etapa ``name`` da sessão ativa."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.record(name, time.perf_counter() - start)
+
+
+def _instrument_method(name: str, method):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        profile = _current.get()
+        if profile is None:
+            return method(*args, **kwargs)
+        profile._depth += 1
+        start = time.perf_counter()
+        try:
+            result = method(*args, **kwargs)
+        finally:
+            profile._depth -= 1
+        rows = len(result) if isinstance(result, list) else 0
+        profile.record(name, time.perf_counter() - start, rows)
+        # Chamadas aninhadas (um método delegando a outro) não somam duas vezes
+        if profile._depth == 0:
+            profile.rows += rows
+        return result
+    return wrapper
+
+
+def instrument(prefix: str):
+    """Decorador de classe: mede todos os métodos públicos como ``prefix.método``."""
+    def decorate(cls):
+        for attr, value in list(vars(cls).items()):
+            if inspect.isfunction(value) and not attr.startswith("_"):
+                setattr(cls, attr, _instrument_method(f"{prefix}.{attr}", value))
+        return cls
+    return decorate
+
+
+def _count_statement(statement: str) -> None:
+    profile = _current.get()
+    # Instruções disparadas por triggers chegam como comentários "-- TRIGGER"
+    if profile is not None and not statement.startswith("--"):
+        profile.sql_statements += 1
+
+
+def _start_capture(mode: str | None):
+    if mode == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            logger.warning("pyinstrument não instalado; usando cProfile")
+        else:
+            profiler = Profiler()
+            profiler.start()
+            return profiler
+    if mode:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+    return None
+
+
+def _stop_capture(profiler) -> str:
+    if profiler is None:
+        return ""
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(30)
+        return out.getvalue()
+    profiler.stop()
+    return profiler.output_text(unicode=True, color=False)
+
+
+def _log(profile: RunProfile) -> None:
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    logger.info(json.dumps(profile.as_dict(), ensure_ascii=False))
+
+
+@contextmanager
+def session(name: str, conn=None, active: bool = True, capture: str | None = None):
+    """Mede o bloco como um rerun; produz ``None`` quando desligado.
+
+    Dentro de outra sessão (ex.: um fragmento executado no rerun completo)
+    apenas reaproveita a sessão ativa.
+    """
+    if not active:
+        yield None
+        return
+    if _current.get() is not None:
+        yield _current.get()
+        return
+
+    if conn is not None:
+        # Só as instruções executadas na thread com sessão ativa são contadas;
+        # o callback é removido ao final, pois a conexão continua aberta
+        conn.set_trace_callback(_count_statement)
+
+    profile = RunProfile(name)
+    token = _current.set(profile)
+    profiler = _start_capture(capture)
+    start = time.perf_counter()
+    try:
+        yield profile
+    finally:
+        profile.seconds = time.perf_counter() - start
+        profile.capture = _stop_capture(profiler)
+        _current.reset(token)
+        if conn is not None:
+            conn.set_trace_callback(None)
+        _log(profile)
@@ -0,0 +1,68 @@
+# src/services/projection.py
+"""Projeção das transações recorrentes para os meses restantes do ano.
+
+Trabalha sobre totais mensais por item (uma linha por ``(item_id, mês)``),
+no formato produzido por ``ReportRepository.get_monthly_totals``. Itens com
+recorrência agendada usam as ocorrências previstas (``add_scheduled``); os
+demais repetem os recorrentes do mês anterior (``project_recurring``).
+"""
+import pandas as pd
+
+
+def project_recurring(
+    recurring: pd.DataFrame,
+    actual: pd.DataFrame,
+    first_month: int,
+    last_month: int = 12,
+    key: str = "item_id",
+    month: str = "Ref",
+    value: str = "Valor",
+) -> pd.DataFrame:
+    """Retorna ``actual`` acrescido das linhas projetadas.
+
+    Cada item de ``recurring`` (os recorrentes do mês anterior) é repetido
+    para os meses ``first_month..last_month`` (cross join) e os pares
+    ``(item, mês)`` que já possuem lançamento em ``actual`` são descartados
+    (anti join). O valor projetado é o último lançamento real do item a
+    partir de ``first_month`` ou, se não houver, o valor recorrente.
+    """
+    if recurring.empty or first_month > last_month:
+        return actual.copy()
+
+    months = pd.DataFrame({month: range(first_month, last_month + 1)})
+    grid = recurring.drop(columns=[month]).merge(months, how="cross")
+
+    realized = (
+        actual[actual[key].isin(recurring[key]) & (actual[month] >= first_month)]
+        .groupby([key, month], as_index=False)[value].sum()
+        .rename(columns={value: "_realized"})
+    )
+    grid = grid.merge(realized, on=[key, month], how="left")
+    grid = grid.sort_values([key, month], kind="stable")
+
+    # Valor mais recente lançado para o item; antes dele vale o recorrente
+    carried = grid.groupby(key, sort=False)["_realized"].ffill()
+    grid[value] = carried.fillna(grid[value])
+
+    projected = grid[grid["_realized"].isna()].drop(columns=["_realized"])
+    return pd.concat([actual, projected[actual.columns]], ignore_index=True)
+
+
+def add_scheduled(
+    scheduled: pd.DataFrame,
+    actual: pd.DataFrame,
+    key: str = "item_id",
+    month: str = "Ref",
+) -> pd.DataFrame:
+    """Retorna ``actual`` acrescido dos totais agendados (``scheduled``, já
+    restritos aos meses projetados) nos pares ``(item, mês)`` ainda sem
+    lançamento (anti join)."""
+    if scheduled.empty:
+        return actual.copy()
+    recorded = actual[[key, month]].drop_duplicates()
+    merged = scheduled.merge(recorded, on=[key, month], how="left", indicator=True)
+    projected = merged[merged["_merge"] == "left_only"]
+    if actual.empty:
+        # Anos futuros: concatenar com o DataFrame vazio deixaria as colunas como object
+        return projected[actual.columns].reset_index(drop=True)
+    return pd.concat([actual, projected[actual.columns]], ignore_index=True)
@@ -0,0 +1,113 @@
+# src/services/recurrences.py
+"""Ocorrências das recorrências agendadas.
+
+``expand`` calcula de uma vez, com operações NumPy, todas as datas em que
+as recorrências caem dentro de um período: cada uma ocorre a cada
+``interval_months`` meses a partir de ``start_date``, no mesmo dia do mês
+(ou no último dia, nos meses mais curtos), até ``end_date`` inclusive.
+``occurrences`` guarda o resultado no cache por período, até a próxima
+escrita; ``materialize`` grava as ocorrências em ``transactions``.
+"""
+from datetime import date, timedelta
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from src.repository.recurrence_repository import RecurrenceRepository
+from src.repository.transaction_repository import date_param
+
+OCCURRENCE_COLUMNS = ["recurrence_id", "item_id", "name", "category", "date", "year", "month", "amount_cents", "materialized"]
+
+
+def expand(schedules: Dict[str, np.ndarray], start: date, end: date) -> pd.DataFrame:
+    """Ocorrências com ``start <= data < end``, uma linha por ocorrência.
+
+    ``materialized`` indica as que já foram gravadas em ``transactions``.
+    """
+    start, end = np.datetime64(start, "D"), np.datetime64(end, "D")
+    first = schedules["start_date"]
+    first_month = first.astype("datetime64[M]")
+    day = (first - first_month.astype("datetime64[D]")).astype(np.int64)
+    interval = schedules["interval_months"]
+
+    # Índices k (mês = primeiro + k * intervalo) que caem entre os meses do período
+    stop = np.where(np.isnat(schedules["end_date"]), end - 1, np.minimum(schedules["end_date"], end - 1))
+    origin = first_month.astype(np.int64)
+    k_first = np.maximum(0, -((origin - start.astype("datetime64[M]").astype(np.int64)) // interval))
+    k_last = (stop.astype("datetime64[M]").astype(np.int64) - origin) // interval
+    counts = np.maximum(k_last - k_first + 1, 0)
+
+    rows = np.repeat(np.arange(len(origin)), counts)
+    k = k_first[rows] + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    months = (origin[rows] + k * interval[rows]).astype("datetime64[M]")
+    month_days = months.astype("datetime64[D]")
+    length = ((months + 1).astype("datetime64[D]") - month_days).astype(np.int64)
+    dates = month_days + np.minimum(day[rows], length - 1)
+
+    # Os meses das pontas podem ter ocorrências fora do período ou depois do fim
+    end_date = schedules["end_date"][rows]
+    keep = (dates >= start) & (dates < end) & (np.isnat(end_date) | (dates <= end_date))
+    rows, dates = rows[keep], dates[keep]
+    materialized_until = schedules["materialized_until"][rows]
+
+    months = dates.astype("datetime64[M]").astype(np.int64)
+    return pd.DataFrame({
+        "recurrence_id": schedules["id"][rows],
+        "item_id": schedules["item_id"][rows],
+        "name": schedules["name"][rows],
+        "category": schedules["category"][rows],
+        "date": dates,
+        "year": months // 12 + 1970,
+        "month": months % 12 + 1,
+        "amount_cents": schedules["amount_cents"][rows],
+        "materialized": ~np.isnat(materialized_until) & (dates <= materialized_until),
+    }, columns=OCCURRENCE_COLUMNS)
+
+
+def occurrences(recurrence_repo: RecurrenceRepository, start: date, end: date) -> pd.DataFrame:
+    """``expand`` sobre todas as recorrências, memorizado por período e versão dos dados.
+
+    O resultado é compartilhado entre sessões: não deve ser alterado.
+    """
+    return recurrence_repo.cache.get(
+        ("occurrences", date_param(start), date_param(end)),
+        lambda: expand(recurrence_repo.get_columns(), start, end)
+    )
+
+
+def scheduled_totals(occurrences: pd.DataFrame) -> pd.DataFrame:
+    """Soma por item e mês das ocorrências ainda não gravadas, nas colunas
+    das visões consolidadas (``item_id``, ``Item``, ``Categoria``, ``Ref``,
+    ``Valor``, ``Ano``)."""
+    pending = occurrences[~occurrences["materialized"]]
+    totals = pending.groupby(["item_id", "name", "category", "year", "month"], as_index=False)["amount_cents"].sum()
+    totals = totals.rename(columns={
+        "name": "Item", "category": "Categoria", "month": "Ref", "amount_cents": "Valor", "year": "Ano"
+    })
+    return totals[["item_id", "Item", "Categoria", "Ref", "Valor", "Ano"]]
+
+
+def materialize(recurrence_repo: RecurrenceRepository, until: date, batch_size: int = 10_000) -> int:
+    """Grava em ``transactions`` as ocorrências até ``until`` (inclusive).
+
+    Pode ser executada periodicamente (ex.: ``cron``) e interrompida: cada
+    lote é uma transação e ocorrências já gravadas são ignoradas. Retorna
+    quantas transações foram criadas.
+    """
+    schedules = recurrence_repo.get_columns()
+    if not len(schedules["id"]):
+        return 0
+    start = schedules["start_date"].min().astype(date)
+    pending = expand(schedules, start, until + timedelta(days=1))
+    pending = pending[~pending["materialized"]]
+
+    inserted = 0
+    for offset in range(0, len(pending), batch_size):
+        batch = pending.iloc[offset:offset + batch_size]
+        inserted += recurrence_repo.add_occurrences(list(zip(
+            batch["recurrence_id"].tolist(), batch["item_id"].tolist(),
+            batch["amount_cents"].tolist(), batch["date"].dt.date.tolist()
+        )))
+    recurrence_repo.mark_materialized(until)
+    return inserted
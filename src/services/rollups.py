@@ -0,0 +1,126 @@
+# src/services/rollups.py
+"""Visões consolidadas do histórico: categorias, ano a ano, saldo e previsão.
+
+Todas partem do mesmo agregado item × ano × mês (``load_rollup``), lido de
+``monthly_balances`` e montado uma única vez por versão dos dados no cache
+da conexão; cada visão apenas filtra e reagrupa esse DataFrame compacto.
+"""
+from datetime import datetime
+from typing import List
+
+import pandas as pd
+
+from src.models.monthly_total import MonthlyTotal
+from src.repository.report_repository import ReportRepository
+from src.services.dashboard import TOTAL_COLUMNS
+from src.services.display import MESES
+
+ROLLUP_COLUMNS = {**TOTAL_COLUMNS, "year": "Ano"}
+
+
+def rollup_frame(totals: List[MonthlyTotal]) -> pd.DataFrame:
+    data = pd.DataFrame(totals, columns=list(ROLLUP_COLUMNS)).rename(columns=ROLLUP_COLUMNS)
+    return data.astype({
+        "item_id": "int32", "Item": "category", "Categoria": "category",
+        "Ref": "int8", "Valor": "int64", "Ano": "int16",
+    })
+
+
+def load_rollup(report_repo: ReportRepository) -> pd.DataFrame:
+    """Agregado de todo o histórico; não deve ser alterado pelas visões."""
+    return report_repo.cache.get("rollup_frame", lambda: rollup_frame(report_repo.get_all_totals()))
+
+
+def _reais(values):
+    return (values / 100).round(2)
+
+
+def category_by_month(rollup: pd.DataFrame, year: int) -> tuple[pd.DataFrame, List[str]]:
+    """Categoria × mês do ano, com o total anual de cada categoria."""
+    data = rollup[rollup["Ano"] == year]
+    pivot = data.pivot_table(values="Valor", index="Categoria", columns="Ref", aggfunc="sum", observed=True)
+    pivot.columns = [MESES[int(num) - 1] for num in pivot.columns]
+    pivot["Total"] = pivot.sum(axis=1)
+    colunas = pivot.columns.tolist()
+    return _reais(pivot).sort_values("Total").reset_index(), colunas
+
+
+def year_over_year(rollup: pd.DataFrame) -> tuple[pd.DataFrame, List[str]]:
+    """Resultado líquido de cada mês, com um ano por coluna."""
+    net = rollup.groupby(["Ref", "Ano"])["Valor"].sum().unstack("Ano")
+    net = net.reindex(range(1, 13))
+    net.loc[13] = net.sum()
+    net.index = MESES + ["Total"]
+    net.columns = [str(year) for year in net.columns]
+    colunas = net.columns.tolist()
+    return _reais(net).rename_axis("Mês").reset_index(), colunas
+
+
+def _periods(years, months) -> pd.PeriodIndex:
+    # Ordinal mensal: meses desde janeiro de 1970
+    ordinals = (pd.Index(years, dtype="int64") - 1970) * 12 + pd.Index(months, dtype="int64") - 1
+    return pd.PeriodIndex.from_ordinals(ordinals, freq="M")
+
+
+def _monthly_flow(rollup: pd.DataFrame) -> pd.Series:
+    """Fluxo líquido em centavos por mês, sem lacunas entre o primeiro e o último."""
+    flow = rollup.groupby(["Ano", "Ref"])["Valor"].sum()
+    flow.index = _periods(flow.index.get_level_values("Ano"), flow.index.get_level_values("Ref"))
+    if flow.empty:
+        return flow
+    return flow.reindex(pd.period_range(flow.index.min(), flow.index.max(), freq="M"), fill_value=0)
+
+
+def running_balance(rollup: pd.DataFrame, until: datetime | None = None) -> pd.DataFrame:
+    """Fluxo e saldo acumulado mês a mês (até ``until``, inclusive, se informado)."""
+    flow = _monthly_flow(rollup)
+    if until is not None:
+        flow = flow[flow.index <= pd.Period(until, freq="M")]
+    balance = pd.DataFrame({"Fluxo": flow, "Saldo": flow.cumsum()})
+    balance.index = balance.index.to_timestamp()
+    return _reais(balance).rename_axis("Período").reset_index()
+
+
+def cash_flow_forecast(
+    rollup: pd.DataFrame,
+    today: datetime,
+    months: int = 12,
+    window: int = 3,
+    scheduled: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    """Saldo previsto para o mês atual e os ``months - 1`` seguintes.
+
+    Cada item contribui com o valor já lançado no mês ou, se não houver,
+    com a ocorrência agendada (itens presentes em ``scheduled``, no formato
+    de ``scheduled_totals``) ou com a média dos últimos ``window`` meses
+    completos (meses sem lançamento contam como zero). Parte do saldo
+    acumulado até o mês anterior.
+    """
+    current = pd.Period(today, freq="M")
+    periods = pd.period_range(current, periods=months, freq="M")
+
+    data = rollup.assign(Periodo=_periods(rollup["Ano"], rollup["Ref"]))
+    history = data[(data["Periodo"] >= current - window) & (data["Periodo"] < current)]
+    average = history.groupby("item_id")["Valor"].sum() / window
+
+    planned = pd.Series(dtype="float64")
+    if scheduled is not None and not scheduled.empty:
+        planned = scheduled.assign(Periodo=_periods(scheduled["Ano"], scheduled["Ref"]))
+        planned = planned[planned["Periodo"].isin(periods)].groupby(["item_id", "Periodo"])["Valor"].sum()
+        average = average.drop(scheduled["item_id"].unique(), errors="ignore")
+
+    recorded = data[data["Periodo"].isin(periods)].groupby(["item_id", "Periodo"])["Valor"].sum()
+    items = average.index.union(recorded.index.get_level_values("item_id").unique())
+    if not planned.empty:
+        items = items.union(planned.index.get_level_values("item_id").unique())
+    grid = pd.MultiIndex.from_product([items, periods], names=["item_id", "Periodo"])
+    expected = pd.Series(average.reindex(grid.get_level_values("item_id"), fill_value=0).to_numpy(), index=grid)
+    if not planned.empty:
+        expected = expected.add(planned.reindex(grid, fill_value=0), fill_value=0)
+    flow = recorded.reindex(grid).fillna(expected).groupby(level="Periodo").sum()
+    flow = flow.reindex(periods, fill_value=0)
+
+    start = data.loc[data["Periodo"] < current, "Valor"].sum()
+    forecast = pd.DataFrame({"Fluxo": flow, "Saldo": start + flow.cumsum()})
+    forecast.index = forecast.index.to_timestamp()
+    return _reais(forecast).rename_axis("Período").reset_index()
@@ -0,0 +1,12 @@
+# tests/conftest.py
+import pytest
+
+from src.database.connection import get_manager
+
+
+@pytest.fixture
+def conn(tmp_path):
+    """Conexão com um banco novo, já migrado, fechado ao fim do teste."""
+    manager = get_manager(str(tmp_path / "financial.db"))
+    yield manager.get_connection()
+    manager.close()
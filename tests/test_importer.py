@@ -0,0 +1,31 @@
+# tests/test_importer.py
+from datetime import date
+
+from src.models.item import Item
+from src.repository.item_repository import ItemRepository
+from src.repository.transaction_repository import TransactionRepository
+from src.services.importer import StatementLine, import_lines
+
+
+def line(day: int, amount_cents: int = -1000) -> StatementLine:
+    return StatementLine(date=date(2024, 3, day), description="PADARIA", amount_cents=amount_cents)
+
+
+def test_identical_lines_in_unsorted_statement(conn):
+    # As duas linhas do dia 5 são transações distintas, mesmo separadas por outra data
+    item = ItemRepository(conn).add(Item(name="Padaria", category="Casa"))
+    transaction_repo = TransactionRepository(conn)
+    lines = [line(5), line(6), line(5)]
+
+    result = import_lines(lines, transaction_repo, [], default_item_id=item.id)
+    assert (result.inserted, result.duplicates) == (3, 0)
+
+    # Reimportar o mesmo extrato, em outra ordem, não grava nada
+    result = import_lines(list(reversed(lines)), transaction_repo, [], default_item_id=item.id)
+    assert (result.inserted, result.duplicates) == (0, 3)
+
+
+def test_lines_differing_in_amount_are_not_duplicates(conn):
+    item = ItemRepository(conn).add(Item(name="Padaria", category="Casa"))
+    result = import_lines([line(5), line(5, -2000), line(5)], TransactionRepository(conn), [], default_item_id=item.id)
+    assert (result.inserted, result.duplicates) == (3, 0)
@@ -0,0 +1,83 @@
+# tests/test_money.py
+"""``parse_cents`` e ``parse_cents_array`` devem concordar em todo valor."""
+import pytest
+
+from src.services.money import parse_cents, parse_cents_array
+
+VALID = [
+    ("1.234,56", 123456),
+    ("1,234.56", 123456),
+    ("R$ -10", -1000),
+    ("1.234.567", 123456700),
+    ("1,234,567", 123456700),
+    ("1234,56", 123456),
+    ("1 234,56", 123456),
+    (",5", 50),
+    ("12,345", 1235),
+    ("1.234,56-", -123456),
+    ("(1.234,56)", -123456),
+    ("R$ (5)", -500),
+    ("+5", 500),
+    ("999.999.999.999.999,99", 99999999999999999),
+    (12.5, 1250),
+    (-3, -300),
+    (9.2e16, 9200000000000000000),
+]
+
+INVALID = [
+    "--5",
+    "++5",
+    "-5-",
+    "+5-",
+    "(-5)",
+    "(5",
+    "5)",
+    "((5))",
+    "()",
+    "-",
+    "1.2.3,4",
+    "12,34,56",
+    "1.23.456,78",
+    "1.234,567.8",
+    "1,2345,678",
+    "5-3",
+    "abc",
+    "",
+    "1234567890123456",
+    1e20,
+    -1e20,
+    10**19,
+    float("nan"),
+    True,
+    None,
+]
+
+
+@pytest.mark.parametrize("text, cents", VALID)
+def test_valid(text, cents):
+    assert parse_cents(text) == cents
+    parsed, errors = parse_cents_array([text])
+    assert (parsed.tolist(), errors.tolist()) == ([cents], [False])
+
+
+@pytest.mark.parametrize("text", INVALID)
+def test_invalid(text):
+    with pytest.raises(ValueError):
+        parse_cents(text)
+    parsed, errors = parse_cents_array([text])
+    assert (parsed.tolist(), errors.tolist()) == ([0], [True])
+
+
+def test_explicit_decimal_separator():
+    assert parse_cents("1.234", decimal=",") == 123400
+    assert parse_cents_array(["1.234", "1,5"], decimal=",")[0].tolist() == [123400, 150]
+    with pytest.raises(ValueError):
+        parse_cents("1,234.56", decimal=",")
+    assert parse_cents_array(["1,234.56"], decimal=",")[1].tolist() == [True]
+
+
+def test_array_keeps_order_of_mixed_values():
+    values = [text for text, _ in VALID] + INVALID
+    parsed, errors = parse_cents_array(values)
+    assert parsed.tolist() == [cents for _, cents in VALID] + [0] * len(INVALID)
+    assert errors.tolist() == [False] * len(VALID) + [True] * len(INVALID)
@@ -0,0 +1,168 @@
+# tests/test_projection.py
+"""Projeção de recorrentes: ``project_recurring`` contra o loop original.
+
+O loop original (``benchmarks.projection.legacy_project``, cópia sem
+alterações de ``principal.main()``) é o oráculo. A versão vetorizada
+difere dele em dois defeitos, fixados cada um no seu teste: a chave em
+texto ``Item + Ref`` confunde itens como "Item 2"/dezembro e
+"Item 21"/fevereiro, e os lançamentos de dezembro dos itens recorrentes
+são contados duas vezes.
+"""
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+
+from benchmarks.projection import (
+    TRANSACTION_COLUMNS,
+    current_inputs,
+    current_matrix,
+    item_name,
+    legacy_matrix,
+    synthetic,
+)
+from src.services.projection import project_recurring
+
+
+def transactions(rows: list[tuple]) -> pd.DataFrame:
+    """Transações ``(item_id, data, centavos, recorrente)``."""
+    return pd.DataFrame(rows, columns=TRANSACTION_COLUMNS)
+
+
+def frame(rows: list[tuple]) -> pd.DataFrame:
+    """Totais ``(item_id, Ref, Valor)`` no formato de ``totals_frame``."""
+    data = pd.DataFrame(rows, columns=["item_id", "Ref", "Valor"])
+    data["Item"] = data["item_id"].map(item_name)
+    data["Categoria"] = "Categoria"
+    return data[["item_id", "Item", "Categoria", "Ref", "Valor"]]
+
+
+def cells(data: pd.DataFrame) -> dict:
+    return {(int(row.item_id), int(row.Ref)): row.Valor for row in data.itertuples()}
+
+
+def without_december_double_count(matrix: pd.DataFrame, rows: pd.DataFrame, today: datetime) -> pd.DataFrame:
+    """``matrix`` do loop original sem a segunda contagem dos lançamentos de
+    dezembro dos itens recorrentes (ver ``test_original_counts_december_twice``)."""
+    recurring, _ = current_inputs(rows, today.year, today)
+    december = rows[
+        rows["item_id"].isin(recurring["item_id"])
+        & rows["date"].map(lambda day: (day.year, day.month) == (today.year, 12))
+        & ~rows["is_recurring"]
+    ]
+    matrix = matrix.copy()
+    for row in december.itertuples():
+        matrix.loc[item_name(row.item_id), 12] -= row.amount_cents / 100
+    return matrix
+
+
+def assert_same_matrix(expected: pd.DataFrame, result: pd.DataFrame) -> None:
+    pd.testing.assert_frame_equal(expected.round(2), result.round(2), check_dtype=False)
+
+
+@pytest.mark.parametrize("first_month", [1, 5, 10, 12])
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_original_loop(first_month, seed):
+    today = datetime(2024, first_month, 15)
+    rows = synthetic(40, today, seed)
+    expected = without_december_double_count(legacy_matrix(rows, today.year, today), rows, today)
+    assert_same_matrix(expected, current_matrix(rows, today.year, today))
+
+
+def test_matches_original_loop_in_other_years():
+    today = datetime(2024, 5, 15)
+    rows = synthetic(40, today.replace(year=2023))
+    assert_same_matrix(legacy_matrix(rows, 2023, today), current_matrix(rows, 2023, today))
+
+
+@pytest.mark.parametrize("first_month", [1, 5, 12])
+def test_matches_original_loop_without_recurring(first_month):
+    today = datetime(2024, first_month, 15)
+    rows = synthetic(20, today)
+    rows = rows[~rows["is_recurring"]]
+    assert_same_matrix(legacy_matrix(rows, today.year, today), current_matrix(rows, today.year, today))
+
+
+@pytest.mark.parametrize("first_month", [1, 5, 12])
+def test_matches_original_loop_without_actual(first_month):
+    # Só os recorrentes do mês anterior (em janeiro, de dezembro do ano passado)
+    today = datetime(2024, first_month, 15)
+    rows = synthetic(20, today)
+    rows = rows[rows["is_recurring"]]
+    expected = legacy_matrix(rows, today.year, today)
+    assert not expected.empty
+    assert_same_matrix(expected, current_matrix(rows, today.year, today))
+
+
+def test_matches_original_loop_with_realized_value_mid_year():
+    # Valor lançado em julho passa a valer de agosto em diante
+    today = datetime(2024, 5, 15)
+    rows = transactions([
+        (1, date(2024, 4, 10), -10_000, True),
+        (1, date(2024, 7, 3), -15_000, False),
+        (2, date(2024, 4, 10), 5_000, True),
+        (2, date(2024, 5, 20), 5_500, False),
+    ])
+    expected = legacy_matrix(rows, today.year, today)
+    assert expected.loc[item_name(1), 8:12].tolist() == [-150.0] * 5
+    assert_same_matrix(expected, current_matrix(rows, today.year, today))
+
+
+def test_original_counts_december_twice():
+    # O loop não recalcula a chave depois da última volta: a cópia do
+    # lançamento de dezembro escapa do drop_duplicates
+    today = datetime(2024, 11, 15)
+    rows = transactions([(1, date(2024, 10, 10), -10_000, True), (1, date(2024, 12, 5), -12_000, False)])
+    assert legacy_matrix(rows, today.year, today).loc[item_name(1), 12] == -240.0
+    assert current_matrix(rows, today.year, today).loc[item_name(1), 12] == -120.0
+
+
+def test_original_confuses_item_names(monkeypatch):
+    # "Item 2" + "12" e "Item 21" + "2" geram a mesma chave no loop original
+    monkeypatch.setattr("benchmarks.projection.item_name", lambda item_id: f"Item {item_id}")
+    today = datetime(2024, 2, 15)
+    rows = transactions([
+        (2, date(2024, 1, 10), -10_000, True),
+        (21, date(2024, 1, 10), -20_000, True),
+        (21, date(2024, 2, 3), -30_000, False),
+    ])
+    legacy = legacy_matrix(rows, today.year, today)
+    current = current_matrix(rows, today.year, today)
+    assert legacy.loc["Item 2", 12] != current.loc["Item 2", 12]
+    assert current.loc["Item 2", 2:12].tolist() == [-100.0] * 11
+    assert current.loc["Item 21", 3:12].tolist() == [-300.0] * 10
+
+
+def test_carries_realized_value_forward():
+    recurring = frame([(1, 4, -100.0), (2, 4, 50.0)])
+    actual = frame([(1, 1, -90.0), (1, 7, -150.0), (2, 5, 55.0), (3, 6, -10.0)])
+
+    # Antes do valor lançado vale o recorrente; depois dele, o lançado
+    expected = {**cells(actual), (1, 5): -100.0, (1, 6): -100.0}
+    expected.update({(1, month): -150.0 for month in range(8, 13)})
+    expected.update({(2, month): 55.0 for month in range(6, 13)})
+    assert cells(project_recurring(recurring, actual, 5)) == expected
+
+
+def test_ignores_values_before_first_month():
+    # Dezembro é o único mês projetado, com o valor recorrente: o lançamento
+    # de julho é anterior ao mês inicial e não é propagado
+    recurring = frame([(1, 11, -100.0), (2, 11, 50.0)])
+    actual = frame([(1, 7, -150.0)])
+    expected = {**cells(actual), (1, 12): -100.0, (2, 12): 50.0}
+    assert cells(project_recurring(recurring, actual, 12)) == expected
+
+
+def test_empty_frames():
+    recurring = frame([(1, 4, -100.0), (2, 4, 50.0)])
+    actual = frame([(1, 1, -90.0), (3, 6, -10.0)])
+
+    pd.testing.assert_frame_equal(project_recurring(recurring.iloc[0:0], actual, 5), actual)
+    expected = {(item_id, month): value for item_id, value in ((1, -100.0), (2, 50.0)) for month in range(5, 13)}
+    assert cells(project_recurring(recurring, actual.iloc[0:0], 5)) == expected
+
+
+def test_nothing_left_after_december():
+    recurring = frame([(1, 4, -100.0)])
+    actual = frame([(1, 1, -90.0)])
+    pd.testing.assert_frame_equal(project_recurring(recurring, actual, 13), actual)